@@ -1,10 +1,19 @@
 
+import os
+import uuid
 import streamlit as st
 import numpy as np
-import pandas as pd
-import time
-from models.bachelier import simulate_paths, theoretical_stats
-from ui.components import plot_paths, plot_distribution, render_physics_finance_mapping, render_equations, render_collision_explanation
+from models.bachelier import DEFAULT_BLOCK_BYTES, theoretical_stats
+from models.density import density_surface
+from models.exact import barrier_statistics, hit_probability, sample_terminal
+from models.path_store import PathStore
+from models.statistics import MomentAccumulator
+from services.cache import ResultCache
+from services.export import EXPORT_FORMATS, available_formats, export_bytes
+from services.profiling import Profiler
+from services.worker import BackgroundRunner
+from ui.components import BIN_RULES, RENDER_MODES, TERMINAL_SAMPLES, plot_paths, plot_distribution, plot_density_surface, animate_particle, animate_ensemble, render_physics_finance_mapping, render_equations, render_collision_explanation
+from ui.rendering import time_columns
 
 # Page Config
 st.set_page_config(
@@ -32,6 +41,15 @@ st.markdown("""
 st.title("Bachelier Diffusion Simulator")
 st.markdown("Visualizing financial markets as a particle diffusion process driven by microscopic randomness.")
 
+# --- Shared Result Cache ---
+# One instance per server process, shared by every session. The byte
+# budget can be set with BACHELIER_CACHE_MB.
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_bytes=int(os.environ.get('BACHELIER_CACHE_MB', 512)) * 1024 ** 2)
+
+cache = get_result_cache()
+
 # --- Initialization of State ---
 defaults = {
     'S0': 100.0,
@@ -43,7 +61,11 @@ defaults = {
     'seed': 42,
     'drift_mode': False,
     'show_ensemble': True,
-    'view_mode': "Path View"
+    'render_mode': 'batched',
+    'view_mode': "Path View",
+    'diagnostics': False,
+    'diagnostics_memory': False,
+    'barrier': 130.0
 }
 
 for key, val in defaults.items():
@@ -61,13 +83,165 @@ N = st.session_state.N
 seed = st.session_state.seed
 drift_mode = st.session_state.drift_mode
 show_ensemble = st.session_state.show_ensemble
+render_mode = st.session_state.render_mode
+
+# Per-stage timings for the Diagnostics panel; a no-op unless enabled there
+profiler = Profiler(enabled=st.session_state.diagnostics, trace_memory=st.session_state.diagnostics_memory)
+
+# Everything below depends only on this tuple, so widget changes that
+# leave it alone (view mode, ensemble toggle, buttons) reuse cached work.
+sim_key = (S0, mu, sigma, T, dt, N, seed)
+
+def compute_results(job, S0, mu, sigma, T, dt, N, seed, profile=False):
+    """
+    Simulation, statistics and density surface for one parameter set, run
+    on the background worker. Checks for cancellation between stages and
+    publishes each coarser refinement level as a preview.
+    """
+    # Timings only: tracemalloc is process-wide and the foreground profiler may own it
+    job_profiler = Profiler(enabled=profile)
+
+    # The ensemble lives in a multi-resolution store that depends on neither
+    # dt, T nor N: moving the dt slider only refines it (or strides it), and
+    # raising T or N only simulates the added steps or paths; smaller values
+    # are prefixes of the stored ensemble. Its arrays are read-only since
+    # they are shared between sessions.
+    store_key = ('store', S0, mu, sigma, seed)
+    job.report(0.0, "Simulating paths")
+    with job_profiler.stage("simulate"):
+        store = cache.get_or_compute(store_key, lambda: PathStore(S0, mu, sigma, T, N, seed))
+        if N > store.N or T > store.T:
+            job.report(0.05, "Extending ensemble")
+            store.extend(N, T)
+            cache.put(store_key, store)
+
+    target_level = store.level_for_dt(dt)
+    if store.level < target_level:
+        with job_profiler.stage("refine"):
+            # The store is shared by every session with these parameters, so it
+            # is never truncated here: smaller N and T are slices of it, and the
+            # cache's byte budget decides when it goes
+            for level, t_lvl, S_lvl in store.refine_iter(dt, N, T):
+                if level < target_level:
+                    job.report(0.1 + 0.7 * (level + 1) / (target_level + 1),
+                               f"Refining to level {level + 1} of {target_level}", preview=(level, t_lvl, S_lvl))
+            # Re-account the grown store against the cache budget
+            cache.put(store_key, store)
+
+    t_arr, S = store.view(dt, N=N, T=T)
+    key = (S0, mu, sigma, T, dt, N, seed)
+    # The store snaps T to whole base steps and dt down to its dyadic grid;
+    # the theory is evaluated on the horizon that was actually simulated
+    horizon, step = store.horizon(T), t_arr[1] - t_arr[0]
+
+    # Per-time-step moments, accumulated over row blocks so the temporaries
+    # of each update stay within DEFAULT_BLOCK_BYTES instead of scaling with S
+    def accumulate_moments():
+        moments = MomentAccumulator(len(t_arr))
+        rows = max(1, DEFAULT_BLOCK_BYTES // (16 * len(t_arr)))
+        for start in range(0, len(S), rows):
+            job.check()
+            moments.update(S[start:start + rows])
+        return moments
+
+    job.report(0.8, "Statistics")
+    with job_profiler.stage("statistics"):
+        moments = cache.get_or_compute(('moments',) + key, accumulate_moments)
+
+    # Analytic p(x, t), its CDF and quantile bands, evaluated once per
+    # parameter set and shared by the path bands, the distribution overlay
+    # and the density heatmap
+    def build_surface():
+        theo_mean, theo_var = theoretical_stats(horizon, S0, mu, sigma)
+        spread = 4.5 * np.sqrt(theo_var)
+        x = np.linspace(min(S.min(), theo_mean - spread), max(S.max(), theo_mean + spread), 300)
+        return density_surface(t_arr[time_columns(len(t_arr), 300)], S0, mu, sigma, x=x, dtype=np.float32)
+
+    job.report(0.9, "Density surface")
+    with job_profiler.stage("density surface"):
+        surface = cache.get_or_compute(('surface',) + key, build_surface)
+
+    return {'key': key, 'T': horizon, 'dt': step, 't': t_arr, 'S': S, 'moments': moments, 'surface': surface,
+            'level': target_level, 'profile': job_profiler.summary()}
+
+# --- Background Worker ---
+# Shared by every session; each session has one slot, so a parameter
+# change cancels that session's superseded run. Results that are already
+# cached come back within the foreground wait and render straight away;
+# slower runs show the last completed result (or a coarse preview) with a
+# progress bar until they finish.
+FOREGROUND_WAIT = 0.5
+
+# Results kept for display (one per session) have their own byte budget,
+# BACHELIER_RESULTS_MB. They are mostly views into arrays the cache already
+# counts, so sharing its budget would count that memory twice; this bound
+# caps what sessions keep alive after the cache has evicted it.
+@st.cache_resource
+def get_runner():
+    return BackgroundRunner(max_bytes=int(os.environ.get('BACHELIER_RESULTS_MB', 256)) * 1024 ** 2)
 
-t_arr, S = simulate_paths(S0, mu, sigma, T, dt, N, seed)
+runner = get_runner()
+if 'session_slot' not in st.session_state:
+    st.session_state.session_slot = uuid.uuid4().hex
+slot = st.session_state.session_slot
+
+def show_progress(job):
+    st.progress(job.progress, text=f"{job.message} ({job.seconds:.1f} s)")
+    if job.preview is not None:
+        level, t_lvl, S_lvl = job.preview
+        pS0, pmu, psigma, _, _, pN, _ = job.key
+        st.plotly_chart(
+            cache.get_or_compute(
+                ('fig_preview', level, show_ensemble, render_mode) + job.key,
+                lambda: plot_paths(t_lvl, S_lvl, pN, pmu, psigma, pS0, show_ensemble, render_mode=render_mode)
+            ),
+            use_container_width=True
+        )
+        st.caption(f"Preview of the new parameters at Δt = {t_lvl[1] - t_lvl[0]:.4g}")
+
+@st.fragment(run_every=FOREGROUND_WAIT)
+def render_progress(job):
+    # Polls the pending job and reruns the whole app once it has finished
+    if job.done:
+        st.rerun()
+    show_progress(job)
+
+job = runner.submit(slot, sim_key, compute_results, *sim_key, profile=profiler.enabled)
+with profiler.stage("wait for results"):
+    if not job.wait(FOREGROUND_WAIT) and runner.latest(slot) is None:
+        # Nothing to show yet in this session: follow the job in place
+        placeholder = st.empty()
+        while not job.wait(FOREGROUND_WAIT):
+            with placeholder.container():
+                show_progress(job)
+        placeholder.empty()
+# Early exits release the profiler's tracemalloc use explicitly; anything
+# else that ends the run early releases it when the profiler is collected
+if job.status == 'failed':
+    profiler.stop()
+    raise job.error
+
+if job.status == 'done':
+    results, pending = job.result, None
+else:
+    previous = runner.latest(slot)
+    if previous is None:
+        # Superseded by a newer rerun of this session, which renders instead
+        profiler.stop()
+        st.stop()
+    results, pending = previous.result, job
+
+# The charts and statistics below describe the displayed results, which
+# are the previous parameter set while a new run is pending
+S0, mu, sigma, T, dt, N, seed = sim_key = results['key']
+# Theory and exact draws use the simulated grid's horizon, which can differ
+# slightly from the slider value
+T, dt = results['T'], results['dt']
+t_arr, S, moments, surface, target_level = (results[k] for k in ('t', 'S', 'moments', 'surface', 'level'))
 
 # Calculate Stats
 S_T = S[:, -1]
-empirical_mean = np.mean(S_T)
-empirical_var = np.var(S_T)
+empirical_mean, empirical_var = moments.mean[-1], moments.variance[-1]
 theo_mean, theo_var = theoretical_stats(T, S0, mu, sigma)
 
 # --- Main Layout (3 Columns) ---
@@ -82,39 +256,64 @@ with col_left:
     st.subheader("Particle Collision")
     render_collision_explanation()
     
-    if st.button("Animate Particle"):
-        collision_placeholder = st.empty()
-        x_pos = 0
-        import plotly.graph_objects as go
-        for _ in range(30):
-            x_pos += np.random.normal(0, 1)
-            fig_part = go.Figure(go.Scatter(
-                x=[x_pos], y=[0], mode='markers',
-                marker=dict(size=20, color='#1EA7FF')
-            ))
-            fig_part.update_layout(
-                xaxis=dict(range=[-20, 20], showgrid=False, zeroline=True, showticklabels=False),
-                yaxis=dict(range=[-1, 1], showgrid=False, visible=False),
-                margin=dict(l=0, r=0, t=0, b=0),
-                height=150,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            collision_placeholder.plotly_chart(fig_part, use_container_width=True)
-            time.sleep(0.05)
+    # The whole walk ships as one figure; Play runs it in the browser
+    st.plotly_chart(
+        cache.get_or_compute(('fig_particle', seed), lambda: animate_particle(seed=seed)),
+        use_container_width=True
+    )
 
 
 # --- Center Column: Charts ---
 with col_center:
     # We use radio button here, mapped to state
-    st.radio("View Mode", ["Path View", "Distribution View"], horizontal=True, key='view_mode')
+    st.radio("View Mode", ["Path View", "Distribution View", "Density View", "Ensemble Animation"], horizontal=True, key='view_mode')
+    if pending is not None:
+        st.info("Showing the previous parameters while the new run computes.")
+        render_progress(pending)
+    if not np.isclose(T, sim_key[3]) or not np.isclose(dt, sim_key[4]):
+        st.caption(f"Simulated on the stored grid: T = {T:.4g}, Δt = {dt:.4g}")
     
     if st.session_state.view_mode == "Path View":
-        fig_paths = plot_paths(t_arr, S, N, mu, sigma, S0, show_ensemble)
-        st.plotly_chart(fig_paths, use_container_width=True)
+        with profiler.stage("figure: paths"):
+            fig_paths = cache.get_or_compute(
+                ('fig_paths', show_ensemble, render_mode) + sim_key,
+                lambda: plot_paths(t_arr, S, N, mu, sigma, S0, show_ensemble, render_mode=render_mode,
+                                   empirical=moments, surface=surface)
+            )
+        with profiler.stage("render chart"):
+            st.plotly_chart(fig_paths, use_container_width=True)
+        st.caption(f"Grid step Δt = {t_arr[1] - t_arr[0]:.4g} (refinement level {target_level})")
+    elif st.session_state.view_mode == "Distribution View":
+        bin_rule = st.selectbox("Binning Rule", BIN_RULES, key='bin_rule')
+        terminal_samples = st.selectbox("Terminal Samples", list(TERMINAL_SAMPLES), format_func=TERMINAL_SAMPLES.get,
+                                        key='terminal_samples')
+        with profiler.stage("figure: distribution"):
+            # Exact draws of S_T need no paths; only the figure is cached
+            fig_dist = cache.get_or_compute(
+                ('fig_dist', bin_rule, terminal_samples) + sim_key,
+                lambda: plot_distribution(
+                    sample_terminal(S0, mu, sigma, T, terminal_samples, seed=seed) if terminal_samples else S_T,
+                    T, S0, mu, sigma, bins=bin_rule, surface=surface
+                )
+            )
+        with profiler.stage("render chart"):
+            st.plotly_chart(fig_dist, use_container_width=True)
+        if terminal_samples:
+            st.caption(f"{terminal_samples:,} exact draws of S_T ~ N(S0 + µT, σ²T), without time-stepping")
+    elif st.session_state.view_mode == "Density View":
+        with profiler.stage("figure: density"):
+            fig_density = cache.get_or_compute(('fig_density',) + sim_key, lambda: plot_density_surface(surface))
+        with profiler.stage("render chart"):
+            st.plotly_chart(fig_density, use_container_width=True)
     else:
-        fig_dist = plot_distribution(S_T, T, S0, mu, sigma)
-        st.plotly_chart(fig_dist, use_container_width=True)
+        # Every frame is built here in one pass and played client-side
+        with profiler.stage("figure: animation"):
+            fig_anim = cache.get_or_compute(
+                ('fig_anim',) + sim_key,
+                lambda: animate_ensemble(t_arr, S, S0, mu, sigma, surface=surface)
+            )
+        with profiler.stage("render chart"):
+            st.plotly_chart(fig_anim, use_container_width=True)
 
 # --- Right Column: Statistics & Equations ---
 with col_right:
@@ -129,12 +328,34 @@ with col_right:
         <p style="margin:0; font-weight:bold; color:#1EA7FF;">Empirical (N={N})</p>
         <p>Mean: {empirical_mean:.4f} <small>({(empirical_mean-theo_mean)/theo_mean*100 if theo_mean!=0 else 0:.2f}%)</small></p>
         <p>Variance: {empirical_var:.4f} <small>({(empirical_var-theo_var)/theo_var*100 if theo_var!=0 else 0:.2f}%)</small></p>
+        <p>Skewness: {moments.skewness[-1]:.4f} &nbsp; Excess Kurtosis: {moments.kurtosis[-1]:.4f} <small>(theory: 0)</small></p>
     </div>
     """, unsafe_allow_html=True)
     
+    with st.expander("Barrier Statistics"):
+        barrier = st.number_input("Barrier", step=5.0, key='barrier')
+        # Bridge-corrected: also counts crossings between grid points
+        with profiler.stage("barrier statistics"):
+            sampled, corrected = cache.get_or_compute(
+                ('barrier', barrier) + sim_key, lambda: barrier_statistics(t_arr, S, barrier, sigma)
+            )
+        st.markdown(f"""
+        P(hit by T), theory: {hit_probability(S0, mu, sigma, T, barrier):.4f}  
+        Paths, grid points only: {sampled:.4f}  
+        Paths, bridge-corrected: {corrected:.4f}
+        """)
+
     st.markdown("---")
     render_equations(drift_on=drift_mode)
 
+    with st.expander("Result Cache"):
+        cache_stats = cache.stats()
+        st.markdown(f"""
+        Hits: {cache_stats['hits']} &nbsp; Misses: {cache_stats['misses']} &nbsp; (hit rate {cache_stats['hit_rate']:.0%})  
+        Entries: {cache_stats['entries']} &nbsp; Evictions: {cache_stats['evictions']}  
+        Memory: {cache_stats['bytes'] / 1024 ** 2:.1f} / {cache_stats['max_bytes'] / 1024 ** 2:.0f} MB
+        """)
+
 
 # --- Bottom Row: Controls ---
 st.markdown("---")
@@ -157,16 +378,46 @@ with c3:
 with c4:
     st.number_input("Random Seed", 0, 9999, key='seed')
     st.checkbox("Show Ensemble Paths", key='show_ensemble')
+    st.selectbox("Ensemble Rendering", list(RENDER_MODES), format_func=RENDER_MODES.get, key='render_mode')
     
-    # Download Button (needs to be generated from current S)
-    csv = pd.DataFrame(S.T, index=t_arr).to_csv()
+    # Download Button: the file is only built when the button is clicked
+    export_fmt = st.selectbox("Export Format", available_formats(), key='export_fmt')
+    file_name, mime = EXPORT_FORMATS[export_fmt]
     st.download_button(
-        label="Download CSV",
-        data=csv,
-        file_name='bachelier_paths.csv',
-        mime='text/csv',
+        label=f"Download {export_fmt.upper()}",
+        data=lambda: export_bytes(t_arr, S, export_fmt),
+        file_name=file_name,
+        mime=mime,
+        on_click='ignore',
     )
     
     if st.button("Restart"):
         # We don't really need to do anything as button press reruns script
         pass
+
+# --- Diagnostics ---
+# Stages of this rerun, measured above. The export is built lazily on
+# download, so it does not appear here.
+with st.expander("Diagnostics"):
+    st.checkbox("Profile reruns", key='diagnostics')
+    st.checkbox("Track memory (tracemalloc, slower)", key='diagnostics_memory', disabled=not st.session_state.diagnostics)
+    if profiler.enabled:
+        rows = []
+        # Stages of the background run behind the displayed results, then this rerun's
+        background = [dict(record, depth=record['depth'] + 1) for record in results['profile']]
+        if background:
+            background.insert(0, {'name': 'background run', 'depth': 0, 'seconds': sum(r['seconds'] for r in results['profile'] if r['depth'] == 0)})
+        for record in background + profiler.summary():
+            row = {'stage': '  ' * record['depth'] + record['name'], 'ms': round(record['seconds'] * 1000, 2)}
+            if 'memory_peak_bytes' in record:
+                row['peak MB'] = round(record['memory_peak_bytes'] / 1024 ** 2, 2)
+                row['net MB'] = round(record['memory_delta_bytes'] / 1024 ** 2, 2)
+            rows.append(row)
+        st.dataframe(rows, hide_index=True)
+        st.caption(f"Total {profiler.total_seconds * 1000:.1f} ms")
+        d1, d2 = st.columns(2)
+        d1.download_button("Profile (JSON)", profiler.to_json(), file_name="profile.json", mime="application/json")
+        d2.download_button("Chrome Trace", profiler.to_chrome_trace(), file_name="profile.trace.json", mime="application/json")
+    else:
+        st.caption("Enable profiling to time each stage of the next rerun.")
+profiler.stop()
@@ -0,0 +1,68 @@
+"""
+Convergence of each sampling mode: RMSE of an at-the-money call price
+E[(S_T - K)^+] against its closed form, as a function of N, and the
+efficiency 1 / (RMSE^2 * CPU seconds). A higher efficiency means fewer
+paths (or less time) for the same confidence.
+
+Run from the app directory:
+    python -m benchmarks.bench_convergence
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy.special import ndtr
+
+from benchmarks.common import format_table
+from models.bachelier import simulate_paths, theoretical_stats
+from models.sampling import SAMPLERS, control_variate_mean
+
+S0, MU, SIGMA, T, K = 100.0, 5.0, 20.0, 1.0, 100.0
+
+def closed_form_call():
+    mean, var = theoretical_stats(T, S0, MU, SIGMA)
+    std = np.sqrt(var)
+    d = (mean - K) / std
+    return (mean - K) * ndtr(d) + std * np.exp(-0.5 * d * d) / np.sqrt(2 * np.pi)
+
+def estimate(sampler, control, N, dt, seed):
+    _, S = simulate_paths(S0, MU, SIGMA, T, dt, N, seed=seed, sampler=sampler)
+    S_T = S[:, -1]
+    payoff = np.maximum(S_T - K, 0.0)
+    if control:
+        return control_variate_mean(payoff, S_T, theoretical_stats(T, S0, MU, SIGMA)[0])[0]
+    return payoff.mean()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--N', type=int, nargs='+', default=[256, 1024, 4096, 16384])
+    parser.add_argument('--dt', type=float, default=1 / 64)
+    parser.add_argument('--replications', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    truth = closed_form_call()
+    modes = [(s, False) for s in SAMPLERS] + [('standard', True), ('sobol', True)]
+
+    rows = []
+    for sampler, control in modes:
+        for N in args.N:
+            errors = []
+            start = time.process_time()
+            for rep in range(args.replications):
+                errors.append(estimate(sampler, control, N, args.dt, seed=1000 + rep) - truth)
+            cpu = (time.process_time() - start) / args.replications
+            rmse = float(np.sqrt(np.mean(np.square(errors))))
+            rows.append({
+                'mode': sampler + (' + control variate' if control else ''),
+                'N': N,
+                'RMSE': f"{rmse:.2e}",
+                'CPU s/run': f"{cpu:.4f}",
+                'efficiency': f"{1 / (rmse ** 2 * cpu):.3g}",
+            })
+
+    print(f"ATM call, closed form {truth:.6f}, dt={args.dt}, {args.replications} replications")
+    print(format_table(rows, ['mode', 'N', 'RMSE', 'CPU s/run', 'efficiency']))
+
+if __name__ == '__main__':
+    main()
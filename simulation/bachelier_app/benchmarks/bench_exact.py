@@ -0,0 +1,57 @@
+"""
+Exact terminal, running-maximum and hitting-time samplers against the
+time-stepped ensemble they replace, with the discretization bias of the
+stepped maximum.
+
+Run from the app directory:
+    python -m benchmarks.bench_exact
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import format_table
+from models.bachelier import simulate_paths
+from models.exact import first_passage_time, hit_probability, sample_extreme, sample_terminal
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--N', type=int, default=20000, help="paths for the time-stepped runs")
+    parser.add_argument('--exact-N', type=int, default=1000000, help="samples for the exact samplers")
+    parser.add_argument('--dt', type=float, nargs='+', default=[0.01, 0.001])
+    parser.add_argument('--barrier', type=float, default=130.0)
+    args = parser.parse_args(argv)
+    S0, mu, sigma, T = 100.0, 0.0, 20.0, 1.0
+    exact = hit_probability(S0, mu, sigma, T, args.barrier)
+
+    rows = []
+
+    def row(method, N, seconds, hit=None):
+        return {'method': method, 'N': N, 'seconds': f"{seconds:.4f}", 'M samples/s': f"{N / seconds / 1e6:.2f}",
+                'P(hit)': '' if hit is None else f"{hit:.4f}",
+                'bias': '' if hit is None else f"{hit - exact:+.4f}"}
+
+    for dt in args.dt:
+        (_, S), seconds = timed(lambda: simulate_paths(S0, mu, sigma, T, dt, args.N, seed=1))
+        rows.append(row(f'time-stepped dt={dt}', args.N, seconds, np.mean(S.max(axis=1) >= args.barrier)))
+        del S
+
+    _, seconds = timed(lambda: sample_terminal(S0, mu, sigma, T, args.exact_N, seed=1))
+    rows.append(row('exact S_T', args.exact_N, seconds))
+    (_, M), seconds = timed(lambda: sample_extreme(S0, mu, sigma, T, args.exact_N, seed=1))
+    rows.append(row('exact (S_T, max)', args.exact_N, seconds, np.mean(M >= args.barrier)))
+    tau, seconds = timed(lambda: first_passage_time(S0, mu, sigma, args.barrier, args.exact_N, seed=1))
+    rows.append(row('exact hitting time', args.exact_N, seconds, np.mean(tau <= T)))
+
+    print(format_table(rows, ['method', 'N', 'seconds', 'M samples/s', 'P(hit)', 'bias']))
+    print(f"Analytic P(max S >= {args.barrier:g} by T={T:g}) = {exact:.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Bytes written and seconds per export format.
+
+Run from the app directory:
+    python -m benchmarks.bench_export
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.common import format_table
+from models.bachelier import simulate_paths, iter_paths, time_grid
+from services.export import available_formats, export_bytes, export_to_file
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--N', type=int, default=1000)
+    parser.add_argument('--T', type=float, default=1.0)
+    parser.add_argument('--dt', type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    t, S = simulate_paths(100.0, 0.0, 20.0, args.T, args.dt, args.N, seed=42)
+    steps, _ = time_grid(args.T, args.dt)
+    rows = []
+
+    if pd is not None:
+        data, seconds = _timed(lambda: pd.DataFrame(S.T, index=t).to_csv())
+        rows.append({'format': 'csv (pandas, previous)', 'MB': len(data.encode()) / 1024 ** 2, 'seconds': seconds})
+
+    for fmt in available_formats():
+        data, seconds = _timed(lambda: export_bytes(t, S, fmt))
+        rows.append({'format': f'{fmt} (in memory)', 'MB': len(data) / 1024 ** 2, 'seconds': seconds})
+
+    # Streamed straight from the simulator to disk, never holding S
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, by in [('npy', 'paths'), ('csv', 'time'), ('parquet', 'time')]:
+            if fmt not in available_formats():
+                continue
+            path = os.path.join(tmp, f'paths.{fmt}')
+            blocks = iter_paths(100.0, 0.0, 20.0, args.T, args.dt, args.N, seed=42, by=by)
+            _, seconds = _timed(lambda: export_to_file(path, blocks, fmt, args.N, steps))
+            label = 'npy (memmap, streamed)' if fmt == 'npy' else f'{fmt} (streamed)'
+            rows.append({'format': label, 'MB': os.path.getsize(path) / 1024 ** 2, 'seconds': seconds})
+
+    for r in rows:
+        r['MB'] = f"{r['MB']:.2f}"
+        r['seconds'] = f"{r['seconds']:.3f}"
+    print(f"N={args.N}, steps={steps}")
+    print(format_table(rows, ['format', 'MB', 'seconds']))
+
+if __name__ == '__main__':
+    main()
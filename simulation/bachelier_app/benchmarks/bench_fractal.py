@@ -0,0 +1,73 @@
+"""
+Fractional Brownian motion by Davies-Harte circulant embedding against
+the O(steps^2) Cholesky factor of the fGn covariance, plus throughput of
+the fat-tailed and regime-switching generators.
+
+Run from the app directory:
+    python -m benchmarks.bench_fractal
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import format_table
+from models.fractal import simulate_fractal_paths, simulate_regime_switching
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def cholesky_fbm(N, steps, H, seed):
+    k = np.arange(steps, dtype=float)
+    gamma = 0.5 * (np.abs(k + 1) ** (2 * H) - 2 * k ** (2 * H) + np.abs(k - 1) ** (2 * H))
+    cov = gamma[np.abs(k[:, None] - k[None, :]).astype(int)]
+    L = np.linalg.cholesky(cov)
+    Z = np.random.default_rng(seed).standard_normal((N, steps))
+    return np.cumsum(Z @ L.T, axis=1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--N', type=int, default=1000)
+    parser.add_argument('--steps', type=int, nargs='+', default=[256, 1024, 4096])
+    parser.add_argument('--H', type=float, default=0.7)
+    parser.add_argument('--max-cholesky', type=int, default=4096, help="skip Cholesky above this many steps")
+    args = parser.parse_args(argv)
+
+    rows = []
+
+    def row(name, steps, seconds, cholesky=''):
+        return {'generator': name, 'steps': steps, 'seconds': f"{seconds:.4f}", 'Cholesky s': cholesky,
+                'M increments/s': f"{args.N * steps / seconds / 1e6:.1f}"}
+
+    # Warm-up, so the first row does not include FFT plan set-up
+    simulate_fractal_paths(0, 0, 1, 1.0, 0.1, 2, 'fgn', seed=1, H=args.H)
+
+    for steps in args.steps:
+        dt = 1.0 / steps
+        _, seconds = timed(lambda: simulate_fractal_paths(0, 0, 1, 1.0, dt, args.N, 'fgn', seed=1, H=args.H))
+        cholesky = 'skipped'
+        if steps <= args.max_cholesky:
+            _, chol_s = timed(lambda: cholesky_fbm(args.N, steps, args.H, 1))
+            cholesky = f"{chol_s:.4f} ({chol_s / seconds:.1f}x)"
+        rows.append(row(f'fBm H={args.H} (Davies-Harte)', steps, seconds, cholesky))
+
+    steps = args.steps[-1]
+    dt = 1.0 / steps
+    cases = [
+        ('gaussian', lambda: simulate_fractal_paths(0, 0, 1, 1.0, dt, args.N, 'gaussian', seed=1)),
+        ('student_t nu=3', lambda: simulate_fractal_paths(0, 0, 1, 1.0, dt, args.N, 'student_t', seed=1, nu=3)),
+        ('stable alpha=1.7', lambda: simulate_fractal_paths(0, 0, 1, 1.0, dt, args.N, 'stable', seed=1, alpha=1.7)),
+        ('regime switching', lambda: simulate_regime_switching(0, 0, [1, 3], 1.0, dt, args.N,
+                                                               [[0.999, 0.001], [0.004, 0.996]], seed=1)),
+    ]
+    for name, func in cases:
+        _, seconds = timed(func)
+        rows.append(row(name, steps, seconds))
+
+    print(format_table(rows, ['generator', 'steps', 'seconds', 'Cholesky s', 'M increments/s']))
+
+if __name__ == '__main__':
+    main()
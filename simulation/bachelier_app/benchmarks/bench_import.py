@@ -0,0 +1,83 @@
+"""
+Cold-start latency: wall time of a fresh interpreter importing each
+entry point, minus a bare interpreter start, and the modules that
+dominate it according to `python -X importtime`.
+
+Run from the app directory:
+    python -m benchmarks.bench_import
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import format_table
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    'models.bachelier': ['-c', 'import models.bachelier'],
+    'models (all)': ['-c', 'import models.bachelier, models.density, models.parallel, models.path_store, '
+                           'models.pde, models.pricing, models.sampling, models.statistics, models.sweep'],
+    'services.export': ['-c', 'import services.export'],
+    'ui.components': ['-c', 'import ui.components'],
+    'cli --help': ['-m', 'cli', '--help'],
+    'cli price': ['-m', 'cli', 'price', '--K', '100'],
+}
+
+def cold_start(args, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=APP_DIR, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+LOCAL_PACKAGES = ('models', 'services', 'ui', 'cli', 'benchmarks')
+
+def import_times(args):
+    """
+    Cumulative import time in ms per top-level package.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=APP_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals[package] = max(totals.get(package, 0), int(cumulative) / 1000)
+    return totals
+
+def slowest_imports(args, skip, n=3):
+    """
+    The n packages (other than those in skip) that take longest to import.
+    """
+    totals = {k: v for k, v in import_times(args).items() if k not in skip}
+    top = sorted(totals.items(), key=lambda item: -item[1])[:n]
+    return ', '.join(f"{name} {ms:.0f}" for name, ms in top)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    bare = cold_start(['-c', 'pass'], args.repeat)
+    # Packages every interpreter loads at startup (site hooks) are not ours
+    skip = set(import_times(['-c', 'pass'])) | set(LOCAL_PACKAGES)
+    rows = []
+    for name, target in TARGETS.items():
+        rows.append({
+            'entry point': name,
+            'ms': f"{(cold_start(target, args.repeat) - bare) * 1000:.0f}",
+            'largest imports (ms)': slowest_imports(target, skip),
+        })
+
+    print(f"Bare interpreter start {bare * 1000:.0f} ms (subtracted)")
+    print(format_table(rows, ['entry point', 'ms', 'largest imports (ms)']))
+
+if __name__ == '__main__':
+    main()
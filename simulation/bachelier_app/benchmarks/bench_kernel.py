@@ -0,0 +1,64 @@
+"""
+Peak RSS and wall time of simulate_paths against the in-place kernel,
+including a tall, thin ensemble (many paths, few steps) where per-row
+overhead would dominate.
+
+Run from the app directory:
+    python -m benchmarks.bench_kernel
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.common import measure, format_table
+from models.bachelier import simulate_paths, simulate_paths_into, time_grid
+
+def run_simulate_paths(N, T, dt):
+    simulate_paths(100.0, 0.0, 20.0, T, dt, N, seed=42)
+
+def run_kernel(N, T, dt, dtype, reuse):
+    steps, _ = time_grid(T, dt)
+    out = np.empty((N, steps + 1), dtype=dtype)
+    simulate_paths_into(out, 100.0, 0.0, 20.0, dt, seed=42)
+    if reuse:
+        # A second run into the same buffer should not grow the footprint
+        simulate_paths_into(out, 100.0, 0.0, 20.0, dt, seed=43)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--N', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--T', type=float, default=1.0)
+    parser.add_argument('--dt', type=float, default=0.001)
+    parser.add_argument('--tall', type=int, nargs=2, default=[200000, 10], metavar=('N', 'STEPS'),
+                        help="also run N paths of STEPS steps over T=1")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tall_N, tall_steps = args.tall
+    shapes = [(N, args.T, args.dt) for N in args.N] + [(tall_N, 1.0, 1.0 / tall_steps)]
+
+    cases = [
+        ('simulate_paths', run_simulate_paths, ()),
+        ('kernel float64', run_kernel, (np.float64, False)),
+        ('kernel float64 reused', run_kernel, (np.float64, True)),
+        ('kernel float32', run_kernel, (np.float32, False)),
+    ]
+
+    rows = []
+    for N, T, dt in shapes:
+        steps, _ = time_grid(T, dt)
+        for name, func, extra in cases:
+            result = measure(func, N, T, dt, *extra, repeat=args.repeat)
+            rows.append({
+                'case': name,
+                'N': N,
+                'steps': steps,
+                'seconds': f"{result['seconds']:.4f}",
+                'peak RSS (MB)': f"{result['peak_rss_bytes'] / 1024 ** 2:.1f}",
+            })
+
+    print(format_table(rows, ['case', 'N', 'steps', 'seconds', 'peak RSS (MB)']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Accuracy and speed of the Crank-Nicolson Fokker-Planck solver against
+theoretical_pdf (free space), the method-of-images density (absorbing
+barrier) and a Monte Carlo histogram of killed paths, plus throughput
+when many parameter sets are solved as one batch.
+
+Run from the app directory:
+    python -m benchmarks.bench_pde
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import format_table
+from models.bachelier import simulate_paths, theoretical_pdf
+from models.pde import cell_grid, point_mass, solve_fokker_planck, absorbed_pdf
+
+S0, MU, SIGMA, T, BARRIER = 100.0, 5.0, 20.0, 1.0, 80.0
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def l1(p, q, h):
+    return float(np.abs(p - q).sum() * h)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cells', type=int, nargs='+', default=[200, 400, 800, 1600])
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--N', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--mc-dt', type=float, default=0.001)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    # Warm-up, so the first row does not include importing LAPACK
+    x, _ = cell_grid(0, 200, 10)
+    solve_fokker_planck(point_mass(x, S0), x, MU, SIGMA, T, 2)
+
+    rows = []
+    for n in args.cells:
+        x, h = cell_grid(0, 200, n)
+        p, seconds = timed(lambda: solve_fokker_planck(point_mass(x, S0), x, MU, SIGMA, T, args.steps))
+        rows.append({'case': 'free space PDE', 'resolution': f"{n} cells", 'L1 error': f"{l1(p, theoretical_pdf(x, T, S0, MU, SIGMA), h):.2e}",
+                     'seconds': f"{seconds:.4f}"})
+
+    for n in args.cells:
+        x, h = cell_grid(BARRIER, 250, n)
+        p, seconds = timed(lambda: solve_fokker_planck(point_mass(x, S0), x, MU, SIGMA, T, args.steps, lower='absorbing'))
+        rows.append({'case': 'absorbing PDE', 'resolution': f"{n} cells", 'L1 error': f"{l1(p, absorbed_pdf(x, T, S0, MU, SIGMA, BARRIER), h):.2e}",
+                     'seconds': f"{seconds:.4f}"})
+
+    # Monte Carlo: paths that touch the barrier on the grid are killed, the
+    # survivors are histogrammed. Discrete monitoring biases the survival up.
+    x, h = cell_grid(BARRIER, 250, 170)
+    edges = np.append(x - h / 2, x[-1] + h / 2)
+    exact = absorbed_pdf(x, T, S0, MU, SIGMA, BARRIER)
+    for N in args.N:
+        def mc():
+            _, S = simulate_paths(S0, MU, SIGMA, T, args.mc_dt, N, seed=42)
+            alive = S.min(axis=1) > BARRIER
+            counts, _ = np.histogram(S[alive, -1], bins=edges)
+            return counts / (N * h)
+        p, seconds = timed(mc)
+        rows.append({'case': 'absorbing Monte Carlo', 'resolution': f"N={N}", 'L1 error': f"{l1(p, exact, h):.2e}",
+                     'seconds': f"{seconds:.4f}"})
+
+    x, h = cell_grid(0, 200, 800)
+    sigmas = np.linspace(5, 40, args.batch)
+    _, seconds = timed(lambda: solve_fokker_planck(point_mass(x, S0), x, MU, sigmas, T, args.steps))
+    rows.append({'case': f'batch of {args.batch} sigmas', 'resolution': '800 cells', 'L1 error': '',
+                 'seconds': f"{seconds:.4f} ({args.batch / seconds:.0f} sets/s)"})
+
+    print(format_table(rows, ['case', 'resolution', 'L1 error', 'seconds']))
+
+if __name__ == '__main__':
+    main()
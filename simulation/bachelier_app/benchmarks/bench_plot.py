@@ -0,0 +1,44 @@
+"""
+Figure JSON size and build time of plot_paths for each render mode.
+
+Run from the app directory:
+    python -m benchmarks.bench_plot
+"""
+
+import argparse
+import time
+
+from benchmarks.common import format_table
+from models.bachelier import simulate_paths, time_grid
+from ui.components import plot_paths, RENDER_MODES
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--N', type=int, default=1000)
+    parser.add_argument('--T', type=float, default=5.0)
+    parser.add_argument('--dt', type=float, nargs='+', default=[0.01, 0.001])
+    args = parser.parse_args(argv)
+
+    rows = []
+    for dt in args.dt:
+        t, S = simulate_paths(100.0, 0.0, 20.0, args.T, dt, args.N, seed=42)
+        steps, _ = time_grid(args.T, dt)
+        for mode in RENDER_MODES:
+            start = time.perf_counter()
+            fig = plot_paths(t, S, args.N, 0.0, 20.0, 100.0, render_mode=mode)
+            built = time.perf_counter() - start
+            payload = fig.to_json()
+            serialized = time.perf_counter() - start
+            rows.append({
+                'mode': mode,
+                'steps': steps,
+                'build (s)': f"{built:.3f}",
+                'build+json (s)': f"{serialized:.3f}",
+                'JSON (KB)': f"{len(payload) / 1024:.0f}",
+            })
+
+    print(f"N={args.N}, T={args.T}")
+    print(format_table(rows, ['mode', 'steps', 'build (s)', 'build+json (s)', 'JSON (KB)']))
+
+if __name__ == '__main__':
+    main()
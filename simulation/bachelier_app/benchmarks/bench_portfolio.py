@@ -0,0 +1,64 @@
+"""
+Random-portfolio evaluation and efficient frontiers for d correlated
+assets: the vectorized engine against evaluating portfolios one at a
+time, as the portfolio page does in JavaScript.
+
+Run from the app directory:
+    python -m benchmarks.bench_portfolio --assets 10 100 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import format_table
+from models.portfolio import efficient_frontier, long_only_frontier, sample_portfolios, simulate_assets
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def market(d, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((d, d))
+    return rng.uniform(0.02, 0.15, d), A @ A.T / d + 0.1 * np.eye(d)
+
+def loop_portfolios(n, mean, cov, seed):
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        w = rng.dirichlet(np.ones(len(mean)))
+        out.append((w @ mean, np.sqrt(w @ cov @ w)))
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--assets', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--portfolios', type=int, default=1000000)
+    parser.add_argument('--loop', type=int, default=2000, help="portfolios timed in the per-portfolio loop")
+    parser.add_argument('--paths', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for d in args.assets:
+        mean, cov = market(d)
+        _, vectorized = timed(lambda: sample_portfolios(args.portfolios, mean, cov, seed=1))
+        _, loop = timed(lambda: loop_portfolios(args.loop, mean, cov, 1))
+        _, free = timed(lambda: efficient_frontier(mean, cov, n_points=100))
+        _, long_only = timed(lambda: long_only_frontier(mean, cov, n_points=50))
+        _, paths = timed(lambda: simulate_assets(100, mean, cov, 1.0, 0.01, args.paths, seed=1))
+        rows.append({
+            'assets': d,
+            f'{args.portfolios} portfolios s': f"{vectorized:.3f}",
+            'loop (extrapolated) s': f"{loop * args.portfolios / args.loop:.1f}",
+            'frontier s': f"{free:.4f}",
+            'long-only frontier s': f"{long_only:.3f}",
+            f'{args.paths} paths x 100 steps s': f"{paths:.3f}",
+        })
+
+    print(format_table(rows, list(rows[0])))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Throughput of the vectorized pricing engine in quotes per second:
+prices, Greeks and implied normal volatility for a random chain of
+calls and puts.
+
+Run from the app directory:
+    python -m benchmarks.bench_pricing
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import format_table
+from models.pricing import bachelier_price, bachelier_greeks, implied_normal_vol
+
+def random_chain(n, seed=0):
+    rng = np.random.default_rng(seed)
+    F = 100 + rng.normal(0, 10, n)
+    K = F + rng.normal(0, 30, n)
+    T = rng.uniform(0.05, 3, n)
+    sigma = rng.uniform(1, 60, n)
+    kind = np.where(rng.random(n) < 0.5, 'call', 'put')
+    return F, K, T, sigma, kind
+
+def best_of(func, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--quotes', type=int, nargs='+', default=[10 ** 4, 10 ** 6])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for n in args.quotes:
+        F, K, T, sigma, kind = random_chain(n)
+        price = bachelier_price(F, K, T, sigma, kind)
+        cases = [
+            ('price', lambda: bachelier_price(F, K, T, sigma, kind)),
+            ('greeks', lambda: bachelier_greeks(F, K, T, sigma, kind)),
+            ('implied vol', lambda: implied_normal_vol(price, F, K, T, kind)),
+        ]
+        for name, func in cases:
+            seconds = best_of(func, args.repeat)
+            rows.append({
+                'case': name,
+                'quotes': n,
+                'seconds': f"{seconds:.4f}",
+                'quotes/s': f"{n / seconds:.3g}",
+            })
+
+    print(format_table(rows, ['case', 'quotes', 'seconds', 'quotes/s']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput and accuracy of the Hurst and tail-exponent estimators on
+simulated ensembles: fractional Brownian motion with known H and
+alpha-stable paths with known alpha.
+
+Run from the app directory:
+    python -m benchmarks.bench_scaling --N 10000 --steps 100000
+The ensemble is streamed in path blocks, so it never has to fit in memory;
+generation time is reported separately from estimation time.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import format_table
+from models.fractal import simulate_fractal_paths
+from models.scaling import HURST_METHODS, estimate_hurst, tail_exponent
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--N', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=100000)
+    parser.add_argument('--H', type=float, default=0.7)
+    parser.add_argument('--alpha', type=float, default=1.7)
+    parser.add_argument('--block', type=int, default=20, help="paths per streamed block")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    dt = 1.0 / args.steps
+    generated = {'seconds': 0.0}
+
+    def blocks(increments, **params):
+        for start in range(0, args.N, args.block):
+            n = min(args.block, args.N - start)
+            begin = time.perf_counter()
+            # Seeded per block so the streamed ensemble is reproducible
+            _, S = simulate_fractal_paths(0, 0, 1, 1.0, dt, n, increments, seed=start, **params)
+            generated['seconds'] += time.perf_counter() - begin
+            yield S
+
+    values = args.N * args.steps
+    rows = []
+    for method in HURST_METHODS:
+        generated['seconds'] = 0.0
+        start = time.perf_counter()
+        estimate = estimate_hurst(blocks('fgn', H=args.H), method, workers=args.workers)
+        seconds = time.perf_counter() - start - generated['seconds']
+        rows.append({'estimator': f"Hurst ({method})", 'true': args.H, 'estimate': f"{estimate.H:.3f}",
+                     'path spread': f"{np.nanstd(estimate.path_H):.3f}", 'seconds': f"{seconds:.3f}",
+                     'M values/s': f"{values / seconds / 1e6:.1f}"})
+
+    generated['seconds'] = 0.0
+    start = time.perf_counter()
+    tail = tail_exponent(blocks('stable', alpha=args.alpha), k_max=2000, workers=args.workers)
+    seconds = time.perf_counter() - start - generated['seconds']
+    rows.append({'estimator': "tail (Hill, k=2000)", 'true': args.alpha, 'estimate': f"{tail.alpha[-1]:.3f}",
+                 'path spread': '', 'seconds': f"{seconds:.3f}", 'M values/s': f"{values / seconds / 1e6:.1f}"})
+
+    print(f"{args.N} paths x {args.steps} steps")
+    print(format_table(rows, ['estimator', 'true', 'estimate', 'path spread', 'seconds', 'M values/s']))
+
+if __name__ == '__main__':
+    main()
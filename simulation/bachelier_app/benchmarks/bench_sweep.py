@@ -0,0 +1,52 @@
+"""
+Scenario grid of sigmas x drifts: one scalar simulate_paths call per
+scenario against a single broadcast call and the pooled run_sweep.
+
+Run from the app directory:
+    python -m benchmarks.bench_sweep
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import format_table
+from models.bachelier import simulate_paths
+from models.sweep import run_sweep
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sigmas', type=int, default=50)
+    parser.add_argument('--drifts', type=int, default=20)
+    parser.add_argument('--N', type=int, default=500)
+    parser.add_argument('--dt', type=float, default=0.01)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    sigmas = np.linspace(5, 50, args.sigmas)[:, None]
+    mus = np.linspace(-20, 20, args.drifts)[None, :]
+
+    def loop():
+        for sigma in sigmas.ravel():
+            for mu in mus.ravel():
+                _, S = simulate_paths(100.0, mu, sigma, 1.0, args.dt, args.N, seed=42)
+                S[:, -1].mean()
+
+    def batched():
+        # Terminal column only, so the full grid is never held at once
+        run_sweep(100.0, mus, sigmas, 1.0, args.dt, args.N, seed=42, workers=1)
+
+    def pooled():
+        run_sweep(100.0, mus, sigmas, 1.0, args.dt, args.N, seed=42, workers=args.workers)
+
+    rows = []
+    for name, func in [('scalar loop', loop), ('broadcast sweep', batched), ('process pool sweep', pooled)]:
+        start = time.perf_counter()
+        func()
+        rows.append({'case': name, 'scenarios': sigmas.size * mus.size, 'seconds': f"{time.perf_counter() - start:.3f}"})
+
+    print(format_table(rows, ['case', 'scenarios', 'seconds']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+
+import multiprocessing as mp
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _max_rss_bytes():
+    """
+    Peak resident set size of the current process in bytes (0 if unknown).
+    """
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def _traced_blocks():
+    # Live traced blocks, leaving out the snapshot's own bookkeeping
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return len(snapshot.traces)
+
+def _run_case(func, args, kwargs, repeat, setup=None, warmup=False, trace_memory=False):
+    if setup is not None:
+        args = setup(*args)
+    # Peak RSS is a high-water mark, so take the baseline before the first
+    # call; a warm-up run still keeps lazy imports out of the timings
+    before = _max_rss_bytes()
+    if warmup:
+        func(*args, **kwargs)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    result = {
+        'seconds': min(timings),
+        'peak_rss_bytes': max(0, _max_rss_bytes() - before),
+    }
+    if trace_memory:
+        # A separate traced run, since tracemalloc slows allocation down.
+        # The return value is held until the blocks are counted, so what
+        # the call allocated for its result counts too.
+        tracemalloc.start()
+        before = _traced_blocks()
+        tracemalloc.reset_peak()
+        value = func(*args, **kwargs)
+        result['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        result['allocated_blocks'] = max(0, _traced_blocks() - before)
+        del value
+        tracemalloc.stop()
+    return result
+
+def measure(func, *args, repeat=3, setup=None, warmup=False, trace_memory=False, **kwargs):
+    """
+    Runs func(*args, **kwargs) in a fresh interpreter and reports the best
+    wall time over `repeat` runs and the growth of peak RSS it caused.
+
+    With setup, func is called with setup(*args) instead, built in the
+    child outside the measurement. warmup adds one untimed call first.
+    trace_memory adds, from a separate tracemalloc run, 'traced_peak_bytes'
+    and 'allocated_blocks': the number of blocks the call allocated that
+    are still alive when it returns, its return value included.
+
+    A new process per case keeps peak RSS meaningful: it is a high-water
+    mark and would otherwise be inherited from earlier cases.
+    func and setup must be importable (module-level functions).
+    """
+    ctx = mp.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_case, (func, args, kwargs, repeat, setup, warmup, trace_memory))
+
+def format_table(rows, columns):
+    """
+    Renders a list of dicts as a fixed-width text table.
+    """
+    widths = [max(len(col), *(len(str(r[col])) for r in rows)) for col in columns]
+    lines = ['  '.join(col.ljust(w) for col, w in zip(columns, widths))]
+    lines.append('  '.join('-' * w for w in widths))
+    for r in rows:
+        lines.append('  '.join(str(r[col]).ljust(w) for col, w in zip(columns, widths)))
+    return '\n'.join(lines)
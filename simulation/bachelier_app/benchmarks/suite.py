@@ -0,0 +1,192 @@
+"""
+Regression benchmark suite: sweeps N and steps over the hot paths of the
+app (simulation, analytic PDF, the figures, the ensemble animation and
+the CSV export) and records wall time, peak RSS growth, the tracemalloc
+peak and the number of allocated blocks per case.
+
+Results are compared with a JSON baseline. Record one on a quiet machine,
+then check later changes against it:
+    python -m benchmarks.suite --save
+    python -m benchmarks.suite --check
+--check exits with status 1 when a case is slower or uses more memory
+than the baseline by more than the given tolerances.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from benchmarks.common import format_table, measure
+from models.bachelier import simulate_paths, theoretical_pdf
+from services.export import export_bytes
+from ui.components import animate_ensemble, plot_paths, plot_distribution
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Relative slack before a case counts as a regression. Timings are
+# noisier than allocations, so they get more room.
+DEFAULT_TIME_TOLERANCE = 0.3
+DEFAULT_MEMORY_TOLERANCE = 0.1
+
+METRICS = ('seconds', 'peak_rss_bytes', 'traced_peak_bytes', 'allocated_blocks')
+
+# Absolute growth below which a memory metric is treated as allocator noise
+NOISE_FLOORS = {'peak_rss_bytes': 1024 ** 2, 'traced_peak_bytes': 1024 ** 2, 'allocated_blocks': 100}
+
+def _ensemble(N, steps):
+    return simulate_paths(100.0, 5.0, 20.0, 1.0, 1.0 / steps, N, seed=42)
+
+# Each case is a (setup, run) pair of module-level functions so they can be
+# sent to a spawned process. setup(N, steps) builds the inputs outside the
+# measurement; run(*inputs) is what gets measured. run returns its output
+# so that the blocks held by it count as allocations of the case.
+
+def setup_simulate(N, steps):
+    return (N, steps)
+
+def run_simulate(N, steps):
+    return _ensemble(N, steps)
+
+def setup_pdf(N, steps):
+    # One price per path against every time step: an N x steps surface
+    return (np.linspace(0, 200, N), np.linspace(0, 1, steps + 1))
+
+def run_pdf(x, t):
+    return theoretical_pdf(x[None, :], t[:, None], 100.0, 5.0, 20.0)
+
+def setup_ensemble(N, steps):
+    return _ensemble(N, steps)
+
+def run_plot_paths(t, S):
+    return plot_paths(t, S, S.shape[0], 5.0, 20.0, 100.0).to_json()
+
+def run_plot_distribution(t, S):
+    return plot_distribution(S[:, -1], 1.0, 100.0, 5.0, 20.0).to_json()
+
+def run_animate_ensemble(t, S):
+    return animate_ensemble(t, S, 100.0, 5.0, 20.0).to_json()
+
+def run_csv_export(t, S):
+    return export_bytes(t, S, 'csv')
+
+CASES = {
+    'simulate_paths': (setup_simulate, run_simulate),
+    'theoretical_pdf': (setup_pdf, run_pdf),
+    'plot_paths': (setup_ensemble, run_plot_paths),
+    'plot_distribution': (setup_ensemble, run_plot_distribution),
+    'animate_ensemble': (setup_ensemble, run_animate_ensemble),
+    'csv_export': (setup_ensemble, run_csv_export),
+}
+
+def measure_case(name, N, steps, repeat=3):
+    """
+    Measures one case in a fresh interpreter (see benchmarks.common.measure),
+    after a warm-up call that keeps lazy imports out of the timings.
+    """
+    setup, run = CASES[name]
+    return measure(run, N, steps, repeat=repeat, setup=setup, warmup=True, trace_memory=True)
+
+def case_key(name, N, steps):
+    return f"{name}[N={N},steps={steps}]"
+
+def run_suite(cases, Ns, steps_list, repeat=3):
+    """
+    Returns {case_key: metrics} for every case x N x steps combination.
+    """
+    return {
+        case_key(name, N, steps): measure_case(name, N, steps, repeat)
+        for name in cases for N in Ns for steps in steps_list
+    }
+
+def compare(results, baseline, time_tolerance=DEFAULT_TIME_TOLERANCE,
+            memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """
+    Compares results with a baseline of the same layout. Returns a list
+    of (key, metric, baseline value, new value) for every regression.
+    Keys missing from the baseline are skipped. Memory growth below
+    NOISE_FLOORS is ignored, since allocator noise dominates at that scale.
+    """
+    regressions = []
+    for key, metrics in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in METRICS:
+            old, new = reference.get(metric), metrics[metric]
+            if old is None:
+                continue
+            if metric == 'seconds':
+                regressed = new > old * (1 + time_tolerance)
+            else:
+                regressed = new > old * (1 + memory_tolerance) and new - old > NOISE_FLOORS[metric]
+            if regressed:
+                regressions.append((key, metric, old, new))
+    return regressions
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+def save_baseline(path, results):
+    payload = {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': sys.platform,
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--N', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--steps', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--check', action='store_true', help="fail on regressions against the baseline")
+    parser.add_argument('--time-tolerance', type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.check and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; record one with --save first")
+
+    results = run_suite(args.cases, args.N, args.steps, args.repeat)
+    baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) else {}
+
+    rows = []
+    for key, m in results.items():
+        ref = baseline.get(key, {})
+        rows.append({
+            'case': key,
+            'seconds': f"{m['seconds']:.4f}",
+            'baseline s': f"{ref['seconds']:.4f}" if 'seconds' in ref else '',
+            'peak RSS (MB)': f"{m['peak_rss_bytes'] / 1024 ** 2:.1f}",
+            'traced peak (MB)': f"{m['traced_peak_bytes'] / 1024 ** 2:.1f}",
+            'blocks': m['allocated_blocks'],
+            'baseline blocks': ref.get('allocated_blocks', ''),
+        })
+    print(format_table(rows, ['case', 'seconds', 'baseline s', 'peak RSS (MB)', 'traced peak (MB)', 'blocks',
+                              'baseline blocks']))
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.check:
+        regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        for key, metric, old, new in regressions:
+            change = f" ({new / old - 1:+.0%})" if old else ""
+            print(f"REGRESSION {key} {metric}: {old:.4g} -> {new:.4g}{change}")
+        if regressions:
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
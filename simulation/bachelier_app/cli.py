@@ -0,0 +1,206 @@
+"""
+Headless batch runner for large simulations and pricing jobs.
+
+Run from the app directory:
+    python -m cli simulate --N 1000000 --dt 0.001 --out paths.npy
+    python -m cli price --S0 100 --sigma 20 --T 1 --strikes 80 120 9 --greeks
+    python -m cli exact --N 10000000 --extreme max --barrier 130 --out terminal.npz
+
+simulate runs on all cores and writes .npy output through a memory map,
+so ensembles larger than RAM go straight to disk; .csv and .parquet are
+streamed from it in time slices. Heavy modules are imported only by the
+subcommand that needs them, which keeps --help and cold starts fast.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+OUTPUT_FORMATS = ('npy', 'npz', 'csv', 'parquet')
+
+def _output_format(path, fmt):
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise SystemExit(f"Cannot infer an output format from {path!r}; pass --format {'/'.join(OUTPUT_FORMATS)}")
+    return fmt
+
+def cmd_simulate(args):
+    import tempfile
+
+    import numpy as np
+
+    from models.bachelier import theoretical_stats, time_grid
+    from models.parallel import simulate_paths_parallel
+
+    steps, t = time_grid(args.T, args.dt)
+    shape = (args.N, steps + 1)
+    dtype = np.dtype(args.dtype)
+    run = lambda out=None: simulate_paths_parallel(
+        args.S0, args.mu, args.sigma, args.T, args.dt, args.N, seed=args.seed,
+        workers=args.workers, executor=args.executor, dtype=dtype, out=out
+    )[1]
+
+    start = time.perf_counter()
+    scratch = None
+    if args.out is None:
+        S = run()
+    else:
+        fmt = _output_format(args.out, args.format)
+        if fmt == 'npy':
+            path = args.out
+        else:
+            # Other formats are streamed from a memory-mapped scratch file
+            fd, scratch = tempfile.mkstemp(suffix='.npy', dir=os.path.dirname(os.path.abspath(args.out)))
+            os.close(fd)
+            path = scratch
+        S = run(np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape))
+        S.flush()
+    simulated = time.perf_counter() - start
+
+    try:
+        if args.out is not None and fmt != 'npy':
+            from services.export import export_to_file, time_slices
+            if fmt == 'npz':
+                np.savez(args.out, t=t, S=S)
+            else:
+                export_to_file(args.out, time_slices(t, S, args.chunk_steps), fmt, args.N, steps, dtype)
+
+        S_T = np.asarray(S[:, -1], dtype=float)
+    finally:
+        del S
+        if scratch is not None:
+            os.remove(scratch)
+    total = time.perf_counter() - start
+
+    theo_mean, theo_var = theoretical_stats(args.T, args.S0, args.mu, args.sigma)
+    print(f"Simulated {args.N} paths x {steps} steps in {simulated:.3f} s ({total:.3f} s including output)")
+    print(f"S_T mean {S_T.mean():.6f} (theory {theo_mean:.6f}), variance {S_T.var(ddof=1):.6f} (theory {theo_var:.6f})")
+    if args.out is not None:
+        print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1024 ** 2:.1f} MB)")
+    return 0
+
+def cmd_price(args):
+    import numpy as np
+
+    from models.pricing import bachelier_greeks, bachelier_price, mc_check
+
+    if args.K:
+        K = np.asarray(args.K, dtype=float)
+    else:
+        lo, hi, n = args.strikes
+        K = np.linspace(lo, hi, int(n))
+    F = args.S0 + args.mu * args.T
+
+    columns = {'K': K, 'price': bachelier_price(F, K, args.T, args.sigma, args.kind, args.r)}
+    if args.greeks:
+        greeks = bachelier_greeks(F, K, args.T, args.sigma, args.kind, args.r)
+        columns.update((name, value) for name, value in greeks.items() if name != 'price')
+    if args.mc:
+        columns['mc_z'] = mc_check(args.S0, args.mu, args.sigma, args.T, K, args.kind, args.r,
+                                   N=args.mc, seed=args.seed)
+
+    out = sys.stdout if args.out is None else open(args.out, 'w')
+    try:
+        np.savetxt(out, np.column_stack(list(columns.values())), fmt='%.10g', delimiter=',',
+                   header=','.join(columns), comments='')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+def cmd_exact(args):
+    import numpy as np
+
+    from models.bachelier import theoretical_stats
+    from models.exact import first_passage_time, hit_probability, sample_extreme, sample_terminal
+
+    start = time.perf_counter()
+    arrays = {}
+    if args.extreme:
+        arrays['S_T'], arrays[args.extreme] = sample_extreme(args.S0, args.mu, args.sigma, args.T, args.N,
+                                                             args.extreme, seed=args.seed)
+    else:
+        arrays['S_T'] = sample_terminal(args.S0, args.mu, args.sigma, args.T, args.N, seed=args.seed)
+    if args.barrier is not None:
+        # Hitting times are independent draws, not joint with S_T; a hit
+        # flag consistent with each S_T comes from the extreme on the barrier's side
+        arrays['tau'] = first_passage_time(args.S0, args.mu, args.sigma, args.barrier, args.N, seed=args.seed)
+        if args.extreme == ('max' if args.barrier >= args.S0 else 'min'):
+            extreme = arrays[args.extreme]
+            arrays['hit'] = extreme >= args.barrier if args.extreme == 'max' else extreme <= args.barrier
+    sampled = time.perf_counter() - start
+
+    S_T = arrays['S_T']
+    theo_mean, theo_var = theoretical_stats(args.T, args.S0, args.mu, args.sigma)
+    print(f"Sampled {args.N} exact draws ({', '.join(arrays)}) in {sampled:.3f} s")
+    print(f"S_T mean {S_T.mean():.6f} (theory {theo_mean:.6f}), variance {S_T.var(ddof=1):.6f} (theory {theo_var:.6f})")
+    if args.extreme:
+        print(f"Running {args.extreme}: mean {arrays[args.extreme].mean():.6f}")
+    if args.barrier is not None:
+        hit = np.mean(arrays['tau'] <= args.T)
+        exact = hit_probability(args.S0, args.mu, args.sigma, args.T, args.barrier)
+        print(f"P(hit {args.barrier:g} by T) {hit:.6f} (theory {exact:.6f})")
+        if 'hit' in arrays:
+            print(f"P(hit {args.barrier:g} by T) from the running {args.extreme} {arrays['hit'].mean():.6f}")
+
+    if args.out is not None:
+        if args.out.endswith('.npz'):
+            np.savez(args.out, **arrays)
+        else:
+            np.save(args.out, S_T)
+        print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1024 ** 2:.1f} MB)")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cli', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def model_args(p):
+        p.add_argument('--S0', type=float, default=100.0)
+        p.add_argument('--mu', type=float, default=0.0)
+        p.add_argument('--sigma', type=float, default=20.0)
+        p.add_argument('--T', type=float, default=1.0)
+        p.add_argument('--seed', type=int, default=None)
+
+    sim = sub.add_parser('simulate', help="simulate an ensemble and optionally write it to disk")
+    model_args(sim)
+    sim.add_argument('--dt', type=float, default=0.01)
+    sim.add_argument('--N', type=int, default=10000)
+    sim.add_argument('--workers', type=int, default=None, help="default: all cores")
+    sim.add_argument('--executor', choices=('thread', 'process'), default='thread')
+    sim.add_argument('--dtype', choices=('float64', 'float32'), default='float64')
+    sim.add_argument('--out', default=None, help="output file; format from the suffix unless --format is given")
+    sim.add_argument('--format', choices=OUTPUT_FORMATS, default=None)
+    sim.add_argument('--chunk-steps', type=int, default=256, help="time steps per streamed CSV/Parquet chunk")
+    sim.set_defaults(func=cmd_simulate)
+
+    price = sub.add_parser('price', help="closed-form option prices (and Greeks) for a strike ladder")
+    model_args(price)
+    strikes = price.add_mutually_exclusive_group(required=True)
+    strikes.add_argument('--K', type=float, nargs='+', help="explicit strikes")
+    strikes.add_argument('--strikes', type=float, nargs=3, metavar=('LO', 'HI', 'N'), help="N evenly spaced strikes")
+    price.add_argument('--kind', choices=('call', 'put', 'digital_call', 'digital_put'), default='call')
+    price.add_argument('--r', type=float, default=0.0)
+    price.add_argument('--greeks', action='store_true')
+    price.add_argument('--mc', type=int, default=0, metavar='N', help="also report Monte Carlo z-scores from N paths")
+    price.add_argument('--out', default=None, help="CSV file (default: stdout)")
+    price.set_defaults(func=cmd_price)
+
+    exact = sub.add_parser('exact', help="exact S_T, running extremes and hitting times, without time-stepping")
+    model_args(exact)
+    exact.add_argument('--N', type=int, default=1000000)
+    exact.add_argument('--extreme', choices=('max', 'min'), default=None, help="also sample the running max or min")
+    exact.add_argument('--barrier', type=float, default=None, help="also sample first passage times to this level (independent of S_T; "
+                                                                       "with a matching --extreme, also a joint hit flag)")
+    exact.add_argument('--out', default=None, help=".npy (S_T only) or .npz (every sampled array)")
+    exact.set_defaults(func=cmd_exact)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,73 @@
 
+from collections import namedtuple
+
 import numpy as np
 
-def simulate_paths(S0, mu, sigma, T, dt, N, seed=None):
+from models.sampling import draw_normals
+
+# A rectangular piece of the (N, steps+1) ensemble.
+# `paths` and `steps` are the slices it occupies in the full array,
+# `t` holds the time stamps of its columns and `S` the values.
+PathBlock = namedtuple('PathBlock', ['paths', 'steps', 't', 'S'])
+
+DEFAULT_BLOCK_BYTES = 64 * 1024 ** 2
+
+# Scratch the in-place kernel draws shocks into before copying them over
+KERNEL_SCRATCH_BYTES = 1024 ** 2
+
+def time_grid(T, dt):
+    """
+    Number of steps and time stamps used by the simulators.
+    """
+    steps = int(T / dt)
+    return steps, np.linspace(0, T, steps + 1)
+
+def scenario_grid(S0, mu, sigma):
+    """
+    Broadcasts S0, mu and sigma against each other. Returns the scenario
+    shape (() when all three are scalars) and the three parameters as
+    float arrays of that shape with two trailing axes, ready to combine
+    with an (N, steps+1) array.
+    """
+    S0, mu, sigma = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (S0, mu, sigma)))
+    return S0.shape, tuple(p[..., None, None] for p in (S0, mu, sigma))
+
+def _combine(params, dt, k, W):
+    """
+    S = S0 + mu*dt*k + sigma*sqrt(dt)*W for every scenario, where W holds
+    unit-step Brownian paths and k the step indices of its columns.
+    """
+    S0, mu, sigma = params
+    return S0 + (mu * dt) * k + (sigma * np.sqrt(dt)) * W
+
+def simulate_paths(S0, mu, sigma, T, dt, N, seed=None, sampler='standard'):
     """
     Simulates N paths of arithmetic Brownian motion using vectorized operations.
     S_{i+1} = S_i + mu*dt + sigma*sqrt(dt)*Z_i
+
+    A given seed reproduces the classic np.random.seed(seed) stream but
+    through a private RandomState, so the global RNG is left untouched.
+    For thread-safe, multi-core runs use models.parallel.
+
+    sampler selects how the shocks Z are drawn (see models.sampling):
+    'standard', 'antithetic', 'moment_matching' or 'sobol'
+    (scrambled Sobol with Brownian-bridge ordering).
+
+    S0, mu and sigma may also be arrays that broadcast to a scenario grid,
+    e.g. sigma[:, None] and mu[None, :]. All scenarios are then driven by
+    the same shocks (common random numbers), drawn once, and S has shape
+    grid shape + (N, steps+1). Scenario i matches a scalar call with the
+    same seed up to rounding.
     """
-    if seed is not None:
-        np.random.seed(seed)
+    rng = np.random.RandomState(seed) if seed is not None else np.random
     
-    steps = int(T / dt)
-    t = np.linspace(0, T, steps + 1)
+    steps, t = time_grid(T, dt)
+
+    shape, params = scenario_grid(S0, mu, sigma)
+    if shape:
+        W = np.zeros((N, steps + 1))
+        np.cumsum(draw_normals(sampler, rng, N, steps, seed), axis=1, out=W[:, 1:])
+        return t, _combine(params, dt, np.arange(steps + 1), W)
     
     # Pre-calculate steps
     drift = mu * dt
@@ -18,7 +75,7 @@ def simulate_paths(S0, mu, sigma, T, dt, N, seed=None):
     
     # Generate random shocks Z ~ N(0,1)
     # Shape: (N, steps)
-    Z = np.random.normal(0, 1, size=(N, steps))
+    Z = draw_normals(sampler, rng, N, steps, seed)
     
     # Calculate increments dS
     # dS = drift + diffusion * Z
@@ -30,23 +87,198 @@ def simulate_paths(S0, mu, sigma, T, dt, N, seed=None):
         
     return t, S
 
+def simulate_paths_into(out, S0, mu, sigma, dt, seed=None):
+    """
+    Allocation-free ABM kernel. Fills a caller-supplied buffer `out` of
+    shape (N, steps+1) in place: shocks are written into out[:, 1:] (via a
+    scratch of at most KERNEL_SCRATCH_BYTES), scaled into increments, and
+    accumulated with an in-place cumsum, so no N x steps temporaries are
+    created. The buffer may be float32 or float64
+    and can be reused across calls.
+
+    Uses a np.random.Generator (seed may be an int, SeedSequence or
+    Generator), so for a given seed the paths differ from simulate_paths,
+    which draws from the legacy global RNG.
+    """
+    if out.ndim != 2 or out.shape[1] < 1:
+        raise ValueError(f"out must have shape (N, steps+1), got {out.shape}")
+    if out.dtype not in (np.float32, np.float64):
+        raise ValueError(f"out must be float32 or float64, got {out.dtype}")
+    if out.strides[1] != out.itemsize:
+        raise ValueError("out must be contiguous along the time axis")
+
+    rng = np.random.default_rng(seed)
+    drift = mu * dt
+    diffusion = sigma * np.sqrt(dt)
+
+    # out[:, 1:] is not contiguous, so shocks are drawn a block of rows at a
+    # time into a small contiguous scratch and copied across. Long rows are
+    # drawn straight into place. Either way the stream is consumed in the
+    # same order as one (N, steps) draw.
+    N, steps = out.shape[0], out.shape[1] - 1
+    rows = KERNEL_SCRATCH_BYTES // max(1, steps * out.itemsize)
+    if rows <= 1:
+        for row in out:
+            rng.standard_normal(out=row[1:], dtype=out.dtype)
+    elif steps:
+        scratch = np.empty((min(rows, N), steps), dtype=out.dtype)
+        for start in range(0, N, len(scratch)):
+            block = scratch[:min(len(scratch), N - start)]
+            rng.standard_normal(out=block, dtype=out.dtype)
+            out[start:start + len(block), 1:] = block
+
+    shocks = out[:, 1:]
+    shocks *= diffusion
+    shocks += drift
+    out[:, 0] = S0
+    np.cumsum(out, axis=1, out=out)
+    return out
+
+def _block_length(block_size, max_bytes, row_bytes, total):
+    """
+    Resolves how many rows (or columns) go into one streamed block.
+    An explicit block_size wins; otherwise the block is sized so that
+    the block and its shock array fit in max_bytes.
+    """
+    if block_size is None:
+        budget = DEFAULT_BLOCK_BYTES if max_bytes is None else max_bytes
+        block_size = budget // (2 * row_bytes)
+    return int(max(1, min(block_size, total)))
+
+def iter_paths(S0, mu, sigma, T, dt, N, seed=None, by='paths', block_size=None, max_bytes=None):
+    """
+    Streams the ensemble of simulate_paths as a sequence of PathBlocks
+    so that peak memory is bounded by one block rather than by N x steps.
+
+    by='paths' yields groups of block_size complete paths. The shocks are
+    drawn in the same order as simulate_paths, so for the same seed the
+    stacked blocks are identical to its output.
+
+    by='time' yields time slices of block_size steps for all N paths,
+    carrying the last column of each slice forward as the starting state
+    of the next one. The first slice includes the initial column S0.
+
+    If block_size is not given it is derived from max_bytes
+    (default DEFAULT_BLOCK_BYTES).
+
+    Array-valued S0, mu and sigma broadcast as in simulate_paths; each
+    block's S then has shape grid shape + (rows, columns), and blocks are
+    sized so that all scenarios of a block fit the byte budget.
+    """
+    if by not in ('paths', 'time'):
+        raise ValueError(f"by must be 'paths' or 'time', got {by!r}")
+
+    # Private stream: does not touch (or depend on) the global NumPy RNG
+    # between yields, and matches np.random.seed(seed) draw-for-draw.
+    rng = np.random.RandomState(seed)
+
+    steps, t = time_grid(T, dt)
+    shape, params = scenario_grid(S0, mu, sigma)
+    if shape:
+        yield from _iter_scenarios(rng, params, int(np.prod(shape)), t, steps, dt, N,
+                                   by, block_size, max_bytes)
+        return
+
+    drift = mu * dt
+    diffusion = sigma * np.sqrt(dt)
+
+    if by == 'paths':
+        rows = _block_length(block_size, max_bytes, 8 * (steps + 1), N)
+        for start in range(0, N, rows):
+            stop = min(start + rows, N)
+            Z = rng.normal(0, 1, size=(stop - start, steps))
+
+            S = np.empty((stop - start, steps + 1))
+            S[:, 0] = 0.0
+            np.multiply(Z, diffusion, out=S[:, 1:])
+            del Z
+            S[:, 1:] += drift
+            np.cumsum(S, axis=1, out=S)
+            S += S0
+
+            yield PathBlock(slice(start, stop), slice(0, steps + 1), t, S)
+        return
+
+    cols = _block_length(block_size, max_bytes, 8 * N, steps + 1)
+    state = np.full(N, S0, dtype=float)
+    start = 0
+    while start <= steps:
+        # The first slice carries the initial column, later ones only new steps
+        first = 1 if start == 0 else 0
+        stop = min(start + cols, steps + 1)
+        n_new = stop - start - first
+
+        S = np.empty((N, stop - start))
+        if first:
+            S[:, 0] = state
+        if n_new > 0:
+            Z = rng.normal(0, 1, size=(N, n_new))
+            np.multiply(Z, diffusion, out=S[:, first:])
+            del Z
+            S[:, first:] += drift
+            S[:, first] += state
+            np.cumsum(S[:, first:], axis=1, out=S[:, first:])
+            state = S[:, -1].copy()
+
+        yield PathBlock(slice(0, N), slice(start, stop), t[start:stop], S)
+        start = stop
+
+def _iter_scenarios(rng, params, n_scenarios, t, steps, dt, N, by, block_size, max_bytes):
+    """
+    iter_paths for a scenario grid: streams unit Brownian blocks W, in the
+    same draw order as the scalar case, and maps them onto every scenario.
+    """
+    k = np.arange(steps + 1)
+    if by == 'paths':
+        rows = _block_length(block_size, max_bytes, 8 * (n_scenarios + 1) * (steps + 1), N)
+        for start in range(0, N, rows):
+            stop = min(start + rows, N)
+            W = np.zeros((stop - start, steps + 1))
+            np.cumsum(rng.normal(0, 1, size=(stop - start, steps)), axis=1, out=W[:, 1:])
+            yield PathBlock(slice(start, stop), slice(0, steps + 1), t, _combine(params, dt, k, W))
+        return
+
+    cols = _block_length(block_size, max_bytes, 8 * (n_scenarios + 1) * N, steps + 1)
+    state = np.zeros((N, 1))
+    start = 0
+    while start <= steps:
+        first = 1 if start == 0 else 0
+        stop = min(start + cols, steps + 1)
+        W = np.empty((N, stop - start))
+        if first:
+            W[:, :1] = state
+        if stop - start - first > 0:
+            np.cumsum(rng.normal(0, 1, size=(N, stop - start - first)), axis=1, out=W[:, first:])
+            W[:, first:] += state
+            state = W[:, -1:].copy()
+        yield PathBlock(slice(0, N), slice(start, stop), t[start:stop], _combine(params, dt, k[start:stop], W))
+        start = stop
+
 def theoretical_pdf(x, t, S0, mu, sigma):
     """
     Theoretical PDF for ABM at time t.
     p(x,t) ~ N(S0 + mu*t, sigma^2 * t)
+
+    x and t broadcast against each other, so a column of times and a row
+    of prices give the whole (t, x) surface in one call. Where the variance
+    is zero (t <= 0) the distribution is a point mass at the mean, which has
+    no pointwise density: those entries are 0, as they always were, so
+    sums and plots stay finite. density_surface draws that point mass as a
+    finite spike on its grid instead. Float32 inputs give float32 output.
     """
-    if t <= 0:
-        # At t=0, it's a delta function, handled elsewhere or returns infinity/bounds
-        return np.zeros_like(x)
-        
-    mean = S0 + mu * t
-    variance = (sigma ** 2) * t
-    std_dev = np.sqrt(variance)
-    
-    if std_dev == 0:
-        return np.zeros_like(x)
+    x, t = np.asarray(x), np.asarray(t)
+    dtype = np.result_type(x, t, np.float32)
+    x, t = x.astype(dtype, copy=False), t.astype(dtype, copy=False)
+
+    mean, variance = theoretical_stats(t, S0, mu, sigma)
+    degenerate = variance <= 0
+    std_dev = np.sqrt(np.where(degenerate, 1, variance))
 
-    return (1 / (std_dev * np.sqrt(2 * np.pi))) * np.exp(-0.5 * ((x - mean) / std_dev) ** 2)
+    z = (x - mean) / std_dev
+    pdf = np.exp(-0.5 * z * z) / (std_dev * np.sqrt(2 * np.pi)).astype(dtype)
+    if degenerate.any():
+        pdf = np.where(degenerate, 0, pdf).astype(dtype)
+    return pdf
 
 def theoretical_stats(t, S0, mu, sigma):
     """
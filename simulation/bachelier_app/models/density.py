@@ -0,0 +1,77 @@
+
+from collections import namedtuple
+
+import numpy as np
+
+from models.bachelier import theoretical_pdf, theoretical_stats
+
+# Analytic p(x, t) on a grid. `pdf` and `cdf` have shape (len(t), len(x))
+# (None when no price grid was given), `mean` and `std` shape (len(t),),
+# and `quantiles` shape (len(levels), len(t)).
+DensitySurface = namedtuple('DensitySurface', ['x', 't', 'mean', 'std', 'pdf', 'cdf', 'levels', 'quantiles'])
+
+# N(-2), N(-1), N(0), N(1), N(2): the ±1σ and ±2σ bands and the median
+SIGMA_LEVELS = (0.022750131948179195, 0.15865525393145707, 0.5, 0.8413447460685429, 0.9772498680518208)
+
+def _float_arrays(*arrays, dtype=None):
+    arrays = [np.asarray(a) for a in arrays]
+    dtype = np.result_type(*arrays, np.float32) if dtype is None else dtype
+    return [a.astype(dtype, copy=False) for a in arrays]
+
+def theoretical_cdf(x, t, S0, mu, sigma):
+    """
+    P(S_t <= x), vectorized like theoretical_pdf. At zero variance
+    (t = 0) it is the unit step at the mean.
+    """
+    from scipy.special import ndtr
+
+    x, t = _float_arrays(x, t)
+    mean, variance = theoretical_stats(t, S0, mu, sigma)
+    degenerate = variance <= 0
+    cdf = ndtr((x - mean) / np.sqrt(np.where(degenerate, 1, variance)))
+    return np.where(degenerate, x >= mean, cdf).astype(cdf.dtype)
+
+def theoretical_quantile(q, t, S0, mu, sigma):
+    """
+    q-quantile of S_t, vectorized over q and t:
+        S0 + mu t + sigma sqrt(t) N^-1(q)
+    At t = 0 every quantile is S0; q = 0 and 1 give -inf and inf for t > 0.
+    """
+    from scipy.special import ndtri
+
+    q, t = _float_arrays(q, t)
+    mean, variance = theoretical_stats(t, S0, mu, sigma)
+    std = np.sqrt(np.maximum(variance, 0))
+    with np.errstate(invalid='ignore'):
+        # inf * 0 at t = 0 would be NaN; the quantile is the mean there
+        return np.where(std > 0, mean + std * ndtri(q), mean).astype(mean.dtype)
+
+def density_surface(t, S0, mu, sigma, x=None, levels=SIGMA_LEVELS, dtype=np.float64):
+    """
+    Evaluates the analytic ABM distribution once over a time grid t
+    (and optionally a price grid x) for every consumer: path bands,
+    the distribution overlay and density heatmaps.
+
+    Rows with zero variance (t = 0) hold the delta at S0 as a spike of
+    height 1/dx in the grid cell nearest the mean, so every row of `pdf`
+    integrates to 1 on the grid and remains drawable. dtype=np.float32
+    halves the memory of large surfaces.
+    """
+    t, levels = _float_arrays(np.ravel(t), np.asarray(levels), dtype=dtype)
+    mean, variance = theoretical_stats(t, S0, mu, sigma)
+    std = np.sqrt(np.maximum(variance, 0)).astype(dtype)
+    quantiles = theoretical_quantile(levels[:, None], t[None, :], S0, mu, sigma)
+
+    pdf = cdf = None
+    if x is not None:
+        x = np.ravel(x).astype(dtype)
+        pdf = theoretical_pdf(x[None, :], t[:, None], S0, mu, sigma)
+        cdf = theoretical_cdf(x[None, :], t[:, None], S0, mu, sigma)
+        spikes = np.flatnonzero(std == 0)
+        if len(spikes) and len(x) > 1:
+            pdf[spikes] = 0
+            nearest = np.abs(x[None, :] - mean[spikes, None]).argmin(axis=1)
+            widths = np.gradient(x)
+            pdf[spikes, nearest] = 1 / widths[nearest]
+
+    return DensitySurface(x, t, np.asarray(mean, dtype=dtype), std, pdf, cdf, levels, quantiles)
@@ -0,0 +1,179 @@
+
+import numpy as np
+
+from models.bachelier import DEFAULT_BLOCK_BYTES
+from models.parallel import path_chunks, spawn_seeds
+
+# Samples per independently seeded chunk. Part of the reproducibility
+# contract, like the chunk sizes of models.parallel: the first n samples
+# of a larger draw equal a draw of n.
+EXACT_CHUNK_SIZE = 65536
+
+EXTREMES = ('max', 'min')
+
+# Streams derived from each chunk's seed. The chunk seed itself drives S_T;
+# these are its spawn-key children, so every sampler draws independently
+# of the others for the same seed.
+BRIDGE_STREAM, PASSAGE_STREAM, SURVIVAL_STREAM = 0, 1, 2
+
+def _fill(N, seed, chunk_size, outputs, fill):
+    """
+    Calls fill(child, start, stop) for consecutive chunk_size ranges of N,
+    each child being its own SeedSequence(seed).spawn() stream.
+    """
+    chunks = path_chunks(N, chunk_size)
+    for (start, stop), child in zip(chunks, spawn_seeds(seed, len(chunks))):
+        fill(child, start, stop)
+    return outputs
+
+def _stream(child, index):
+    # Like child.spawn() but by index, so it does not depend on earlier spawns
+    seq = np.random.SeedSequence(child.entropy, spawn_key=child.spawn_key + (index,), pool_size=child.pool_size)
+    return np.random.default_rng(seq)
+
+def sample_terminal(S0, mu, sigma, T, N, seed=None, chunk_size=EXACT_CHUNK_SIZE, dtype=np.float64):
+    """
+    N exact draws of S_T ~ N(S0 + mu*T, sigma^2 T): one normal per sample
+    instead of a path of steps, and no discretization error.
+    """
+    S_T = np.empty(N, dtype=dtype)
+
+    def fill(child, start, stop):
+        S_T[start:stop] = np.random.default_rng(child).standard_normal(stop - start, dtype=dtype)
+
+    _fill(N, seed, chunk_size, S_T, fill)
+    S_T *= sigma * np.sqrt(T)
+    S_T += S0 + mu * T
+    return S_T
+
+def bridge_extreme(a, b, sigma, h, E, kind='max'):
+    """
+    Maximum (or minimum) of a Brownian bridge from a to b over time h, by
+    inverting P(max >= m | a, b) = exp(-2 (m - a)(m - b) / (sigma^2 h))
+    at an Exp(1) draw E:
+        max = (a + b + sqrt((b - a)^2 + 2 sigma^2 h E)) / 2
+    The bridge does not depend on the drift.
+    """
+    root = np.sqrt((b - a) ** 2 + 2 * sigma ** 2 * h * E)
+    return 0.5 * (a + b + root) if kind == 'max' else 0.5 * (a + b - root)
+
+def sample_extreme(S0, mu, sigma, T, N, kind='max', seed=None, chunk_size=EXACT_CHUNK_SIZE, dtype=np.float64):
+    """
+    N exact joint draws of (S_T, running maximum) or, with kind='min',
+    (S_T, running minimum) over [0, T]: S_T first, then the extreme of the
+    Brownian bridge to it (see bridge_extreme). The reflection principle
+    makes this exact in O(N), where a time-stepped maximum is biased
+    towards S0 by O(sqrt(dt)).
+
+    S_T equals sample_terminal's for the same seed; the bridge draws come
+    from a separate stream spawned from each chunk's seed.
+    """
+    if kind not in EXTREMES:
+        raise ValueError(f"Unknown kind {kind!r}; expected one of {EXTREMES}")
+    S_T = sample_terminal(S0, mu, sigma, T, N, seed, chunk_size, dtype)
+    E = np.empty(N, dtype=dtype)
+
+    def fill(child, start, stop):
+        E[start:stop] = _stream(child, BRIDGE_STREAM).standard_exponential(stop - start, dtype=dtype)
+
+    _fill(N, seed, chunk_size, E, fill)
+    return S_T, bridge_extreme(S0, S_T, sigma, T, E, kind).astype(dtype, copy=False)
+
+def first_passage_time(S0, mu, sigma, barrier, N, seed=None, chunk_size=EXACT_CHUNK_SIZE):
+    """
+    N exact draws of the first time S hits barrier (above or below S0),
+    inf for paths that never do. With distance d and drift nu towards the
+    barrier, the hitting time is inverse Gaussian IG(d / nu, d^2 / sigma^2)
+    (Generator.wald) for nu > 0 and Levy, (d / sigma)^2 / Z^2, for nu = 0.
+    For nu < 0 the barrier is hit only with probability
+    exp(-2 |nu| d / sigma^2), and then at an IG(d / |nu|, d^2 / sigma^2) time.
+
+    Compare with T for barrier statistics over a horizon, e.g.
+    np.mean(first_passage_time(...) <= T).
+
+    The times come from their own streams, so they are independent of
+    sample_terminal and sample_extreme draws with the same seed, not joint
+    with them. For a hit indicator consistent with a sampled path, compare
+    the extreme of sample_extreme with the barrier instead.
+    """
+    d = abs(barrier - S0)
+    nu = mu if barrier >= S0 else -mu
+    tau = np.empty(N)
+    if d == 0:
+        tau[:] = 0.0
+        return tau
+
+    def fill(child, start, stop):
+        rng, n = _stream(child, PASSAGE_STREAM), stop - start
+        if nu == 0:
+            Z = rng.standard_normal(n)
+            with np.errstate(divide='ignore'):
+                tau[start:stop] = (d / sigma) ** 2 / (Z * Z)
+            return
+        tau[start:stop] = rng.wald(d / abs(nu), (d / sigma) ** 2, n)
+        if nu < 0:
+            U = _stream(child, SURVIVAL_STREAM).random(n)
+            tau[start:stop][U >= np.exp(2 * nu * d / sigma ** 2)] = np.inf
+
+    return _fill(N, seed, chunk_size, tau, fill)
+
+def hit_probability(S0, mu, sigma, T, barrier):
+    """
+    P(S touches barrier by T), from the reflection principle with drift:
+        N((nu T - d) / s) + exp(2 nu d / sigma^2) N((-nu T - d) / s),
+    s = sigma sqrt(T), with d and nu as in first_passage_time. The second
+    term is evaluated in log space so large drifts do not overflow.
+    Vectorized over all arguments.
+    """
+    from scipy.special import log_ndtr, ndtr
+
+    S0, mu, sigma, T, barrier = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (S0, mu, sigma, T, barrier)))
+    d = np.abs(barrier - S0)
+    nu = np.where(barrier >= S0, mu, -mu)
+    s = sigma * np.sqrt(T)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = ndtr((nu * T - d) / s) + np.exp(2 * nu * d / sigma ** 2 + log_ndtr((-nu * T - d) / s))
+    return np.where(d == 0, 1.0, np.minimum(p, 1.0))[()]
+
+def bridge_crossing_probability(S_left, S_right, barrier, sigma, h, upper=True):
+    """
+    Probability that the Brownian bridge between two sampled points h
+    apart touches barrier: 1 if either point is on or past it, otherwise
+        exp(-2 (barrier - S_left)(barrier - S_right) / (sigma^2 h)).
+    """
+    gap_left, gap_right = (barrier - S_left, barrier - S_right) if upper else (S_left - barrier, S_right - barrier)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        p = np.exp(-2 * gap_left * gap_right / (sigma ** 2 * h))
+    return np.where((gap_left <= 0) | (gap_right <= 0), 1.0, p)
+
+def path_hit_probability(t, S, barrier, sigma, upper=True):
+    """
+    Per-path probability that the continuous path behind each row of S
+    (sampled at times t) touched barrier: one minus the product of the
+    bridge non-crossing probabilities of every interval. Averaging it
+    removes the bias of checking only the sampled points, which misses
+    crossings between them. t may be non-uniform (e.g. a PathStore view).
+    """
+    h = np.diff(np.asarray(t, dtype=float))
+    p = bridge_crossing_probability(S[:, :-1], S[:, 1:], barrier, sigma, h, upper)
+    with np.errstate(divide='ignore'):
+        return -np.expm1(np.log1p(-p).sum(axis=1))
+
+def barrier_statistics(t, S, barrier, sigma, max_bytes=None):
+    """
+    Fraction of the rows of S whose sampled points reach barrier (above or
+    below S[:, 0], by its side of the start) and the bridge-corrected hit
+    probability (path_hit_probability) averaged over rows. S is processed
+    in row blocks with at most max_bytes (default DEFAULT_BLOCK_BYTES) of
+    temporaries, so large ensembles are not copied whole.
+    """
+    upper = barrier >= S[0, 0]
+    budget = DEFAULT_BLOCK_BYTES if max_bytes is None else max_bytes
+    # A few float64 temporaries per interval (gaps, probabilities, logs)
+    rows = max(1, budget // (32 * S.shape[1]))
+    sampled = corrected = 0.0
+    for start in range(0, len(S), rows):
+        block = S[start:start + rows]
+        sampled += np.count_nonzero(block.max(axis=1) >= barrier if upper else block.min(axis=1) <= barrier)
+        corrected += path_hit_probability(t, block, barrier, sigma, upper).sum()
+    return sampled / len(S), corrected / len(S)
@@ -0,0 +1,217 @@
+
+from functools import lru_cache
+
+import numpy as np
+
+from models.bachelier import time_grid
+from models.parallel import path_chunks, spawn_seeds
+
+# Paths per independently seeded chunk, as in models.parallel. Smaller
+# than there because fGn chunks go through a complex FFT of twice the
+# path length. Part of the reproducibility contract.
+DEFAULT_CHUNK_SIZE = 1024
+
+INCREMENTS = ('gaussian', 'fgn', 'student_t', 'stable')
+
+@lru_cache(maxsize=32)
+def fgn_circulant_eigenvalues(steps, H):
+    """
+    Eigenvalues of the 2*steps circulant matrix that embeds the
+    autocovariance of unit fractional Gaussian noise,
+        gamma(k) = (|k+1|^2H - 2|k|^2H + |k-1|^2H) / 2,
+    computed with one FFT. They are non-negative for every H in (0, 1),
+    which is what makes Davies-Harte exact. The result is cached and
+    read-only.
+    """
+    if not 0 < H < 1:
+        raise ValueError(f"H must be in (0, 1), got {H}")
+    k = np.arange(steps + 1, dtype=float)
+    gamma = 0.5 * (np.abs(k + 1) ** (2 * H) - 2 * k ** (2 * H) + np.abs(k - 1) ** (2 * H))
+    row = np.concatenate([gamma, gamma[-2:0:-1]])
+    lam = np.fft.fft(row).real
+    if lam.min() < -1e-10 * lam.max():
+        raise ValueError(f"circulant embedding is not positive for H={H}")
+    lam = np.maximum(lam, 0.0)
+    lam.flags.writeable = False
+    return lam
+
+def fractional_gaussian_noise(rng, N, steps, H):
+    """
+    N rows of unit fractional Gaussian noise (the increments of fBm on an
+    integer grid) by Davies-Harte circulant embedding: O(steps log steps)
+    per path instead of the O(steps^2) of a Cholesky factor, and exact.
+
+    Each complex FFT yields two independent rows (its real and imaginary
+    parts), and all rows of a call go through one batched FFT. Row i only
+    depends on the draws for rows up to i, so a longer call extends a
+    shorter one with the same generator state.
+    """
+    lam = fgn_circulant_eigenvalues(steps, H)
+    m = len(lam)
+    pairs = (N + 1) // 2
+    Z = rng.standard_normal((pairs, 2, m))
+    Y = np.fft.fft(np.sqrt(lam / m) * (Z[:, 0] + 1j * Z[:, 1]), axis=1)[:, :steps]
+    return np.stack([Y.real, Y.imag], axis=1).reshape(2 * pairs, steps)[:N]
+
+def student_t_shocks(rng, N, steps, nu):
+    """
+    Student-t shocks rescaled to unit variance, with power-law tails
+    P(|X| > x) ~ x^-nu. Needs nu > 2 for the variance to exist.
+    """
+    if nu <= 2:
+        raise ValueError(f"nu must be > 2 for unit-variance shocks, got {nu}")
+    return rng.standard_t(nu, size=(N, steps)) * np.sqrt((nu - 2) / nu)
+
+def stable_shocks(rng, N, steps, alpha, beta=0.0):
+    """
+    Alpha-stable shocks by the Chambers-Mallows-Stuck method, with
+    characteristic function exp(-|u|^alpha / 2) in the symmetric case, so
+    alpha=2 gives N(0, 1) and alpha < 2 tails P(|X| > x) ~ x^-alpha.
+    beta in [-1, 1] sets the skew; alpha=1 (Cauchy) must be symmetric.
+    """
+    if not 0 < alpha <= 2:
+        raise ValueError(f"alpha must be in (0, 2], got {alpha}")
+    if not -1 <= beta <= 1:
+        raise ValueError(f"beta must be in [-1, 1], got {beta}")
+    if alpha == 1 and beta != 0:
+        raise ValueError("alpha=1 is only supported with beta=0")
+
+    # Both uniforms of an element are drawn together so rows stay prefix-stable
+    U = rng.random((N, 2, steps))
+    V = np.pi * (U[:, 0] - 0.5)
+    W = -np.log1p(-U[:, 1])
+    scale = 0.5 ** (1 / alpha)
+    if alpha == 1:
+        return scale * np.tan(V)
+
+    B = np.arctan(beta * np.tan(np.pi * alpha / 2)) / alpha
+    S = (1 + (beta * np.tan(np.pi * alpha / 2)) ** 2) ** (1 / (2 * alpha))
+    X = (S * np.sin(alpha * (V + B)) / np.cos(V) ** (1 / alpha)
+         * (np.cos(V - alpha * (V + B)) / W) ** ((1 - alpha) / alpha))
+    return scale * X
+
+def draw_increments(kind, rng, N, steps, dt, **params):
+    """
+    Unit-sigma increments over steps of length dt, shape (N, steps):
+    - 'gaussian': sqrt(dt) * N(0, 1), i.e. Brownian motion
+    - 'fgn': fractional Brownian motion with Hurst exponent H (dt^H scaling)
+    - 'student_t': sqrt(dt) * unit-variance Student-t with nu degrees of freedom
+    - 'stable': dt^(1/alpha) * alpha-stable shocks (alpha, beta), a Levy flight
+    """
+    if kind == 'gaussian':
+        return np.sqrt(dt) * rng.standard_normal((N, steps))
+    if kind == 'fgn':
+        return dt ** params['H'] * fractional_gaussian_noise(rng, N, steps, params['H'])
+    if kind == 'student_t':
+        return np.sqrt(dt) * student_t_shocks(rng, N, steps, params['nu'])
+    if kind == 'stable':
+        alpha = params['alpha']
+        return dt ** (1 / alpha) * stable_shocks(rng, N, steps, alpha, params.get('beta', 0.0))
+    raise ValueError(f"Unknown increments {kind!r}; expected one of {INCREMENTS}")
+
+def stationary_distribution(transition):
+    """
+    Stationary probabilities of a row-stochastic transition matrix.
+    """
+    P = np.asarray(transition, dtype=float)
+    K = len(P)
+    A = np.vstack([P.T - np.eye(K), np.ones(K)])
+    b = np.concatenate([np.zeros(K), [1.0]])
+    return np.linalg.lstsq(A, b, rcond=None)[0].clip(0)
+
+def regime_chain(rng, N, steps, transition, initial=None):
+    """
+    N Markov chains over the regimes of `transition` (K x K, rows summing
+    to one, the switching probabilities per step). Returns the regime in
+    force during each step, shape (N, steps), as int8. The first regime is
+    drawn from `initial`, or from the stationary distribution if not given.
+
+    Vectorized over paths: one comparison against the cumulative
+    transition rows per step.
+    """
+    P = np.asarray(transition, dtype=float)
+    if P.ndim != 2 or P.shape[0] != P.shape[1] or not np.allclose(P.sum(axis=1), 1) or (P < 0).any():
+        raise ValueError("transition must be a square row-stochastic matrix")
+    p0 = stationary_distribution(P) if initial is None else np.asarray(initial, dtype=float)
+    cum = np.cumsum(P, axis=1)[:, :-1]
+
+    U = rng.random((N, steps))
+    regimes = np.empty((N, steps), dtype=np.int8)
+    regimes[:, 0] = np.searchsorted(np.cumsum(p0)[:-1] / p0.sum(), U[:, 0], side='right')
+    for k in range(1, steps):
+        regimes[:, k] = (U[:, k, None] >= cum[regimes[:, k - 1]]).sum(axis=1)
+    return regimes
+
+def _fill_chunks(out, seed, chunk_size, fill):
+    """
+    Calls fill(child, start, stop) for consecutive chunk_size row blocks
+    of out, each child being its own SeedSequence(seed).spawn() stream,
+    then turns the increments written to out[:, 1:] into paths in place.
+    """
+    out[:, 0] = 0.0
+    chunks = path_chunks(len(out), chunk_size)
+    for (start, stop), child in zip(chunks, spawn_seeds(seed, len(chunks))):
+        fill(child, start, stop)
+    np.cumsum(out, axis=1, out=out)
+    return out
+
+def simulate_fractal_paths(S0, mu, sigma, T, dt, N, increments='fgn', seed=None,
+                           chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64, **params):
+    """
+    Simulates N paths of S_t = S0 + mu*t + sigma*X_t, where X is driven by
+    non-Gaussian or long-memory increments (see draw_increments):
+        simulate_fractal_paths(100, 0, 20, 1.0, 0.001, 10000, 'fgn', H=0.7)
+        simulate_fractal_paths(100, 0, 20, 1.0, 0.001, 10000, 'stable', alpha=1.7)
+        simulate_fractal_paths(100, 0, 20, 1.0, 0.001, 10000, 'student_t', nu=3)
+
+    Seeding follows models.parallel: rows are generated in fixed chunks of
+    chunk_size, each from its own SeedSequence(seed).spawn() child, so for
+    a given seed the paths do not depend on how the work is split, and
+    the first n paths of a larger run equal a run of n paths.
+    Returns (t, S) with S of shape (N, steps+1).
+    """
+    steps, t = time_grid(T, dt)
+    out = np.empty((N, steps + 1), dtype=dtype)
+
+    def fill(child, start, stop):
+        out[start:stop, 1:] = draw_increments(increments, np.random.default_rng(child), stop - start, steps, dt, **params)
+
+    _fill_chunks(out, seed, chunk_size, fill)
+    out *= sigma
+    out += S0 + mu * t
+    return t, out
+
+def simulate_regime_switching(S0, mu, sigma, T, dt, N, transition, initial=None, increments='gaussian',
+                              seed=None, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64, **params):
+    """
+    Paths whose drift and volatility follow a Markov chain of regimes:
+    mu and sigma are scalars or length-K arrays (one value per regime) and
+    transition is the K x K per-step switching matrix, e.g. calm/turbulent
+        simulate_regime_switching(100, 0, [10, 40], 1.0, 0.001, 1000,
+                                  [[0.995, 0.005], [0.02, 0.98]])
+    Any kind of increments can drive the paths ('student_t' with nu=...).
+
+    The chain and the shocks use separate streams derived from each
+    chunk's seed, so the shocks are those of simulate_fractal_paths with
+    the same seed. Returns (t, S, regimes), with regimes of shape
+    (N, steps) giving the regime of each step.
+    """
+    steps, t = time_grid(T, dt)
+    K = len(transition)
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), (K,))
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=float), (K,))
+    out = np.empty((N, steps + 1), dtype=dtype)
+    regimes = np.empty((N, steps), dtype=np.int8)
+
+    def fill(child, start, stop):
+        # Spawning does not change the stream default_rng(child) produces
+        chain = regime_chain(np.random.default_rng(child.spawn(1)[0]), stop - start, steps, transition, initial)
+        X = draw_increments(increments, np.random.default_rng(child), stop - start, steps, dt, **params)
+        X *= sigma[chain]
+        X += mu[chain] * dt
+        out[start:stop, 1:] = X
+        regimes[start:stop] = chain
+
+    _fill_chunks(out, seed, chunk_size, fill)
+    out += S0
+    return t, out, regimes
@@ -0,0 +1,87 @@
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from models.bachelier import simulate_paths_into, time_grid
+
+# Paths per independently seeded chunk. Part of the reproducibility
+# contract: changing it changes the paths produced for a given seed.
+DEFAULT_CHUNK_SIZE = 4096
+
+def path_chunks(N, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Splits N paths into consecutive (start, stop) row ranges of chunk_size.
+    """
+    return [(start, min(start + chunk_size, N)) for start in range(0, N, chunk_size)]
+
+def spawn_seeds(seed, n):
+    """
+    Derives n independent child SeedSequences from seed
+    (an int, None or a SeedSequence).
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n)
+
+def _simulate_chunk(n_paths, steps, S0, mu, sigma, dt, dtype, seed):
+    out = np.empty((n_paths, steps + 1), dtype=dtype)
+    return simulate_paths_into(out, S0, mu, sigma, dt, seed)
+
+def simulate_paths_parallel(S0, mu, sigma, T, dt, N, seed=None, workers=None,
+                            executor='thread', chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64, out=None):
+    """
+    Simulates N ABM paths on a pool of workers.
+
+    The paths are cut into fixed chunks of chunk_size rows and every chunk
+    gets its own Generator from SeedSequence(seed).spawn(). Because the
+    chunking does not depend on the number of workers, the output is
+    bit-identical for a given seed whatever `workers` and `executor` are.
+
+    executor='thread' fills slices of one shared output array (NumPy
+    releases the GIL while generating and accumulating); executor='process'
+    runs chunks in separate interpreters and copies them back.
+    workers=None uses os.cpu_count(); workers=1 runs inline.
+
+    out may be a preallocated (N, steps+1) array to fill instead, e.g. a
+    memory-mapped .npy file from np.lib.format.open_memmap, so ensembles
+    larger than RAM are written straight to disk; dtype is then taken
+    from out.
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+
+    steps, t = time_grid(T, dt)
+    chunks = path_chunks(N, chunk_size)
+    seeds = spawn_seeds(seed, len(chunks))
+    if out is None:
+        S = np.empty((N, steps + 1), dtype=dtype)
+    elif out.shape != (N, steps + 1):
+        raise ValueError(f"out must have shape {(N, steps + 1)}, got {out.shape}")
+    else:
+        S, dtype = out, out.dtype
+
+    workers = min(workers or os.cpu_count() or 1, max(len(chunks), 1))
+
+    if workers == 1:
+        for (start, stop), child in zip(chunks, seeds):
+            simulate_paths_into(S[start:stop], S0, mu, sigma, dt, child)
+    elif executor == 'thread':
+        with ThreadPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(simulate_paths_into, S[start:stop], S0, mu, sigma, dt, child)
+                for (start, stop), child in zip(chunks, seeds)
+            ]
+            for future in futures:
+                future.result()
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(_simulate_chunk, stop - start, steps, S0, mu, sigma, dt, dtype, child)
+                for (start, stop), child in zip(chunks, seeds)
+            ]
+            for (start, stop), future in zip(chunks, futures):
+                S[start:stop] = future.result()
+
+    return t, S
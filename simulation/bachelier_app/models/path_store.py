@@ -0,0 +1,236 @@
+
+import threading
+
+import numpy as np
+
+class PathStore:
+    """
+    Multi-resolution ABM ensemble refined by Brownian-bridge interpolation.
+
+    The ensemble is first simulated on a coarse grid of step base_dt.
+    Each refinement level halves the step by inserting the midpoint of
+    every interval, drawn from the Brownian bridge between its two
+    endpoints:
+        S_mid = (S_left + S_right) / 2 + sigma * sqrt(h / 4) * Z
+    (for ABM the bridge does not depend on mu). Existing points are never
+    changed, so every resolution shows the same paths, and finer levels
+    are only computed when a smaller dt is requested.
+
+    Random numbers are keyed by (level, path block, time tile) through
+    SeedSequence spawn keys, so the result for a given seed does not
+    depend on the order in which levels are requested. Only the finest
+    materialized level is kept; coarser grids are strided views of it.
+
+    Every shock depends only on its (level, path, step) position, so a
+    store with fewer paths or a shorter horizon is a prefix of a larger
+    one. extend() appends paths or steps by simulating just the
+    difference, and truncate() or the N and T of view() cut it back down.
+
+    T is snapped to a whole number of base_dt steps. A store may be shared
+    between threads; refinement is serialized by a lock.
+    """
+
+    def __init__(self, S0, mu, sigma, T, N, seed=None, base_dt=0.01, max_level=8,
+                 block_size=1024, tile_steps=256):
+        self.S0 = S0
+        self.mu = mu
+        self.sigma = sigma
+        self.N = N
+        self.base_dt = base_dt
+        self.max_level = max_level
+        self.block_size = block_size
+        self.tile_steps = tile_steps
+        self.base_steps = max(1, int(round(T / base_dt)))
+        self.seed_seq = np.random.SeedSequence(seed)
+
+        self._lock = threading.RLock()
+        self.level = 0
+        self._S = self._simulate_base(0, N, 0, self.base_steps, S0)
+        self._S.flags.writeable = False
+
+    @property
+    def T(self):
+        return self.base_steps * self.base_dt
+
+    @property
+    def nbytes(self):
+        return self._S.nbytes
+
+    def step(self, level=None):
+        """
+        Time step of the grid at the given level (default: finest computed).
+        """
+        level = self.level if level is None else level
+        return self.base_dt / 2 ** level
+
+    def _rng(self, level, block, tile):
+        seq = np.random.SeedSequence(self.seed_seq.entropy, spawn_key=(level, block, tile))
+        return np.random.default_rng(seq)
+
+    def _add_shocks(self, out, level, r0, c0, scale):
+        """
+        Adds scale * Z to out, which holds paths r0.. and intervals c0.. of
+        the given level, with Z the level's shocks at those positions.
+        Shocks are drawn as whole (path block, time tile) arrays and sliced,
+        so each one depends only on its position, never on N or T. Tiles
+        are tile_steps intervals of their own level, so extending T at a
+        fine level redraws one short tile rather than a long one.
+        """
+        rows, cols = out.shape
+        per_tile = self.tile_steps
+        for block in range(r0 // self.block_size, (r0 + rows - 1) // self.block_size + 1):
+            b0 = block * self.block_size
+            lo, hi = max(r0, b0), min(r0 + rows, b0 + self.block_size)
+            for tile in range(c0 // per_tile, (c0 + cols - 1) // per_tile + 1):
+                t0 = tile * per_tile
+                a, b = max(c0, t0), min(c0 + cols, t0 + per_tile)
+                # Rows of one draw are a prefix of a larger draw's, so only rows up to hi are drawn
+                Z = self._rng(level, block, tile).standard_normal((hi - b0, per_tile))
+                out[lo - r0:hi - r0, a - c0:b - c0] += scale * Z[lo - b0:, a - t0:b - t0]
+
+    def _simulate_base(self, r0, r1, c0, c1, start):
+        """
+        Base-level points of paths r0:r1 over intervals c0:c1, continuing
+        from start (their values at interval c0).
+        """
+        h = self.base_dt
+        S = np.empty((r1 - r0, c1 - c0 + 1))
+        S[:, 0] = start
+        S[:, 1:] = self.mu * h
+        self._add_shocks(S[:, 1:], 0, r0, c0, self.sigma * np.sqrt(h))
+        np.cumsum(S, axis=1, out=S)
+        return S
+
+    def _refine_region(self, coarse, level, r0, c0):
+        """
+        Inserts the bridge midpoints of level into coarse, which holds paths
+        r0.. from interval c0 of level - 1.
+        """
+        n_intervals = coarse.shape[1] - 1
+        fine = np.empty((len(coarse), 2 * n_intervals + 1))
+        fine[:, ::2] = coarse
+        mid = fine[:, 1::2]
+        np.add(coarse[:, :-1], coarse[:, 1:], out=mid)
+        mid *= 0.5
+        self._add_shocks(mid, level, r0, c0, self.sigma * np.sqrt(self.step(level - 1) / 4))
+        return fine
+
+    def _simulate_region(self, r0, r1, c0, c1, start):
+        """
+        Paths r0:r1 over base intervals c0:c1 at the finest materialized
+        level, exactly as a fresh store of that size would have them.
+        """
+        S = self._simulate_base(r0, r1, c0, c1, start)
+        for level in range(1, self.level + 1):
+            S = self._refine_region(S, level, r0, c0 * 2 ** (level - 1))
+        return S
+
+    def _refine_once(self):
+        fine = self._refine_region(self._S, self.level + 1, 0, 0)
+        fine.flags.writeable = False
+        self._S = fine
+        self.level += 1
+
+    def _steps_for(self, T):
+        return max(1, int(round(T / self.base_dt)))
+
+    def horizon(self, T=None):
+        """
+        The horizon a view up to T covers: T rounded to whole base_dt steps.
+        """
+        return self.T if T is None else self._steps_for(T) * self.base_dt
+
+    def extend(self, N=None, T=None):
+        """
+        Grows the ensemble to at least N paths and horizon T, simulating
+        only the new part at the current level. ABM is Markov, so later
+        steps continue from the last column and new paths are independent
+        of the old ones; either way the store ends up identical to a fresh
+        one of the new size, so results stay deterministic for a seed.
+        """
+        with self._lock:
+            S = self._S
+            if T is not None and self._steps_for(T) > self.base_steps:
+                steps = self._steps_for(T)
+                tail = self._simulate_region(0, self.N, self.base_steps, steps, S[:, -1])
+                S = np.hstack([S, tail[:, 1:]])
+                self.base_steps = steps
+            if N is not None and N > self.N:
+                S = np.vstack([S, self._simulate_region(self.N, N, 0, self.base_steps, self.S0)])
+                self.N = N
+            if S is not self._S:
+                S.flags.writeable = False
+                self._S = S
+        return self
+
+    def truncate(self, N=None, T=None):
+        """
+        Keeps only the first N paths up to horizon T, releasing the rest.
+        Smaller ensembles are prefixes of larger ones, so extending again
+        recomputes exactly the values dropped here. (view() can slice a
+        smaller ensemble without truncating.)
+        """
+        with self._lock:
+            n_paths = self.N if N is None else min(N, self.N)
+            steps = self.base_steps if T is None else min(self._steps_for(T), self.base_steps)
+            if (n_paths, steps) != (self.N, self.base_steps):
+                S = self._S[:n_paths, :steps * 2 ** self.level + 1].copy()
+                S.flags.writeable = False
+                self._S, self.N, self.base_steps = S, n_paths, steps
+        return self
+
+    def level_for_dt(self, dt):
+        """
+        Coarsest level whose step is no larger than dt (capped at max_level).
+        """
+        level = 0
+        while level < self.max_level and self.step(level) > dt * (1 + 1e-9):
+            level += 1
+        return level
+
+    def refine_to(self, level):
+        with self._lock:
+            while self.level < min(level, self.max_level):
+                self._refine_once()
+
+    def view(self, dt, level=None, N=None, T=None):
+        """
+        Returns (t, S) sampled every dt (rounded down to the grid) from the
+        given level, refining first if needed. The last point is always T.
+        N and T select the first N paths up to horizon T (default: all),
+        extending the store first if it is smaller. T is rounded to whole
+        base_dt steps (see horizon), so t[-1] is the horizon that was
+        actually simulated and the one to compare theory against.
+        """
+        level = self.level_for_dt(dt) if level is None else level
+        with self._lock:
+            self.extend(N, T)
+            self.refine_to(level)
+            S, finest = self._S, self.level
+            n_paths = self.N if N is None else N
+            steps = self.base_steps if T is None else self._steps_for(T)
+        S = S[:n_paths, :steps * 2 ** finest + 1]
+
+        h = self.step(level)
+        coarsen = 2 ** (finest - level)
+        stride = coarsen * max(1, int(dt / h + 1e-9))
+        n = S.shape[1] - 1
+
+        if n % stride == 0:
+            cols = slice(None, None, stride)
+        else:
+            cols = np.append(np.arange(0, n + 1, stride), n)
+        t = np.arange(n + 1)[cols] * self.step(finest)
+        return t, S[:, cols]
+
+    def refine_iter(self, dt, N=None, T=None):
+        """
+        Progressive refinement towards dt: yields (level, t, S) for the
+        current finest level and then for each newly computed level, so a
+        UI can show the coarse ensemble while finer levels are computed.
+        """
+        self.extend(N, T)
+        target = self.level_for_dt(dt)
+        for level in range(min(self.level, target), target + 1):
+            self.refine_to(level)
+            yield (level,) + self.view(dt, level, N, T)
@@ -0,0 +1,217 @@
+
+from collections import namedtuple
+
+import numpy as np
+
+from models.bachelier import DEFAULT_BLOCK_BYTES, time_grid
+from models.parallel import path_chunks, spawn_seeds
+
+# Random portfolios per independently seeded block. Part of the
+# reproducibility contract of sample_portfolios, like the chunk sizes of
+# models.parallel.
+PORTFOLIO_CHUNK_SIZE = 16384
+
+FACTOR_METHODS = ('cholesky', 'eigen')
+
+# Points on an efficient frontier, ordered by risk: weights (points, d),
+# expected return and standard deviation per unit time.
+Frontier = namedtuple('Frontier', ['weights', 'mean', 'std'])
+
+def covariance_matrix(sigma, corr):
+    """
+    Covariance from per-asset volatilities and a correlation matrix.
+    """
+    sigma = np.asarray(sigma, dtype=float)
+    return np.asarray(corr, dtype=float) * np.outer(sigma, sigma)
+
+def covariance_factor(cov, method='cholesky'):
+    """
+    A matrix L with L @ L.T == cov, so correlated shocks are Z @ L.T.
+    'cholesky' needs cov positive definite; 'eigen' (V * sqrt(lambda))
+    also accepts singular, positive semi-definite matrices, e.g. sample
+    covariances of fewer observations than assets, and clips round-off
+    negative eigenvalues to zero.
+    """
+    cov = np.asarray(cov, dtype=float)
+    if cov.ndim != 2 or cov.shape[0] != cov.shape[1]:
+        raise ValueError(f"cov must be a square matrix, got shape {cov.shape}")
+    if method == 'cholesky':
+        return np.linalg.cholesky(cov)
+    if method == 'eigen':
+        lam, V = np.linalg.eigh(cov)
+        if lam.min() < -1e-10 * max(lam.max(), 1.0):
+            raise ValueError("cov is not positive semi-definite")
+        return V * np.sqrt(np.clip(lam, 0, None))
+    raise ValueError(f"Unknown method {method!r}; expected one of {FACTOR_METHODS}")
+
+def _correlated_increments(rng, n_paths, steps, dt, mu, L):
+    """
+    (n_paths, steps, d) ABM increments mu*dt + sqrt(dt) * Z @ L.T, with
+    the shocks of all paths and steps mapped through L in one product.
+    """
+    Z = rng.standard_normal((n_paths, steps, L.shape[1]))
+    dS = Z @ (np.sqrt(dt) * L.T)
+    dS += mu * dt
+    return dS
+
+def simulate_assets(S0, mu, cov, T, dt, N, seed=None, factor='cholesky',
+                    chunk_size=PORTFOLIO_CHUNK_SIZE, dtype=np.float64):
+    """
+    Simulates N paths of d correlated Bachelier assets,
+        dS = mu dt + L dW,  L @ L.T = cov,
+    with S0 and mu of length d (or scalars) and cov the d x d covariance
+    per unit time. Returns (t, S) with S of shape (N, steps+1, d).
+
+    Paths are generated in fixed blocks of chunk_size, each from its own
+    SeedSequence(seed).spawn() child as in models.parallel, so the first n
+    paths of a larger run equal a run of n paths. Each block draws all of
+    its shocks at once and correlates them with a single matrix product.
+    """
+    L = covariance_factor(cov, factor)
+    d = len(L)
+    S0 = np.broadcast_to(np.asarray(S0, dtype=float), (d,))
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), (d,))
+    steps, t = time_grid(T, dt)
+
+    S = np.empty((N, steps + 1, d), dtype=dtype)
+    S[:, 0] = 0.0
+    chunks = path_chunks(N, chunk_size)
+    for (start, stop), child in zip(chunks, spawn_seeds(seed, len(chunks))):
+        S[start:stop, 1:] = _correlated_increments(np.random.default_rng(child), stop - start, steps, dt, mu, L)
+    np.cumsum(S, axis=1, out=S)
+    S += S0
+    return t, S
+
+def random_weights(rng, n, d, concentration=1.0):
+    """
+    n long-only weight vectors drawn uniformly from the simplex
+    (Dirichlet(concentration), 1 = uniform), as an (n, d) array.
+    """
+    if concentration == 1:
+        # Gamma(1) is exponential, which NumPy draws several times faster
+        W = rng.standard_exponential((n, d))
+    else:
+        W = rng.standard_gamma(concentration, size=(n, d))
+    W /= W.sum(axis=1, keepdims=True)
+    return W
+
+def portfolio_stats(weights, mean, cov):
+    """
+    Expected return and variance of every row of weights (P, d): one
+    (P, d) x (d, d) product and a row-wise dot, no loop over portfolios.
+    """
+    W = np.asarray(weights, dtype=float)
+    return W @ np.asarray(mean, dtype=float), np.einsum('pd,pd->p', W @ np.asarray(cov, dtype=float), W)
+
+def sample_portfolios(n, mean, cov, seed=None, concentration=1.0, keep_weights=False,
+                      chunk_size=PORTFOLIO_CHUNK_SIZE, max_bytes=None):
+    """
+    Evaluates n random long-only portfolios (see random_weights) against
+    mean and cov. Returns a dict of arrays of length n: 'mean', 'std' and
+    'sharpe' (mean / std), plus 'weights' (n, d) if keep_weights.
+
+    Weights are drawn in seeded blocks of chunk_size and evaluated
+    max_bytes at a time (default DEFAULT_BLOCK_BYTES), so 10^6 portfolios
+    over hundreds of assets never hold all weights in memory unless they
+    are kept. For a given seed the result does not depend on max_bytes.
+    """
+    mean = np.asarray(mean, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    d = len(mean)
+    budget = DEFAULT_BLOCK_BYTES if max_bytes is None else max_bytes
+    # Weights and W @ cov per row, in whole seeded chunks
+    per_batch = max(1, budget // (16 * d * chunk_size)) * chunk_size
+
+    out = {'mean': np.empty(n), 'std': np.empty(n)}
+    if keep_weights:
+        out['weights'] = np.empty((n, d))
+    chunks = path_chunks(n, chunk_size)
+    seeds = spawn_seeds(seed, len(chunks))
+    for first in range(0, len(chunks), per_batch // chunk_size):
+        batch = range(first, min(first + per_batch // chunk_size, len(chunks)))
+        W = np.concatenate([
+            random_weights(np.random.default_rng(seeds[i]), chunks[i][1] - chunks[i][0], d, concentration)
+            for i in batch
+        ])
+        start, stop = chunks[batch[0]][0], chunks[batch[-1]][1]
+        out['mean'][start:stop], variance = portfolio_stats(W, mean, cov)
+        out['std'][start:stop] = np.sqrt(np.maximum(variance, 0))
+        if keep_weights:
+            out['weights'][start:stop] = W
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['sharpe'] = out['mean'] / out['std']
+    return out
+
+def efficient_frontier(mean, cov, targets=None, n_points=50):
+    """
+    Closed-form mean-variance frontier with short selling allowed
+    (weights sum to one, no other constraint). For target returns m,
+        w(m) = cov^-1 ((C - B m) 1 + (A m - B) mu) / (A C - B^2),
+    with A = 1'cov^-1 1, B = 1'cov^-1 mu, C = mu'cov^-1 mu. One linear
+    solve against [1, mu] covers every target. Targets default to
+    n_points from the minimum-variance return to the largest asset mean.
+    """
+    mean = np.asarray(mean, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    ones = np.ones_like(mean)
+    inv_ones, inv_mean = np.linalg.solve(cov, np.column_stack([ones, mean])).T
+    A, B, C = ones @ inv_ones, ones @ inv_mean, mean @ inv_mean
+    D = A * C - B * B
+
+    if targets is None:
+        targets = np.linspace(B / A, mean.max(), n_points)
+    targets = np.asarray(targets, dtype=float)
+    W = (np.outer(C - B * targets, inv_ones) + np.outer(A * targets - B, inv_mean)) / D
+    variance = (A * targets ** 2 - 2 * B * targets + C) / D
+    return Frontier(W, targets, np.sqrt(np.maximum(variance, 0)))
+
+def project_to_simplex(V):
+    """
+    Euclidean projection of every row of V onto the probability simplex
+    (Duchi et al. 2008), vectorized over rows with one sort.
+    """
+    V = np.asarray(V, dtype=float)
+    U = -np.sort(-V, axis=-1)
+    css = np.cumsum(U, axis=-1) - 1
+    k = np.arange(1, V.shape[-1] + 1)
+    rho = np.count_nonzero(U - css / k > 0, axis=-1)
+    theta = np.take_along_axis(css, (rho - 1)[..., None], axis=-1) / rho[..., None]
+    return np.maximum(V - theta, 0)
+
+def long_only_frontier(mean, cov, n_points=50, tol=1e-10, max_iter=5000):
+    """
+    Mean-variance frontier without short sales (weights on the simplex).
+
+    Each point minimizes w'cov w - lam * mu'w for one risk tolerance lam,
+    from 0 (minimum variance) up to where the best single asset wins.
+    All points are solved together by accelerated projected gradient
+    (FISTA) with step 1 / (2 * largest eigenvalue of cov): every iteration
+    is one (points, d) x (d, d) product and one batched simplex projection.
+    Stops when no weight moves by more than tol.
+    """
+    mean = np.asarray(mean, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    d = len(mean)
+    lipschitz = 2 * np.linalg.eigvalsh(cov)[-1]
+    step = 1.0 / lipschitz
+
+    # Past lam_max the return term dominates every variance difference
+    spread = np.ptp(mean)
+    lam_max = 4 * lipschitz / spread if spread > 0 else 1.0
+    lam = np.concatenate([[0.0], np.geomspace(lam_max * 1e-4, lam_max, n_points - 1)])[:, None]
+
+    W = np.full((n_points, d), 1.0 / d)
+    Y, momentum = W, 1.0
+    for _ in range(max_iter):
+        W_next = project_to_simplex(Y - step * (2 * Y @ cov - lam * mean))
+        momentum_next = 0.5 * (1 + np.sqrt(1 + 4 * momentum * momentum))
+        Y = W_next + ((momentum - 1) / momentum_next) * (W_next - W)
+        converged = np.abs(W_next - W).max() <= tol
+        W, momentum = W_next, momentum_next
+        if converged:
+            break
+
+    expected, variance = portfolio_stats(W, mean, cov)
+    order = np.argsort(variance)
+    return Frontier(W[order], expected[order], np.sqrt(np.maximum(variance[order], 0)))
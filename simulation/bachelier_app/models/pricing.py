@@ -0,0 +1,216 @@
+
+import numpy as np
+
+from models.bachelier import simulate_paths
+
+OPTION_KINDS = ('call', 'put', 'digital_call', 'digital_put')
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+def _npdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+def _kind_masks(kind, shape):
+    kind = np.broadcast_to(np.asarray(kind), shape)
+    unknown = ~np.isin(kind, OPTION_KINDS)
+    if unknown.any():
+        raise ValueError(f"Unknown option kind {kind[unknown][0]!r}; choose from {OPTION_KINDS}")
+    return {k: kind == k for k in OPTION_KINDS}
+
+def _inputs(F, K, T, sigma, r, kind):
+    from scipy.special import ndtr
+
+    F, K, T, sigma, r, _ = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (F, K, T, sigma, r)),
+                                               np.empty(np.shape(kind)))
+    masks = _kind_masks(kind, F.shape)
+    sqrt_T = np.sqrt(T)
+    s = sigma * sqrt_T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = (F - K) / s
+    return F, K, T, sigma, r, masks, sqrt_T, s, d, ndtr(d), np.exp(-r * T)
+
+def _log_time_value(s, x):
+    """
+    log of the normalized time value v(s) = s n(z) - x N(-z), z = x / s,
+    written as s exp(-z^2/2) b(z) with b(z) = 1/sqrt(2 pi) - z erfcx(z/sqrt 2)/2
+    (its asymptotic series beyond z = 50) so deep out-of-the-money quotes
+    do not cancel to zero.
+    Returns (log v, d log v / d log s).
+    """
+    from scipy.special import erfcx
+
+    z = np.minimum(x / s, 1e100)
+    small = z <= 50
+    zs = np.where(small, z, 50.0)
+    zl = np.where(small, 50.0, z)
+    w = zl ** -2
+    bracket = np.where(
+        small,
+        1 / SQRT_2PI - zs * 0.5 * erfcx(zs / np.sqrt(2)),
+        w * (1 - w * (3 - w * (15 - w * (105 - w * 945)))) / SQRT_2PI
+    )
+    log_v = np.log(s) - 0.5 * z * z + np.log(bracket)
+    # dv/ds = n(z), so d log v / d log s = s n(z) / v
+    slope = 1 / (SQRT_2PI * bracket)
+    return log_v, slope
+
+def bachelier_price(F, K, T, sigma, kind='call', r=0.0):
+    """
+    Closed-form Bachelier (normal model) prices, vectorized over all inputs.
+
+    F is the forward (S0 + mu*T in this app), sigma the normal volatility
+    and r a continuously compounded discount rate. kind is one of
+    OPTION_KINDS or an array of them, so mixed chains price in one pass:
+        call = DF * ((F-K) N(d) + sigma sqrt(T) n(d)),  d = (F-K) / (sigma sqrt(T))
+        put  = DF * ((K-F) N(-d) + sigma sqrt(T) n(d))
+        digital call = DF * N(d),  digital put = DF * N(-d)
+    """
+    F, K, T, sigma, r, m, sqrt_T, s, d, Nd, df = _inputs(F, K, T, sigma, r, kind)
+    # Vanilla prices as intrinsic + time value, so far out-of-the-money
+    # prices keep full relative precision instead of cancelling
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        tv = np.where(s > 0, np.exp(_log_time_value(s, np.abs(F - K))[0]), 0.0)
+
+    price = np.select(
+        [m['call'], m['put'], m['digital_call'], m['digital_put']],
+        [np.maximum(F - K, 0) + tv, np.maximum(K - F, 0) + tv, Nd, 1 - Nd]
+    )
+    return df * price
+
+def bachelier_greeks(F, K, T, sigma, kind='call', r=0.0):
+    """
+    Closed-form Greeks of bachelier_price, vectorized like it.
+    Returns a dict of arrays: price, delta and gamma (w.r.t. F), vega and
+    volga (w.r.t. sigma), vanna, theta (-dV/dT at fixed F) and rho (dV/dr).
+    """
+    F, K, T, sigma, r, m, sqrt_T, s, d, Nd, df = _inputs(F, K, T, sigma, r, kind)
+    nd = _npdf(d)
+    price = bachelier_price(F, K, T, sigma, kind, r)
+
+    vanilla = m['call'] | m['put']
+    digital = m['digital_call'] | m['digital_put']
+    # Digital puts are DF minus digital calls, so their sensitivities flip sign
+    sign = np.where(m['digital_put'], -1.0, 1.0)
+
+    delta = np.select([m['call'], m['put'], digital], [df * Nd, -df * (1 - Nd), sign * df * nd / s])
+    gamma = np.where(vanilla, df * nd / s, sign * -df * d * nd / s ** 2)
+    vega = np.where(vanilla, df * sqrt_T * nd, sign * -df * nd * d / sigma)
+    vanna = np.where(vanilla, -df * nd * d / sigma, sign * df * nd * (d * d - 1) / (sigma * s))
+    volga = np.where(vanilla, df * sqrt_T * nd * d * d / sigma, sign * -df * nd * d * (d * d - 2) / sigma ** 2)
+
+    # -dV/dT = r V - DF du/dT, where u is the undiscounted price
+    du_dT = np.where(vanilla, sigma * nd / (2 * sqrt_T), sign * -nd * d / (2 * T))
+    theta = r * price - df * du_dT
+    rho = -T * price
+
+    return {
+        'price': price,
+        'delta': delta,
+        'gamma': gamma,
+        'vega': vega,
+        'theta': theta,
+        'rho': rho,
+        'vanna': vanna,
+        'volga': volga,
+    }
+
+def implied_normal_vol(price, F, K, T, kind='call', r=0.0, tol=1e-12, max_iter=100):
+    """
+    Implied Bachelier volatility of call/put prices, solved for all quotes
+    at once.
+
+    The price is reduced to its time value v = u - intrinsic, which is the
+    same for a call and a put at the same strike and increases with
+    s = sigma sqrt(T):
+        v(s) = s n(x/s) - x N(-x/s),  x = |F - K|
+    s is bracketed by [max(sqrt(2 pi) v, x / 40), sqrt(2 pi) (v + x)] and
+    solved by Newton steps on log v against log s, falling back to
+    bisection whenever a step leaves the bracket. Quotes below intrinsic
+    value give NaN, quotes at intrinsic value give 0. Quotes with T <= 0
+    give NaN, since no volatility acts over no time.
+    """
+    price, F, K, T, r, _ = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (price, F, K, T, r)),
+                                               np.empty(np.shape(kind)))
+    m = _kind_masks(kind, price.shape)
+    if (m['digital_call'] | m['digital_put']).any():
+        raise ValueError("Implied volatility is only defined here for calls and puts")
+
+    undiscounted = price * np.exp(r * T)
+    intrinsic = np.where(m['call'], np.maximum(F - K, 0), np.maximum(K - F, 0))
+    v = undiscounted - intrinsic
+    x = np.abs(F - K)
+
+    s = np.zeros(price.shape)
+    undefined = (v < 0) | (T <= 0)
+    active = (v > 0) & ~undefined
+    va, xa = v[active], x[active]
+    target = np.log(va)
+    # In the money, v is a small difference of larger numbers; stop once
+    # log v is matched to the precision it was given with
+    noise = 8 * np.finfo(float).eps * (1 + intrinsic[active] / va)
+    # Beyond z = x/s = 40 the time value is below x e^-800, i.e. zero in double precision
+    lo = np.log(np.maximum(SQRT_2PI * va, xa / 40))
+    hi = np.log(SQRT_2PI * (va + xa))
+    u = hi.copy()
+
+    idx = np.arange(len(u))
+    for _ in range(max_iter):
+        log_v, slope = _log_time_value(np.exp(u[idx]), xa[idx])
+        err = log_v - target[idx]
+        above = err > 0
+        hi[idx] = np.where(above, u[idx], hi[idx])
+        lo[idx] = np.where(above, lo[idx], u[idx])
+
+        step = err / slope
+        done = (np.abs(step) <= tol) | (np.abs(err) <= noise[idx]) | (hi[idx] - lo[idx] <= tol)
+        u_new = u[idx] - step
+        outside = (u_new < lo[idx]) | (u_new > hi[idx])
+        u[idx] = np.where(outside & ~done, 0.5 * (lo[idx] + hi[idx]), u_new)
+        idx = idx[~done]
+        if not len(idx):
+            break
+
+    s[active] = np.exp(u)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(undefined, np.nan, s / np.sqrt(T))
+
+def mc_price(S0, mu, sigma, T, K, kind='call', r=0.0, N=100000, dt=None, seed=None, sampler='standard'):
+    """
+    Monte Carlo prices for an array of strikes from one simulate_paths
+    ensemble. dt defaults to T (a single step), since the payoffs only
+    depend on S_T. Returns (price, standard error) arrays shaped like K.
+    """
+    dt = T if dt is None else dt
+    _, S = simulate_paths(S0, mu, sigma, T, dt, N, seed=seed, sampler=sampler)
+    S_T = S[:, -1]
+    K = np.asarray(K, dtype=float)
+    strikes = K.ravel()
+    kinds = np.broadcast_to(np.asarray(kind), K.shape).ravel()
+
+    prices = np.empty(len(strikes))
+    stderr = np.empty(len(strikes))
+    chunk = max(1, 2 ** 24 // max(N, 1))
+    for start in range(0, len(strikes), chunk):
+        k = strikes[start:start + chunk]
+        kd = kinds[start:start + chunk]
+        diff = S_T[:, None] - k
+        payoff = np.select(
+            [kd == 'call', kd == 'put', kd == 'digital_call', kd == 'digital_put'],
+            [np.maximum(diff, 0), np.maximum(-diff, 0), (diff > 0).astype(float), (diff < 0).astype(float)]
+        )
+        prices[start:start + chunk] = payoff.mean(axis=0)
+        stderr[start:start + chunk] = payoff.std(axis=0, ddof=1) / np.sqrt(N)
+
+    df = np.exp(-r * T)
+    return (df * prices).reshape(K.shape), (df * stderr).reshape(K.shape)
+
+def mc_check(S0, mu, sigma, T, K, kind='call', r=0.0, N=100000, seed=None, sampler='standard'):
+    """
+    Batch-verifies bachelier_price against mc_price. Returns the z-scores
+    (closed form - Monte Carlo) / standard error per strike; values well
+    beyond ±4 point to a mismatch.
+    """
+    closed = bachelier_price(S0 + mu * T, K, T, sigma, kind, r)
+    mc, stderr = mc_price(S0, mu, sigma, T, K, kind, r, N=N, seed=seed, sampler=sampler)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(stderr > 0, (closed - mc) / stderr, 0.0)
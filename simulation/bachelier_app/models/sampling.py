@@ -0,0 +1,123 @@
+
+import warnings
+
+import numpy as np
+
+SAMPLERS = ('standard', 'antithetic', 'moment_matching', 'sobol')
+
+# scipy.stats.qmc.Sobol supports at most this many dimensions (time steps)
+MAX_SOBOL_STEPS = 21201
+
+def antithetic_normals(rng, N, steps):
+    """
+    Standard normal shocks in antithetic pairs: rows N/2.. are the
+    negatives of rows 0..N/2, so every odd moment of the shocks is
+    exactly zero. An odd N gets one unpaired final row.
+    """
+    half = N // 2
+    Z = np.empty((N, steps))
+    Z[:half] = rng.normal(0, 1, size=(half, steps))
+    np.negative(Z[:half], out=Z[half:2 * half])
+    if N % 2:
+        Z[-1] = rng.normal(0, 1, size=steps)
+    return Z
+
+def moment_matched_normals(rng, N, steps):
+    """
+    Standard normal shocks rescaled so that, at every time step, their
+    sample mean is exactly 0 and their sample variance exactly 1.
+    With fewer than two paths there is no variance to match and the draws
+    are returned as they are; a step with zero spread is only centered.
+    """
+    Z = rng.normal(0, 1, size=(N, steps))
+    if N < 2:
+        return Z
+    Z -= Z.mean(axis=0)
+    std = Z.std(axis=0)
+    np.divide(Z, std, out=Z, where=std > 0)
+    return Z
+
+def bridge_schedule(steps):
+    """
+    Brownian-bridge construction order on grid indices 0..steps: the end
+    point first, then midpoints of ever finer intervals (breadth first).
+    Returns a list of (index, left, right) with left=None for the end point.
+    """
+    schedule = [(steps, None, None)]
+    intervals = [(0, steps)]
+    while intervals:
+        finer = []
+        for left, right in intervals:
+            if right - left < 2:
+                continue
+            mid = (left + right) // 2
+            schedule.append((mid, left, right))
+            finer += [(left, mid), (mid, right)]
+        intervals = finer
+    return schedule
+
+def sobol_bridge_normals(N, steps, seed=None):
+    """
+    Scrambled Sobol shocks with Brownian-bridge ordering.
+
+    Each Sobol point (one per path) is mapped to normals and used to build
+    a unit-step Brownian path in bridge order, so the first, best
+    distributed dimensions fix the terminal value and the coarse shape.
+    The path increments are returned as (N, steps) unit normals, ready to
+    be scaled like ordinary shocks. N a power of 2 gives the best balance.
+    """
+    from scipy.special import ndtri
+    from scipy.stats import qmc
+
+    if steps > MAX_SOBOL_STEPS:
+        raise ValueError(f"Sobol sampling supports at most {MAX_SOBOL_STEPS} steps, got {steps}")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)  # balance warning for N not a power of 2
+        U = qmc.Sobol(d=steps, scramble=True, seed=seed).random(N)
+    X = ndtri(U)
+
+    W = np.zeros((N, steps + 1))
+    for dim, (index, left, right) in enumerate(bridge_schedule(steps)):
+        if left is None:
+            W[:, index] = np.sqrt(steps) * X[:, dim]
+            continue
+        span = right - left
+        w_left, w_right = (right - index) / span, (index - left) / span
+        std = np.sqrt((index - left) * (right - index) / span)
+        W[:, index] = w_left * W[:, left] + w_right * W[:, right] + std * X[:, dim]
+
+    return np.diff(W, axis=1)
+
+def draw_normals(sampler, rng, N, steps, seed=None):
+    """
+    (N, steps) standard normal shocks from the named sampler.
+    rng is the RandomState used by the pseudo-random samplers.
+    """
+    if sampler == 'standard':
+        return rng.normal(0, 1, size=(N, steps))
+    if sampler == 'antithetic':
+        return antithetic_normals(rng, N, steps)
+    if sampler == 'moment_matching':
+        return moment_matched_normals(rng, N, steps)
+    if sampler == 'sobol':
+        return sobol_bridge_normals(N, steps, seed)
+    raise ValueError(f"Unknown sampler {sampler!r}; choose from {SAMPLERS}")
+
+def control_variate_mean(values, controls, control_mean):
+    """
+    Control-variate estimate of E[values] using controls with a known
+    expectation control_mean (e.g. S_T, whose mean S0 + mu*T is given by
+    theoretical_stats). The coefficient beta is fitted from the same sample.
+    Returns (estimate, standard error, beta).
+    """
+    values = np.asarray(values, dtype=float)
+    controls = np.asarray(controls, dtype=float)
+    c = controls - controls.mean()
+    var_c = np.dot(c, c)
+    beta = np.dot(c, values - values.mean()) / var_c if var_c > 0 else 0.0
+
+    adjusted = values - beta * (controls - control_mean)
+    n = len(adjusted)
+    stderr = adjusted.std(ddof=1) / np.sqrt(n) if n > 1 else np.nan
+    return adjusted.mean(), stderr, beta
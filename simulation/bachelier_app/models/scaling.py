@@ -0,0 +1,279 @@
+
+import os
+from collections import deque, namedtuple
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from math import lgamma, pi
+
+import numpy as np
+
+from models.bachelier import DEFAULT_BLOCK_BYTES
+
+# Scaling-law fits over an ensemble. `lags` are the window sizes (in
+# steps), `statistic` is the ensemble mean of the per-path statistic at
+# each lag, H the Hurst exponent fitted to it and path_H one fit per path.
+HurstEstimate = namedtuple('HurstEstimate', ['method', 'lags', 'statistic', 'H', 'path_H'])
+
+# Hill estimates of the tail exponent alpha for k = 1..k_max upper order
+# statistics, pooled over all paths and steps.
+TailEstimate = namedtuple('TailEstimate', ['k', 'alpha'])
+
+def hurst_lags(steps, n_lags=16, min_lag=4, max_fraction=0.25):
+    """
+    Up to n_lags distinct, log-spaced integer lags between min_lag and
+    max_fraction * steps.
+    """
+    max_lag = max(min_lag, int(steps * max_fraction))
+    return np.unique(np.geomspace(min_lag, max_lag, n_lags).round().astype(int))
+
+def _path_blocks(paths, max_bytes=None):
+    """
+    Yields (paths, steps+1) arrays: row blocks of an array sized so their
+    temporaries fit max_bytes, or the S of each PathBlock (by='paths') or
+    array of an iterable.
+    """
+    if isinstance(paths, np.ndarray):
+        budget = DEFAULT_BLOCK_BYTES if max_bytes is None else max_bytes
+        # Up to four float64 temporaries per value (prefix sums, windows)
+        rows = max(1, budget // (32 * max(paths.shape[1], 1)))
+        for start in range(0, len(paths), rows):
+            yield paths[start:start + rows]
+        return
+    for block in paths:
+        yield block.S if hasattr(block, 'S') else np.asarray(block)
+
+def _map_blocks(func, blocks, workers=None):
+    """
+    Yields func(block) for every block, in order, on a pool of threads
+    (NumPy releases the GIL in the heavy loops). At most 2 * workers
+    blocks are in flight, so a streamed input stays streamed.
+    workers=None uses os.cpu_count(); workers=1 runs inline.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(func, blocks)
+        return
+    with ThreadPoolExecutor(workers) as pool:
+        pending = deque()
+        for block in blocks:
+            pending.append(pool.submit(func, block))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def increment_moments(X, lags):
+    """
+    Per-path mean and mean square of the non-overlapping lag-tau
+    increments of X, each of shape (paths, len(lags)). Striding means each
+    lag only touches steps / tau values.
+    """
+    m1, m2 = np.empty((2, len(X), len(lags)))
+    for j, lag in enumerate(lags):
+        d = np.diff(X[:, ::lag], axis=1)
+        m1[:, j] = d.mean(axis=1)
+        m2[:, j] = np.mean(d * d, axis=1)
+    return m1, m2
+
+def _centered(m1, m2):
+    # Mean square about the ensemble mean increment of each lag
+    drift = m1.mean(axis=0)
+    return m2 - 2 * m1 * drift + drift * drift
+
+def variance_of_increments(X, lags):
+    """
+    Per-path mean square of the non-overlapping lag-tau increments of X
+    about the ensemble's mean increment, shape (paths, len(lags)).
+    E[dX^2] ~ tau^2H.
+
+    The drift is removed with the mean over all paths rather than each
+    path's own: a path has only a few increments at the longest lags, and
+    centering on their mean biases H down for persistent (H > 0.5) paths.
+    """
+    return _centered(*increment_moments(X, lags))
+
+def rescaled_range(X, lags, max_windows=64):
+    """
+    Per-path mean rescaled range R/S over non-overlapping windows of each
+    lag, shape (paths, len(lags)). R/S ~ n^H.
+
+    Window means and standard deviations come from prefix sums of the
+    increments and their squares (X itself is the first one). The range
+    of the cumulative deviations still needs a pass over every window, so
+    at most max_windows evenly spaced windows per path are used at each
+    lag (None for all): the ensemble mean still averages paths *
+    max_windows ranges, and short lags stop costing a full pass each.
+    R/S is biased upwards for short windows; estimate_hurst corrects
+    for this with expected_rescaled_range.
+    """
+    X = np.asarray(X, dtype=float)
+    dX = np.diff(X, axis=1)
+    Q = np.zeros_like(X)
+    np.cumsum(dX * dX, axis=1, out=Q[:, 1:])
+    del dX
+
+    out = np.empty((len(X), len(lags)))
+    for j, w in enumerate(lags):
+        m = (X.shape[1] - 1) // w
+        edges = X[:, :m * w + 1:w]
+        slope = np.diff(edges, axis=1) / w
+        var = np.diff(Q[:, :m * w + 1:w], axis=1) / w - slope * slope
+
+        pick = slice(None, None, -(-m // max_windows) if max_windows else 1)
+        slope, var = slope[:, pick], var[:, pick]
+
+        # The cumulative deviations from the window mean are
+        # X[a+k] - X[a] - k*slope; the constant X[a] does not change the range
+        Y = X[:, :m * w].reshape(len(X), m, w)[:, pick] - np.arange(w) * slope[..., None]
+        R = Y.max(axis=2) - Y.min(axis=2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, j] = np.nanmean(np.where(var > 0, R / np.sqrt(np.maximum(var, 0)), np.nan), axis=1)
+    return out
+
+def dfa_fluctuation(X, lags):
+    """
+    Per-path squared DFA-1 fluctuation F^2(s): the mean squared residual
+    of a least-squares line fitted to X in each non-overlapping window of
+    s points, shape (paths, len(lags)). F^2 ~ s^2H. X is the profile,
+    i.e. the path itself; linear detrending removes any drift.
+
+    Every window sum (of Y, k*Y and Y^2) is a difference of three prefix
+    sums computed once, so each extra lag costs O(paths * steps / s).
+    """
+    Y = np.asarray(X, dtype=float)
+    Y = Y - Y[:, :1]
+    n = Y.shape[1]
+    i = np.arange(n, dtype=float)
+    P0, P1, P2 = (np.zeros((len(Y), n + 1)) for _ in range(3))
+    np.cumsum(Y, axis=1, out=P0[:, 1:])
+    np.multiply(Y, i, out=P1[:, 1:])
+    np.cumsum(P1[:, 1:], axis=1, out=P1[:, 1:])
+    np.multiply(Y, Y, out=P2[:, 1:])
+    np.cumsum(P2[:, 1:], axis=1, out=P2[:, 1:])
+    del Y
+
+    out = np.empty((len(P0), len(lags)))
+    for j, s in enumerate(lags):
+        window = slice(0, (n // s) * s + 1, s)
+        a = np.arange(n // s) * s
+        SY = np.diff(P0[:, window], axis=1)
+        SkY = np.diff(P1[:, window], axis=1) - a * SY
+        SYY = np.diff(P2[:, window], axis=1)
+
+        Sxx = s * (s * s - 1) / 12.0
+        Sxy = SkY - 0.5 * (s - 1) * SY
+        residual = SYY - SY * SY / s - Sxy * Sxy / Sxx
+        out[:, j] = np.maximum(residual, 0).mean(axis=1) / s
+    return out
+
+def expected_rescaled_range(lags):
+    """
+    Anis-Lloyd expected R/S of n independent Gaussian increments, with
+    Peters' (n - 1/2)/n factor. Dividing measured R/S by it removes the
+    small-window bias, so the remaining slope is H - 1/2.
+    """
+    out = []
+    for n in np.asarray(lags, dtype=int):
+        i = np.arange(1, n)
+        ratio = np.exp(lgamma((n - 1) / 2) - lgamma(n / 2)) / np.sqrt(pi)
+        out.append((n - 0.5) / n * ratio * np.sqrt((n - i) / i).sum())
+    return np.array(out)
+
+HURST_METHODS = {
+    # name: (per-path statistic, exponent of lag in units of H, expected
+    # statistic for H = 1/2 or None if it is a pure power law)
+    'variance': (increment_moments, 2, None),
+    'rs': (rescaled_range, 1, expected_rescaled_range),
+    'dfa': (dfa_fluctuation, 2, None),
+}
+
+def fit_power_law(lags, statistic):
+    """
+    Least-squares slope of log(statistic) against log(lags). statistic may
+    be 1-D or (paths, lags), in which case every row is fitted at once.
+    """
+    x = np.log(np.asarray(lags, dtype=float))
+    x = x - x.mean()
+    y = np.log(statistic)
+    return (y - y.mean(axis=-1, keepdims=True)) @ x / (x @ x)
+
+def estimate_hurst(paths, method='dfa', lags=None, max_bytes=None, workers=None):
+    """
+    Estimates the Hurst exponent of an ensemble by 'variance' of
+    increments, rescaled range ('rs') or detrended fluctuation analysis
+    ('dfa'), fitting statistic ~ lag^(c*H) over log-spaced lags. R/S is
+    fitted relative to its expectation for independent increments
+    (Anis-Lloyd), which removes its upward bias at short windows.
+
+    paths is an (N, steps+1) array, processed in row blocks of at most
+    max_bytes of temporaries, or an iterable of path blocks (e.g.
+    iter_paths(..., by='paths')) so ensembles that do not fit in memory
+    can be streamed. Blocks are processed on `workers` threads (default:
+    all cores). Returns a HurstEstimate with the pooled H and one H per
+    path.
+    """
+    if method not in HURST_METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {tuple(HURST_METHODS)}")
+    per_path, power, reference = HURST_METHODS[method]
+
+    blocks = _path_blocks(paths, max_bytes)
+    first = next(blocks)
+    if lags is None:
+        lags = hurst_lags(first.shape[1] - 1)
+    lags = np.asarray(lags)
+    stats = list(_map_blocks(lambda X: per_path(X, lags), chain([first], blocks), workers))
+    if method == 'variance':
+        # Centered once all blocks are in, so the result does not depend on the blocking
+        stats = _centered(*(np.concatenate(m) for m in zip(*stats)))
+    else:
+        stats = np.concatenate(stats)
+
+    statistic = stats.mean(axis=0)
+    offset, expected = (0.0, 1.0) if reference is None else (0.5, reference(lags))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        path_H = offset + fit_power_law(lags, stats / expected) / power
+    H = offset + fit_power_law(lags, statistic / expected) / power
+    return HurstEstimate(method, lags, statistic, H, path_H)
+
+def hill_estimator(samples, k_max=1000):
+    """
+    Hill estimates of the tail exponent alpha in P(|x| > u) ~ u^-alpha,
+        alpha(k) = k / sum_{i<=k} log(x_(i) / x_(k+1)),
+    for every k = 1..k_max from the k_max+1 largest |samples|. samples is
+    an array or an iterable of arrays; only the largest values of each are
+    kept (np.partition), so memory does not grow with the sample size.
+    """
+    if isinstance(samples, np.ndarray):
+        samples = [samples]
+    top = np.empty(0)
+    for chunk in samples:
+        values = np.abs(np.asarray(chunk, dtype=float)).ravel()
+        if len(values) > k_max + 1:
+            values = np.partition(values, len(values) - k_max - 1)[-(k_max + 1):]
+        top = np.concatenate([top, values])
+        if len(top) > k_max + 1:
+            top = np.partition(top, len(top) - k_max - 1)[-(k_max + 1):]
+
+    top = np.sort(top)[::-1]
+    k_max = len(top) - 1
+    if k_max < 1:
+        raise ValueError("need at least two samples")
+    logs = np.log(top)
+    k = np.arange(1, k_max + 1)
+    with np.errstate(divide='ignore'):
+        alpha = k / (np.cumsum(logs[:-1]) - k * logs[1:])
+    return TailEstimate(k, alpha)
+
+def tail_exponent(paths, lag=1, k_max=1000, max_bytes=None, workers=None):
+    """
+    Hill estimates for the non-overlapping lag-step increments of an
+    ensemble, after removing each path's mean increment. paths is an array
+    or an iterable of path blocks, as in estimate_hurst.
+    """
+    def largest(X):
+        dX = np.diff(X[:, ::lag], axis=1)
+        dX = np.abs(dX - dX.mean(axis=1, keepdims=True)).ravel()
+        if len(dX) > k_max + 1:
+            dX = np.partition(dX, len(dX) - k_max - 1)[-(k_max + 1):]
+        return dX
+    return hill_estimator(_map_blocks(largest, _path_blocks(paths, max_bytes), workers), k_max)
@@ -0,0 +1,285 @@
+
+import numpy as np
+
+def theoretical_bin_edges(t, S0, mu, sigma, bins=100, width=5.0):
+    """
+    Fixed bin edges spanning mean ± width standard deviations of S_t.
+    Histograms built on the same edges can be merged, so these are the
+    edges to use when S_t arrives in chunks or from several workers.
+    """
+    mean = S0 + mu * t
+    std = sigma * np.sqrt(t)
+    if std == 0:
+        std = 1.0
+    return np.linspace(mean - width * std, mean + width * std, bins + 1)
+
+class StreamingHistogram:
+    """
+    Histogram accumulated from chunks of values on fixed bin edges.
+
+    Values outside the edges are counted in underflow/overflow rather than
+    dropped, so `n` is always the total number of observations. Two
+    histograms with identical edges merge exactly by adding counts.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @classmethod
+    def from_values(cls, values, bins='auto'):
+        """
+        Builds a histogram of values with edges from a NumPy binning rule
+        ('auto', 'fd', 'sturges', ...) or an explicit bin count.
+        """
+        values = np.asarray(values)
+        hist = cls(np.histogram_bin_edges(values, bins=bins))
+        return hist.update(values)
+
+    @property
+    def n(self):
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    def update(self, values):
+        values = np.asarray(values).ravel()
+        lo, hi = self.edges[0], self.edges[-1]
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+        self.underflow += int(np.count_nonzero(values < lo))
+        self.overflow += int(np.count_nonzero(values > hi))
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histograms can only be merged on identical bin edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    @property
+    def centers(self):
+        return 0.5 * (self.edges[:-1] + self.edges[1:])
+
+    @property
+    def widths(self):
+        return np.diff(self.edges)
+
+    def density(self):
+        """
+        Counts normalized by the total number of observations and bin width,
+        matching Plotly's histnorm='probability density'.
+        """
+        n = self.n
+        if n == 0:
+            return np.zeros(len(self.counts))
+        return self.counts / (n * self.widths)
+
+def _as_block(block):
+    """
+    Accepts a PathBlock or a plain (paths, steps) array covering all columns.
+    Returns (column slice, values).
+    """
+    if hasattr(block, 'steps'):
+        return block.steps, block.S
+    return slice(None), np.asarray(block)
+
+class MomentAccumulator:
+    """
+    Per-time-step mean, variance, skewness and kurtosis accumulated from
+    path blocks without keeping the paths.
+
+    Each block's central moments are computed in one vectorized pass and
+    combined with the pairwise update of Chan et al., extended to third
+    and fourth moments (Pébay 2008). The same update merges accumulators
+    from different chunks or workers, exactly up to floating-point
+    rounding. Accepts full-width path blocks and time slices alike.
+    """
+
+    def __init__(self, n_steps):
+        self.count = np.zeros(n_steps, dtype=np.int64)
+        self.mean = np.zeros(n_steps)
+        self.M2 = np.zeros(n_steps)
+        self.M3 = np.zeros(n_steps)
+        self.M4 = np.zeros(n_steps)
+
+    def update(self, block):
+        cols, values = _as_block(block)
+        values = np.asarray(values, dtype=float)
+        n = values.shape[0]
+        if n == 0:
+            return self
+
+        # Two block-sized temporaries: d becomes d^3 and d2 becomes d^4 in place
+        mean = values.mean(axis=0)
+        d = values - mean
+        d2 = d * d
+        M2 = d2.sum(axis=0)
+        d *= d2
+        M3 = d.sum(axis=0)
+        d2 *= d2
+        M4 = d2.sum(axis=0)
+        self._combine(cols, np.full(len(mean), n), mean, M2, M3, M4)
+        return self
+
+    def merge(self, other):
+        if len(other.count) != len(self.count):
+            raise ValueError("Accumulators cover a different number of time steps")
+        self._combine(slice(None), other.count, other.mean, other.M2, other.M3, other.M4)
+        return self
+
+    def _combine(self, cols, nb, mb, M2b, M3b, M4b):
+        na = self.count[cols].astype(float)
+        nb = np.asarray(nb, dtype=float)
+        ma, M2a, M3a, M4a = self.mean[cols], self.M2[cols], self.M3[cols], self.M4[cols]
+
+        n = na + nb
+        safe_n = np.where(n > 0, n, 1.0)
+        delta = mb - ma
+        delta_n = delta / safe_n
+
+        mean = ma + delta_n * nb
+        M2 = M2a + M2b + delta * delta_n * na * nb
+        M3 = (M3a + M3b + delta * delta_n ** 2 * na * nb * (na - nb)
+              + 3 * delta_n * (na * M2b - nb * M2a))
+        M4 = (M4a + M4b + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+              + 6 * delta_n ** 2 * (na * na * M2b + nb * nb * M2a)
+              + 4 * delta_n * (na * M3b - nb * M3a))
+
+        self.count[cols] = n.astype(np.int64)
+        self.mean[cols] = mean
+        self.M2[cols] = M2
+        self.M3[cols] = M3
+        self.M4[cols] = M4
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.count, self.mean, self.M2, self.M3, self.M4))
+
+    @property
+    def variance(self):
+        """
+        Population variance (ddof=0), like np.var.
+        """
+        return self.M2 / np.maximum(self.count, 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def skewness(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            skew = np.sqrt(self.count) * self.M3 / self.M2 ** 1.5
+        return np.where(self.M2 > 0, skew, 0.0)
+
+    @property
+    def kurtosis(self):
+        """
+        Excess kurtosis (0 for a normal distribution).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kurt = self.count * self.M4 / self.M2 ** 2 - 3.0
+        return np.where(self.M2 > 0, kurt, 0.0)
+
+class QuantileSketch:
+    """
+    Mergeable per-time-step quantile sketch.
+
+    Each time step keeps a fixed grid of `bins` counters between lo and hi
+    plus under/overflow counters and the exact minimum and maximum.
+    Quantiles are read off by linear interpolation inside a bin, so their
+    error is bounded by one bin width as long as they fall inside
+    [lo, hi]. A quantile that lands in the underflow (overflow) counter is
+    interpolated between the exact minimum and lo (hi and the exact
+    maximum), and its error is only bounded by that distance; choose the
+    range wide enough (for_bachelier spans ±6 sigma). A fixed grid is used rather than a
+    P² or t-digest sketch because its counts add exactly, so chunk and
+    worker results merge without further error, and updates stay
+    vectorized across all time steps.
+    """
+
+    def __init__(self, lo, hi, bins=256):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+        self.bins = bins
+        n_steps = len(self.lo)
+        # Column 0 is underflow, column bins+1 overflow
+        self.counts = np.zeros((n_steps, bins + 2), dtype=np.int64)
+        self.min = np.full(n_steps, np.inf)
+        self.max = np.full(n_steps, -np.inf)
+
+    @classmethod
+    def for_bachelier(cls, t, S0, mu, sigma, bins=256, width=6.0):
+        """
+        Grid spanning mean ± width theoretical standard deviations at every t.
+        """
+        mean = S0 + mu * np.asarray(t)
+        std = sigma * np.sqrt(np.asarray(t))
+        return cls(mean - width * std, mean + width * std, bins)
+
+    def update(self, block):
+        cols, values = _as_block(block)
+        values = np.asarray(values, dtype=float)
+        if values.shape[0] == 0:
+            return self
+
+        lo, hi = self.lo[cols], self.hi[cols]
+        span = np.where(hi > lo, hi - lo, 1.0)
+        idx = np.floor((values - lo) / span * self.bins).astype(np.int64) + 1
+        np.clip(idx, 0, self.bins + 1, out=idx)
+
+        n_cols = values.shape[1]
+        flat = idx + (self.bins + 2) * np.arange(n_cols)
+        counts = np.bincount(flat.ravel(), minlength=n_cols * (self.bins + 2))
+        self.counts[cols] += counts.reshape(n_cols, self.bins + 2)
+
+        self.min[cols] = np.minimum(self.min[cols], values.min(axis=0))
+        self.max[cols] = np.maximum(self.max[cols], values.max(axis=0))
+        return self
+
+    def merge(self, other):
+        if not (np.array_equal(self.lo, other.lo) and np.array_equal(self.hi, other.hi)
+                and self.bins == other.bins):
+            raise ValueError("Sketches can only be merged on identical grids")
+        self.counts += other.counts
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.lo, self.hi, self.counts, self.min, self.max))
+
+    def quantile(self, q):
+        """
+        Estimated quantiles at levels q for every time step.
+        Returns an array of shape (len(q), n_steps) (or (n_steps,) for scalar q).
+        """
+        q = np.asarray(q, dtype=float)
+        levels = np.atleast_1d(q)
+
+        total = self.counts.sum(axis=1)
+        cum = np.cumsum(self.counts, axis=1)
+        width = np.where(self.hi > self.lo, self.hi - self.lo, 1.0) / self.bins
+        # Lower edge of every counter; underflow starts at the minimum and
+        # overflow at hi
+        starts = self.lo[:, None] + width[:, None] * np.arange(-1, self.bins + 1)
+        starts[:, 0] = np.minimum(self.min, self.lo)
+        ends = self.lo[:, None] + width[:, None] * np.arange(0, self.bins + 2)
+        ends[:, -1] = np.maximum(self.max, self.hi)
+
+        rows = np.arange(len(total))
+        out = np.empty((len(levels), len(total)))
+        for i, level in enumerate(levels):
+            target = level * total
+            k = np.minimum((cum < target[:, None]).sum(axis=1), self.bins + 1)
+            before = np.where(k > 0, cum[rows, np.maximum(k - 1, 0)], 0)
+            in_bin = np.maximum(self.counts[rows, k], 1)
+            frac = np.clip((target - before) / in_bin, 0.0, 1.0)
+            value = starts[rows, k] + frac * (ends[rows, k] - starts[rows, k])
+            out[i] = np.clip(value, self.min, self.max)
+
+        return out if q.ndim else out[0]
@@ -0,0 +1,107 @@
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from models.bachelier import DEFAULT_BLOCK_BYTES, scenario_grid, theoretical_stats, time_grid
+from models.parallel import DEFAULT_CHUNK_SIZE, path_chunks, spawn_seeds
+
+SWEEP_FIELDS = ('S0', 'mu', 'sigma', 'mean', 'variance', 'theo_mean', 'theo_variance', 'mean_z', 'variance_ratio')
+
+def _block_rows(max_bytes, row_bytes):
+    budget = DEFAULT_BLOCK_BYTES if max_bytes is None else max_bytes
+    return max(1, budget // (2 * row_bytes))
+
+def _chunk_sums(S0, mu, sigma, T, dt, n_paths, seed, max_bytes):
+    """
+    Draws W_T, the unit-step Brownian value at the last step, for one
+    chunk of n_paths paths from its own seed, and broadcasts it over every
+    scenario. Returns the sum and sum of squares of S_T - E[S_T] per
+    scenario. Shocks and the broadcast are both processed in row blocks of
+    at most max_bytes. Deviations from the theoretical mean keep the sums
+    well conditioned.
+    """
+    rng = np.random.default_rng(seed)
+    steps, _ = time_grid(T, dt)
+    W_T = np.empty(n_paths)
+    rows = _block_rows(max_bytes, 8 * max(steps, 1))
+    for start in range(0, n_paths, rows):
+        stop = min(start + rows, n_paths)
+        rng.standard_normal((stop - start, steps)).sum(axis=1, out=W_T[start:stop])
+
+    theo_mean, _ = theoretical_stats(T, S0, mu, sigma)
+    terminal = (S0 + (mu * dt) * steps - theo_mean)[:, None]
+    scale = (sigma * np.sqrt(dt))[:, None]
+    total = np.zeros(len(S0))
+    total_sq = np.zeros(len(S0))
+    rows = _block_rows(max_bytes, 8 * len(S0))
+    for start in range(0, n_paths, rows):
+        dev = scale * W_T[start:start + rows]
+        dev += terminal
+        total += dev.sum(axis=-1)
+        total_sq += np.einsum('...i,...i->...', dev, dev)
+    return total, total_sq
+
+def run_sweep(S0, mu, sigma, T, dt, N, seed=None, workers=None, executor='process',
+              chunk_size=DEFAULT_CHUNK_SIZE, max_bytes=None):
+    """
+    Simulates every scenario of the grid spanned by broadcasting S0, mu and
+    sigma and compares its terminal distribution with theoretical_stats.
+
+    Only S_T matters, so each path's W_T is drawn once and broadcast over
+    the whole grid. The paths are cut into chunks of chunk_size, seeded
+    from SeedSequence(seed).spawn() as in simulate_paths_parallel, and the
+    chunks (drawing their shocks and combining them with every scenario, in
+    row blocks of at most max_bytes) run on a pool of workers. Each
+    scenario's S_T equals the last column of simulate_paths_parallel for
+    the same seed and chunk_size, all scenarios share common random
+    numbers, and the result does not depend on workers or executor.
+
+    Returns a dict of arrays shaped like the grid (see SWEEP_FIELDS):
+    the parameters, the empirical and theoretical mean and variance of S_T,
+    mean_z = (mean - theo_mean) / sqrt(theo_variance / N), and
+    variance_ratio = variance / theo_variance.
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+    if N < 2:
+        raise ValueError(f"N must be at least 2, got {N}")
+
+    shape, params = scenario_grid(S0, mu, sigma)
+    S0, mu, sigma = (p.reshape(-1) for p in params)
+    chunks = path_chunks(N, chunk_size)
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    args = [(S0, mu, sigma, T, dt, stop - start, child, max_bytes)
+            for (start, stop), child in zip(chunks, spawn_seeds(seed, len(chunks)))]
+    if workers == 1:
+        results = [_chunk_sums(*a) for a in args]
+    else:
+        pool_cls = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        with pool_cls(workers) as pool:
+            results = list(pool.map(_chunk_sums, *zip(*args)))
+
+    # Summed in chunk order, so the layout of the pool does not matter
+    total = sum(r[0] for r in results)
+    total_sq = sum(r[1] for r in results)
+
+    theo_mean, theo_var = theoretical_stats(T, S0, mu, sigma)
+    mean_dev = total / N
+    variance = (total_sq - N * mean_dev ** 2) / (N - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_z = mean_dev / np.sqrt(theo_var / N)
+        variance_ratio = variance / theo_var
+
+    fields = {
+        'S0': S0,
+        'mu': mu,
+        'sigma': sigma,
+        'mean': theo_mean + mean_dev,
+        'variance': variance,
+        'theo_mean': theo_mean,
+        'theo_variance': theo_var,
+        'mean_z': mean_z,
+        'variance_ratio': variance_ratio,
+    }
+    return {name: value.reshape(shape) for name, value in fields.items()}
@@ -0,0 +1,147 @@
+
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+def estimate_nbytes(value):
+    """
+    Approximate memory held by a cached value. Counts NumPy buffers exactly,
+    recurses into tuples, lists and dicts, and sizes Plotly figures through
+    their JSON-able representation.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    if hasattr(value, 'to_plotly_json'):
+        return estimate_nbytes(value.to_plotly_json())
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a byte budget.
+
+    Keys are hashable parameter tuples; values are simulation results,
+    derived statistics or figures. When the total estimated size exceeds
+    max_bytes the least recently used entries are evicted. A single value
+    larger than the whole budget is returned but never stored.
+
+    get_or_compute runs at most one computation per key at a time, so
+    concurrent sessions asking for the same parameters share the work.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, nbytes=None):
+        """
+        Stores value under key and evicts LRU entries to stay within budget.
+        """
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return value
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for key, calling compute() on a miss.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+
+        with self._lock:
+            # [lock, callers holding or waiting on it, value it computed];
+            # dropped only when the last of them leaves, so no later caller
+            # can start a second computation under a fresh lock
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0, sentinel])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                # Another session may have finished it while we waited. A
+                # value too large to store is handed over through the entry.
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                        return self._entries[key][0]
+                if entry[2] is not sentinel:
+                    return entry[2]
+                entry[2] = self.put(key, compute())
+                return entry[2]
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        Snapshot of the hit/miss/eviction counters and memory use.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
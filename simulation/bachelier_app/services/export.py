@@ -0,0 +1,127 @@
+
+import importlib.util
+import io
+
+import numpy as np
+
+from models.bachelier import PathBlock
+
+# format -> (file name, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('bachelier_paths.csv', 'text/csv'),
+    'npy': ('bachelier_paths.npy', 'application/octet-stream'),
+    'npz': ('bachelier_paths.npz', 'application/zip'),
+    'parquet': ('bachelier_paths.parquet', 'application/vnd.apache.parquet'),
+}
+
+DEFAULT_CHUNK_STEPS = 256
+
+def _pyarrow():
+    """
+    Parquet support is optional, and pyarrow is only imported once it is
+    used, so that importing this module stays cheap.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow") from None
+    return pa, pq
+
+def available_formats():
+    """
+    Export formats usable in this environment.
+    """
+    has_pyarrow = importlib.util.find_spec('pyarrow') is not None
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or has_pyarrow]
+
+def time_slices(t, S, chunk_steps=DEFAULT_CHUNK_STEPS):
+    """
+    Wraps an in-memory ensemble as time-slice PathBlocks (views, no copies),
+    the same shape iter_paths(by='time') streams.
+    """
+    N = S.shape[0]
+    for start in range(0, S.shape[1], chunk_steps):
+        stop = min(start + chunk_steps, S.shape[1])
+        yield PathBlock(slice(0, N), slice(start, stop), t[start:stop], S[:, start:stop])
+
+def iter_csv_chunks(blocks, N, float_format='%.17g'):
+    """
+    Encodes time-slice blocks as CSV, one chunk of bytes per block.
+    The layout matches the previous pandas export: one row per time step,
+    the time in the first column and one column per path. 17 significant
+    digits round-trip every float64 exactly, like the pandas export did.
+    """
+    yield (',' + ','.join(str(i) for i in range(N)) + '\n').encode()
+    for block in blocks:
+        rows = np.column_stack((block.t, block.S.T))
+        buf = io.BytesIO()
+        np.savetxt(buf, rows, fmt=float_format, delimiter=',')
+        yield buf.getvalue()
+
+def _parquet_table(pa, block, N):
+    columns = [pa.array(block.t)] + [pa.array(block.S[i]) for i in range(N)]
+    return pa.table(columns, names=['t'] + [str(i) for i in range(N)])
+
+def write_parquet(target, blocks, N):
+    """
+    Writes time-slice blocks to Parquet (same wide layout as the CSV),
+    one row group per block. Requires pyarrow.
+    """
+    pa, pq = _pyarrow()
+    writer = None
+    try:
+        for block in blocks:
+            table = _parquet_table(pa, block, N)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def write_npy_memmap(path, blocks, shape, dtype=np.float64):
+    """
+    Streams blocks of either kind (path blocks or time slices) into a
+    memory-mapped .npy file of the given (N, steps+1) shape, so the file
+    can be larger than RAM. Returns the open memmap.
+    """
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    for block in blocks:
+        out[block.paths, block.steps] = block.S
+    out.flush()
+    return out
+
+def export_bytes(t, S, fmt):
+    """
+    Serializes an in-memory ensemble for download. Only called on demand.
+    """
+    if fmt == 'csv':
+        return b''.join(iter_csv_chunks(time_slices(t, S), S.shape[0]))
+
+    buf = io.BytesIO()
+    if fmt == 'npy':
+        np.save(buf, S)
+    elif fmt == 'npz':
+        np.savez(buf, t=t, S=S)
+    elif fmt == 'parquet':
+        write_parquet(buf, time_slices(t, S), S.shape[0])
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {available_formats()}")
+    return buf.getvalue()
+
+def export_to_file(path, blocks, fmt, N, steps, dtype=np.float64):
+    """
+    Writes a (possibly streamed) ensemble straight to disk without holding
+    it in memory. CSV and Parquet need time slices; .npy accepts any blocks.
+    """
+    if fmt == 'csv':
+        with open(path, 'wb') as fh:
+            for chunk in iter_csv_chunks(blocks, N):
+                fh.write(chunk)
+    elif fmt == 'npy':
+        write_npy_memmap(path, blocks, (N, steps + 1), dtype)
+    elif fmt == 'parquet':
+        write_parquet(path, blocks, N)
+    else:
+        raise ValueError(f"Format {fmt!r} cannot be streamed to a file")
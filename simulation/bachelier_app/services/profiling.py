@@ -0,0 +1,161 @@
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager, nullcontext
+
+# Returned by every stage() of a disabled profiler: entering and leaving
+# it costs two attribute lookups, so instrumented code can stay in place.
+_NULL_STAGE = nullcontext()
+
+# tracemalloc is process-wide, so profilers share it by reference count:
+# the first one to need it starts it, and the last one to finish stops it
+# (unless something else had started it before them).
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+class Profiler:
+    """
+    Per-rerun stage timings and, optionally, memory use.
+
+        profiler = Profiler()
+        with profiler.stage('simulate'):
+            ...
+
+    Every stage records its start offset and wall time. With
+    trace_memory=True it also records, through tracemalloc, the net
+    memory it left allocated and the peak traced memory while it ran
+    (nested stages fold their peaks into their parents). tracemalloc slows
+    allocation-heavy code noticeably, so memory tracking is opt-in.
+
+    tracemalloc is process-wide: peaks include allocations of every thread,
+    and concurrent profilers (e.g. two sessions with memory tracking on)
+    reset each other's peaks, so their figures are only indicative. Tracing
+    is reference-counted between profilers and released by stop(), on
+    leaving a `with Profiler(...)` block, or when the profiler is garbage
+    collected, so a run that ends early cannot leave it on.
+
+    A disabled profiler records nothing and returns a shared no-op
+    context from stage(). Records export to JSON (to_json) or to the
+    Chrome trace event format (to_chrome_trace), which chrome://tracing
+    and Perfetto open directly.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.records = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._release = None
+        if self.trace_memory:
+            _acquire_tracing()
+            self._release = weakref.finalize(self, _release_tracing)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name):
+        entry = {'name': name, 'depth': len(self._stack), 'peak': 0}
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            entry['mem_start'] = current
+        self._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            record = {
+                'name': name,
+                'depth': entry['depth'],
+                'start': start - self._origin,
+                'seconds': end - start,
+                'thread': threading.get_ident(),
+            }
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(entry['peak'], peak)
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+                record['memory_delta_bytes'] = current - entry['mem_start']
+                record['memory_peak_bytes'] = peak
+            self.records.append(record)
+
+    def stop(self):
+        """
+        Releases this profiler's use of tracemalloc (stopping it if no other
+        profiler needs it). Safe to call more than once.
+        """
+        if self._release is not None:
+            self._release()
+
+    @property
+    def total_seconds(self):
+        return sum(r['seconds'] for r in self.records if r['depth'] == 0)
+
+    def summary(self):
+        """
+        Records in start order, for display.
+        """
+        return sorted(self.records, key=lambda r: r['start'])
+
+    def to_json(self):
+        return json.dumps({
+            'total_seconds': self.total_seconds,
+            'trace_memory': self.trace_memory,
+            'stages': self.summary(),
+        }, indent=2)
+
+    def to_chrome_trace(self):
+        """
+        Complete ('X') events with microsecond timestamps; memory figures
+        go into each event's args.
+        """
+        pid = os.getpid()
+        events = []
+        for r in self.summary():
+            args = {k: r[k] for k in ('memory_delta_bytes', 'memory_peak_bytes') if k in r}
+            events.append({
+                'name': r['name'],
+                'ph': 'X',
+                'ts': r['start'] * 1e6,
+                'dur': r['seconds'] * 1e6,
+                'pid': pid,
+                'tid': r['thread'],
+                'args': args,
+            })
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
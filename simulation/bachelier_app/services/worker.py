@@ -0,0 +1,193 @@
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from services.cache import estimate_nbytes
+
+class Cancelled(Exception):
+    """
+    Raised by Job.check() inside a job that has been superseded.
+    """
+
+class Job:
+    """
+    One background computation and its shared state: progress, an
+    optional preview, and the result or error once it finishes.
+
+    The job function receives the Job as its first argument and should
+    call job.check() between stages (it raises Cancelled once the job is
+    cancelled) and job.report() to publish progress. Cancellation is
+    cooperative: a stage that is already running finishes first.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.progress = 0.0
+        self.message = "Queued"
+        self.preview = None
+        self.result = None
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.finished = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def status(self):
+        if not self.done:
+            return 'cancelling' if self.cancelled else 'running'
+        if self.error is not None:
+            return 'failed'
+        return 'cancelled' if self.cancelled and self.result is None else 'done'
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.submitted
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise Cancelled(self.key)
+
+    def report(self, progress, message=None, preview=None):
+        """
+        Publishes progress in [0, 1], an optional status message and an
+        optional preview of the partial result. Also a cancellation point.
+        """
+        self.check()
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if preview is not None:
+            self.preview = preview
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the job finishes or timeout seconds pass; returns done.
+        """
+        return self._done.wait(timeout)
+
+class BackgroundRunner:
+    """
+    Runs jobs on a shared thread pool, one current job per slot (e.g. per
+    browser session).
+
+        job = runner.submit(session_id, params, compute, *args)
+
+    Submitting the key of the slot's current job returns that job, so
+    reruns with unchanged parameters do not start new work. Submitting a
+    different key cancels the current job, so a slider moved mid-run
+    supersedes the stale computation instead of queueing behind it.
+    latest(slot) is the last job that completed successfully, which the
+    UI can keep showing while a new one runs.
+
+    Threads suit NumPy work, which releases the GIL, and share memory with
+    the result cache. At most max_slots slots are remembered, and the
+    latest results together hold at most max_bytes (estimate_nbytes; None
+    for no limit): past either bound the least recently submitted slots
+    are forgotten, so results of closed sessions do not accumulate. The
+    slot being submitted to or publishing a result is never the one
+    forgotten. A forgotten slot simply starts a new job on its next submit.
+    """
+
+    def __init__(self, max_workers=None, max_slots=64, max_bytes=None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_slots = max_slots
+        self.max_bytes = max_bytes
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='bachelier-worker')
+        self._lock = threading.Lock()
+        self._current = OrderedDict()  # slot -> Job, least recently submitted first
+        self._latest = {}  # slot -> (Job, bytes of its result)
+
+    def submit(self, slot, key, func, *args, **kwargs):
+        with self._lock:
+            current = self._current.get(slot)
+            if current is not None and current.key == key and current.status in ('running', 'done'):
+                self._current.move_to_end(slot)
+                return current
+            if current is not None and not current.done:
+                current.cancel()
+
+            job = Job(key)
+            self._current[slot] = job
+            self._current.move_to_end(slot)
+            self._evict(keep=slot)
+        self._pool.submit(self._run, slot, job, func, args, kwargs)
+        return job
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(nbytes for _, nbytes in self._latest.values())
+
+    def _evict(self, keep):
+        # Called with the lock held. Forgets the least recently submitted
+        # slots other than keep, the slot that is submitting or publishing.
+        held = sum(nbytes for _, nbytes in self._latest.values())
+        for stale_slot in list(self._current):
+            if len(self._current) <= self.max_slots and (self.max_bytes is None or held <= self.max_bytes):
+                break
+            if stale_slot == keep:
+                continue
+            self._current.pop(stale_slot).cancel()
+            _, nbytes = self._latest.pop(stale_slot, (None, 0))
+            held -= nbytes
+
+    def _run(self, slot, job, func, args, kwargs):
+        try:
+            job.check()
+            job.message = "Running"
+            job.result = func(job, *args, **kwargs)
+            job.progress = 1.0
+            job.message = "Done"
+            with self._lock:
+                # A superseded job that finishes late must not replace a newer result
+                if self._current.get(slot) is job and not job.cancelled:
+                    self._latest[slot] = (job, estimate_nbytes(job.result))
+                    self._evict(keep=slot)
+                else:
+                    job.result = job.preview = None
+                    job.message = "Cancelled"
+        except Cancelled:
+            job.preview = None
+            job.message = "Cancelled"
+        except Exception as error:
+            job.error = error
+            job.message = f"Failed: {error}"
+        finally:
+            job.finished = time.perf_counter()
+            job._done.set()
+
+    def current(self, slot):
+        with self._lock:
+            return self._current.get(slot)
+
+    def latest(self, slot):
+        with self._lock:
+            return self._latest.get(slot, (None, 0))[0]
+
+    def cancel(self, slot):
+        with self._lock:
+            job = self._current.get(slot)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            for job in self._current.values():
+                job.cancel()
+        self._pool.shutdown(wait=wait)
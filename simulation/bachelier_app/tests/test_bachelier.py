@@ -1,7 +1,7 @@
 
 import unittest
 import numpy as np
-from models.bachelier import simulate_paths, theoretical_stats
+from models.bachelier import simulate_paths, simulate_paths_into, iter_paths, time_grid, theoretical_stats
 
 class TestBachelierSimulation(unittest.TestCase):
     
@@ -58,5 +58,125 @@ class TestBachelierSimulation(unittest.TestCase):
         # Variance should be close to sigma^2 * T = 400
         self.assertAlmostEqual(emp_var, theo_var, delta=20.0)
 
+class TestStreamingPaths(unittest.TestCase):
+
+    def test_path_blocks_match_full_simulation(self):
+        """
+        Stacking the path blocks reproduces simulate_paths exactly for the same seed.
+        """
+        t, S = simulate_paths(100, 5, 20, 1.0, 0.01, 250, seed=7)
+        blocks = list(iter_paths(100, 5, 20, 1.0, 0.01, 250, seed=7, block_size=64))
+
+        self.assertEqual(len(blocks), 4)
+        np.testing.assert_array_equal(blocks[0].t, t)
+        np.testing.assert_array_equal(np.vstack([b.S for b in blocks]), S)
+
+    def test_time_slices_carry_state(self):
+        """
+        Time slices tile the full grid and continue from the previous slice.
+        """
+        N, T, dt = 2000, 1.0, 0.01
+        blocks = list(iter_paths(100, 10, 20, T, dt, N, seed=3, by='time', block_size=30))
+
+        S = np.hstack([b.S for b in blocks])
+        t = np.concatenate([b.t for b in blocks])
+        self.assertEqual(S.shape, (N, 101))
+        np.testing.assert_allclose(t, np.linspace(0, T, 101))
+        self.assertTrue(np.all(S[:, 0] == 100))
+
+        # Increments across slice boundaries are ordinary N(mu*dt, sigma^2*dt) draws
+        jump = S[:, 30] - S[:, 29]
+        self.assertAlmostEqual(np.mean(jump), 10 * dt, delta=0.1)
+        self.assertAlmostEqual(np.std(jump), 20 * np.sqrt(dt), delta=0.1)
+
+        theo_mean, theo_var = theoretical_stats(T, 100, 10, 20)
+        self.assertAlmostEqual(np.mean(S[:, -1]), theo_mean, delta=1.5)
+        self.assertAlmostEqual(np.var(S[:, -1]), theo_var, delta=40.0)
+
+    def test_max_bytes_bounds_block_size(self):
+        """
+        Blocks derived from max_bytes stay within the requested budget.
+        """
+        budget = 200_000
+        for by in ('paths', 'time'):
+            for block in iter_paths(0, 0, 1, 1.0, 0.001, 500, seed=1, by=by, max_bytes=budget):
+                self.assertLessEqual(2 * block.S.nbytes, budget)
+
+class TestInPlaceKernel(unittest.TestCase):
+
+    def test_matches_vectorized_reference(self):
+        """
+        The in-place kernel equals the straightforward computation with the same Generator stream.
+        """
+        S0, mu, sigma, T, dt, N = 100, 5, 20, 1.0, 0.01, 50
+        steps, _ = time_grid(T, dt)
+
+        out = np.empty((N, steps + 1))
+        result = simulate_paths_into(out, S0, mu, sigma, dt, seed=11)
+        self.assertIs(result, out)
+
+        Z = np.random.default_rng(11).standard_normal((N, steps))
+        dS = mu * dt + sigma * np.sqrt(dt) * Z
+        expected = S0 + np.cumsum(np.hstack((np.zeros((N, 1)), dS)), axis=1)
+        np.testing.assert_allclose(out, expected, rtol=1e-12)
+
+    def test_shock_order_independent_of_shape(self):
+        """
+        Tall buffers drawn through several scratch blocks and rows longer
+        than the scratch both consume the stream like one (N, steps) draw.
+        """
+        for N, steps in [(50000, 5), (2, 200000)]:
+            out = np.empty((N, steps + 1))
+            simulate_paths_into(out, 0, 0, 1, 1.0, seed=3)
+            Z = np.random.default_rng(3).standard_normal((N, steps))
+            np.testing.assert_allclose(np.diff(out, axis=1), Z, atol=1e-9)
+
+    def test_float32_statistics(self):
+        """
+        A float32 buffer stays float32 and produces the theoretical moments.
+        """
+        S0, mu, sigma, T, dt, N = 100, 10, 20, 1.0, 0.01, 10000
+        steps, _ = time_grid(T, dt)
+        out = np.empty((N, steps + 1), dtype=np.float32)
+        simulate_paths_into(out, S0, mu, sigma, dt, seed=42)
+
+        self.assertEqual(out.dtype, np.float32)
+        theo_mean, theo_var = theoretical_stats(T, S0, mu, sigma)
+        self.assertAlmostEqual(float(np.mean(out[:, -1])), theo_mean, delta=1.0)
+        self.assertAlmostEqual(float(np.var(out[:, -1])), theo_var, delta=20.0)
+
+    def test_rejects_unsupported_buffers(self):
+        with self.assertRaises(ValueError):
+            simulate_paths_into(np.empty((10, 5), dtype=np.int64), 0, 0, 1, 0.1)
+        with self.assertRaises(ValueError):
+            simulate_paths_into(np.empty((5, 10)).T, 0, 0, 1, 0.1)
+
+class TestScenarioGrid(unittest.TestCase):
+
+    def test_broadcast_matches_scalar_runs(self):
+        """
+        Every scenario of a broadcast run equals the scalar run with the same seed.
+        """
+        sigmas = np.array([10.0, 20.0, 30.0])
+        mus = np.array([-5.0, 0.0, 5.0, 10.0])
+        t, S = simulate_paths(100, mus[None, :], sigmas[:, None], 1.0, 0.05, 200, seed=3)
+        self.assertEqual(S.shape, (3, 4, 200, len(t)))
+        for i, sigma in enumerate(sigmas):
+            for j, mu in enumerate(mus):
+                _, ref = simulate_paths(100, mu, sigma, 1.0, 0.05, 200, seed=3)
+                np.testing.assert_allclose(S[i, j], ref, rtol=1e-12)
+
+    def test_streamed_scenarios(self):
+        sigmas = np.array([5.0, 15.0])
+        _, S = simulate_paths(100, 2.0, sigmas, 1.0, 0.05, 300, seed=4)
+        blocks = list(iter_paths(100, 2.0, sigmas, 1.0, 0.05, 300, seed=4, block_size=64))
+        np.testing.assert_array_equal(np.concatenate([b.S for b in blocks], axis=-2), S)
+
+        budget = 200_000
+        for by in ('paths', 'time'):
+            blocks = list(iter_paths(100, 2.0, sigmas, 1.0, 0.01, 300, seed=4, by=by, max_bytes=budget))
+            self.assertLessEqual(max(b.S.nbytes for b in blocks), budget)
+            self.assertEqual(blocks[0].S.shape[0], 2)
+
 if __name__ == '__main__':
     unittest.main()
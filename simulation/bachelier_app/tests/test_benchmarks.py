@@ -0,0 +1,42 @@
+
+import os
+import unittest
+from benchmarks.suite import CASES, DEFAULT_BASELINE, METRICS, compare, load_baseline, run_suite
+
+class TestRegressionGate(unittest.TestCase):
+
+    def test_compare_flags_only_real_regressions(self):
+        baseline = {
+            'a': {'seconds': 1.0, 'peak_rss_bytes': 100 * 1024 ** 2, 'traced_peak_bytes': 1000, 'allocated_blocks': 50},
+            'b': {'seconds': 1.0, 'peak_rss_bytes': 0, 'traced_peak_bytes': 0, 'allocated_blocks': 1000},
+        }
+        results = {
+            'a': {'seconds': 1.2, 'peak_rss_bytes': 150 * 1024 ** 2, 'traced_peak_bytes': 2000, 'allocated_blocks': 120},
+            'b': {'seconds': 2.0, 'peak_rss_bytes': 0, 'traced_peak_bytes': 0, 'allocated_blocks': 2000},
+            'new case': {'seconds': 9.0, 'peak_rss_bytes': 0, 'traced_peak_bytes': 0, 'allocated_blocks': 0},
+        }
+        regressions = compare(results, baseline, time_tolerance=0.3, memory_tolerance=0.1)
+        # 20% slower is within tolerance; +1 KB traced and +70 blocks are below the noise floors
+        self.assertEqual([(key, metric) for key, metric, _, _ in regressions],
+                         [('a', 'peak_rss_bytes'), ('b', 'seconds'), ('b', 'allocated_blocks')])
+
+@unittest.skipUnless(os.environ.get('BACHELIER_BENCHMARKS'), "set BACHELIER_BENCHMARKS=1 to run the benchmark suite")
+class TestBenchmarkSuite(unittest.TestCase):
+    """
+    Opt-in: measures every case and fails on regressions against the
+    baseline recorded on this machine with `python -m benchmarks.suite --save`.
+    Baselines are machine-specific, so none is committed; without one the
+    test is skipped with that reason rather than passing silently.
+    """
+
+    def test_suite_against_baseline(self):
+        if not os.path.exists(DEFAULT_BASELINE):
+            self.skipTest(f"no benchmark baseline at {DEFAULT_BASELINE}; "
+                          "record one with `python -m benchmarks.suite --save` to enable the regression gate")
+        results = run_suite(list(CASES), [1000], [100], repeat=3)
+        for metrics in results.values():
+            self.assertEqual(set(metrics), set(METRICS))
+        self.assertEqual(compare(results, load_baseline(DEFAULT_BASELINE)), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+
+import threading
+import time
+import unittest
+import numpy as np
+from services.cache import ResultCache, estimate_nbytes
+
+class TestResultCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = ResultCache()
+        calls = []
+        compute = lambda: calls.append(1) or np.arange(10.0)
+
+        first = cache.get_or_compute(('paths', 1), compute)
+        second = cache.get_or_compute(('paths', 1), compute)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['bytes'], 80)
+
+    def test_lru_eviction_by_bytes(self):
+        """
+        The least recently used entry is dropped once the byte budget is exceeded.
+        """
+        cache = ResultCache(max_bytes=200)
+        cache.put('a', np.zeros(10))
+        cache.put('b', np.zeros(10))
+        cache.get('a')  # 'b' is now the oldest
+        cache.put('c', np.zeros(10))
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertLessEqual(cache.stats()['bytes'], 200)
+
+    def test_oversized_values_are_not_stored(self):
+        cache = ResultCache(max_bytes=100)
+        value = cache.put('big', np.zeros(100))
+        self.assertEqual(value.shape, (100,))
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_requests_compute_once(self):
+        cache = ResultCache()
+        calls = []
+        gate = threading.Event()
+
+        def compute():
+            calls.append(1)
+            gate.wait(1.0)
+            return 42
+
+        threads = [threading.Thread(target=cache.get_or_compute, args=('k', compute)) for _ in range(4)]
+        for th in threads:
+            th.start()
+        gate.set()
+        for th in threads:
+            th.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get('k'), 42)
+
+    def test_concurrent_oversized_requests_compute_once(self):
+        """
+        Callers queued behind a value too large to store get it handed over
+        instead of computing it again, and no key lock is left behind.
+        """
+        cache = ResultCache(max_bytes=100)
+        calls, results = [], []
+        gate = threading.Event()
+
+        def compute():
+            calls.append(1)
+            gate.wait(1.0)
+            return np.zeros(100)
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)))
+                   for _ in range(4)]
+        for th in threads:
+            th.start()
+        while cache._key_locks.get('k', [None, 0])[1] < 4:
+            time.sleep(0.001)
+        gate.set()
+        for th in threads:
+            th.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache._key_locks, {})
+
+    def test_estimate_nbytes_recurses(self):
+        t, S = np.zeros(11), np.zeros((5, 11))
+        self.assertGreaterEqual(estimate_nbytes((t, S)), t.nbytes + S.nbytes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+
+import unittest
+import numpy as np
+from models.bachelier import theoretical_pdf
+from models.density import SIGMA_LEVELS, density_surface, theoretical_cdf, theoretical_quantile
+
+class TestAnalyticDistribution(unittest.TestCase):
+
+    def test_pdf_broadcasts_over_time(self):
+        x = np.linspace(0, 200, 101)
+        t = np.array([0.25, 1.0, 2.0])
+        surface = theoretical_pdf(x[None, :], t[:, None], 100, 5, 20)
+        for row, ti in zip(surface, t):
+            np.testing.assert_allclose(row, theoretical_pdf(x, ti, 100, 5, 20))
+
+    def test_zero_time_is_a_delta(self):
+        """
+        The point mass at t = 0 has no pointwise density: the pdf is 0
+        everywhere, mean included, and a surface mixing t = 0 with later
+        times stays finite.
+        """
+        x = np.array([99.0, 100.0, 101.0])
+        np.testing.assert_array_equal(theoretical_pdf(x, 0.0, 100, 5, 20), [0, 0, 0])
+        self.assertTrue(np.isfinite(theoretical_pdf(x[None, :], np.array([[0.0], [1.0]]), 100, 5, 20)).all())
+        np.testing.assert_array_equal(theoretical_cdf(x, 0.0, 100, 5, 20), [0, 1, 1])
+        np.testing.assert_array_equal(theoretical_quantile(np.array([0.01, 0.5, 0.99]), 0.0, 100, 5, 20), 100)
+
+    def test_quantile_inverts_cdf(self):
+        q = np.array([0.01, 0.2, 0.5, 0.9])
+        t = np.array([0.1, 1.0, 3.0])
+        x = theoretical_quantile(q[:, None], t[None, :], 100, -5, 30)
+        np.testing.assert_allclose(theoretical_cdf(x, t[None, :], 100, -5, 30), np.broadcast_to(q[:, None], x.shape))
+
+    def test_surface(self):
+        t = np.linspace(0, 2, 41)
+        x = np.linspace(0, 220, 881)
+        surface = density_surface(t, 100, 5, 20, x=x)
+        self.assertEqual(surface.pdf.shape, (41, 881))
+        self.assertEqual(surface.quantiles.shape, (len(SIGMA_LEVELS), 41))
+        # Every row, including the t = 0 spike, integrates to one on the grid
+        np.testing.assert_allclose(surface.pdf.sum(axis=1) * (x[1] - x[0]), 1, atol=1e-3)
+        np.testing.assert_allclose(surface.quantiles[1], surface.mean - surface.std, rtol=1e-12)
+        np.testing.assert_allclose(surface.quantiles[:, 0], 100)
+        np.testing.assert_allclose(surface.cdf[:, -1], 1, atol=1e-3)
+
+    def test_float32_output(self):
+        surface = density_surface(np.linspace(0, 1, 11), 100, 0, 20, x=np.linspace(50, 150, 64), dtype=np.float32)
+        for name in ('x', 't', 'mean', 'std', 'pdf', 'cdf', 'quantiles'):
+            self.assertEqual(getattr(surface, name).dtype, np.float32, msg=name)
+        reference = density_surface(np.linspace(0, 1, 11), 100, 0, 20, x=np.linspace(50, 150, 64))
+        np.testing.assert_allclose(surface.pdf[1:], reference.pdf[1:], rtol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
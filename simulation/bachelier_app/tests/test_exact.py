@@ -0,0 +1,81 @@
+
+import unittest
+import numpy as np
+from models.bachelier import theoretical_stats
+from models.exact import (barrier_statistics, bridge_crossing_probability, first_passage_time, hit_probability,
+                          path_hit_probability, sample_extreme, sample_terminal)
+from models.path_store import PathStore
+
+class TestExactSamplers(unittest.TestCase):
+
+    def test_terminal_moments(self):
+        S_T = sample_terminal(100, 10, 20, 2.0, 200000, seed=1)
+        theo_mean, theo_var = theoretical_stats(2.0, 100, 10, 20)
+        self.assertAlmostEqual(S_T.mean(), theo_mean, delta=0.3)
+        self.assertAlmostEqual(S_T.var() / theo_var, 1.0, delta=0.01)
+
+    def test_samples_are_prefix_stable(self):
+        """
+        The first n samples of a larger draw equal a draw of n, and the
+        extremes share their S_T with sample_terminal.
+        """
+        small = sample_terminal(0, 0, 1, 1.0, 1000, seed=5, chunk_size=256)
+        large = sample_terminal(0, 0, 1, 1.0, 5000, seed=5, chunk_size=256)
+        np.testing.assert_array_equal(small, large[:1000])
+
+        S_T, M = sample_extreme(0, 0, 1, 1.0, 5000, seed=5, chunk_size=256)
+        np.testing.assert_array_equal(S_T, large)
+        np.testing.assert_array_equal(sample_extreme(0, 0, 1, 1.0, 1000, seed=5, chunk_size=256)[1], M[:1000])
+
+    def test_extremes_bound_terminal_and_match_reflection(self):
+        for mu in (15, 0, -15):
+            S_T, M = sample_extreme(100, mu, 20, 1.0, 200000, seed=2)
+            _, m = sample_extreme(100, mu, 20, 1.0, 200000, kind='min', seed=2)
+            self.assertTrue((M >= np.maximum(S_T, 100)).all())
+            self.assertTrue((m <= np.minimum(S_T, 100)).all())
+            self.assertAlmostEqual(np.mean(M >= 130), hit_probability(100, mu, 20, 1.0, 130), delta=0.005)
+            self.assertAlmostEqual(np.mean(m <= 70), hit_probability(100, mu, 20, 1.0, 70), delta=0.005)
+
+    def test_first_passage_times(self):
+        """
+        Hitting times reproduce the analytic hit probability for drift
+        towards, away from and without drift relative to the barrier.
+        """
+        for mu in (15, 0, -15):
+            for barrier in (130, 75):
+                tau = first_passage_time(100, mu, 20, barrier, 200000, seed=3)
+                for T in (0.5, 2.0):
+                    self.assertAlmostEqual(np.mean(tau <= T), hit_probability(100, mu, 20, T, barrier), delta=0.005)
+        self.assertTrue(np.isinf(first_passage_time(100, -15, 20, 130, 1000, seed=3)).any())
+        np.testing.assert_array_equal(first_passage_time(100, 5, 20, 100, 10), 0)
+
+    def test_passage_times_are_independent_of_terminal_draws(self):
+        """
+        With the same seed, hitting times do not reuse the shocks behind
+        S_T or the running maximum.
+        """
+        S_T, M = sample_extreme(100, 0, 20, 1.0, 200000, seed=1)
+        hit = first_passage_time(100, 0, 20, 130, 200000, seed=1) <= 1.0
+        for other in (np.abs(S_T - 100) >= 30, M >= 130):
+            self.assertLess(abs(np.corrcoef(hit, other)[0, 1]), 0.01)
+
+    def test_bridge_correction_removes_monitoring_bias(self):
+        """
+        Checking only sampled points misses crossings; the bridge
+        probabilities recover the continuous hit probability.
+        """
+        t, S = PathStore(100, 0, 20, 1.0, 20000, seed=4, base_dt=0.05).view(0.05)
+        exact = hit_probability(100, 0, 20, 1.0, 130)
+        self.assertLess(np.mean(S.max(axis=1) >= 130), exact - 0.02)
+        self.assertAlmostEqual(path_hit_probability(t, S, 130, 20).mean(), exact, delta=0.006)
+
+        sampled, corrected = barrier_statistics(t, S, 130, 20, max_bytes=1 << 20)
+        self.assertEqual(sampled, np.mean(S.max(axis=1) >= 130))
+        self.assertAlmostEqual(corrected, path_hit_probability(t, S, 130, 20).mean())
+
+        self.assertEqual(bridge_crossing_probability(120, 131, 130, 20, 0.01), 1.0)
+        self.assertAlmostEqual(bridge_crossing_probability(120, 125, 130, 20, 0.01), np.exp(-2 * 50 / 4.0))
+        self.assertAlmostEqual(bridge_crossing_probability(80, 75, 70, 20, 0.01, upper=False), np.exp(-2 * 50 / 4.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from models.bachelier import simulate_paths, iter_paths
+from services import export
+from services.export import export_bytes, export_to_file, time_slices, iter_csv_chunks
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.t, self.S = simulate_paths(100, 5, 20, 1.0, 0.01, 20, seed=42)
+
+    def test_csv_layout(self):
+        """
+        One row per time step, time first, one column per path.
+        """
+        data = export_bytes(self.t, self.S, 'csv')
+        lines = data.decode().splitlines()
+        self.assertEqual(lines[0], ',' + ','.join(str(i) for i in range(20)))
+
+        values = np.loadtxt(io.StringIO('\n'.join(lines[1:])), delimiter=',')
+        # Full precision: parsing the CSV gives back the exact floats
+        np.testing.assert_array_equal(values[:, 0], self.t)
+        np.testing.assert_array_equal(values[:, 1:], self.S.T)
+
+    def test_chunking_does_not_change_csv(self):
+        whole = b''.join(iter_csv_chunks(time_slices(self.t, self.S, 1000), 20))
+        chunked = b''.join(iter_csv_chunks(time_slices(self.t, self.S, 7), 20))
+        self.assertEqual(whole, chunked)
+
+    def test_binary_roundtrip(self):
+        S = np.load(io.BytesIO(export_bytes(self.t, self.S, 'npy')))
+        np.testing.assert_array_equal(S, self.S)
+
+        bundle = np.load(io.BytesIO(export_bytes(self.t, self.S, 'npz')))
+        np.testing.assert_array_equal(bundle['t'], self.t)
+        np.testing.assert_array_equal(bundle['S'], self.S)
+
+    def test_streamed_memmap_matches_in_memory(self):
+        """
+        Path blocks written to a memory-mapped .npy reproduce simulate_paths.
+        """
+        blocks = iter_paths(100, 5, 20, 1.0, 0.01, 20, seed=42, block_size=6)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'paths.npy')
+            export_to_file(path, blocks, 'npy', 20, 100)
+            np.testing.assert_array_equal(np.load(path), self.S)
+
+    @unittest.skipIf('parquet' not in export.available_formats(), "pyarrow not installed")
+    def test_parquet_roundtrip(self):
+        _, pq = export._pyarrow()
+        table = pq.read_table(io.BytesIO(export_bytes(self.t, self.S, 'parquet')))
+        self.assertEqual(table.num_rows, len(self.t))
+        np.testing.assert_array_equal(table.column('t').to_numpy(), self.t)
+        np.testing.assert_array_equal(table.column('3').to_numpy(), self.S[3])
+
+if __name__ == '__main__':
+    unittest.main()
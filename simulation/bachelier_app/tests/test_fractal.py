@@ -0,0 +1,96 @@
+
+import unittest
+import numpy as np
+from models.fractal import (
+    fgn_circulant_eigenvalues, fractional_gaussian_noise, stable_shocks, student_t_shocks,
+    simulate_fractal_paths, simulate_regime_switching, stationary_distribution,
+)
+
+def fgn_autocovariance(k, H):
+    k = np.abs(np.asarray(k, dtype=float))
+    return 0.5 * ((k + 1) ** (2 * H) - 2 * k ** (2 * H) + np.abs(k - 1) ** (2 * H))
+
+class TestFractionalBrownianMotion(unittest.TestCase):
+
+    def test_embedding_is_non_negative(self):
+        for H in (0.05, 0.3, 0.5, 0.7, 0.95):
+            self.assertGreaterEqual(fgn_circulant_eigenvalues(1000, H).min(), 0.0)
+        with self.assertRaises(ValueError):
+            fgn_circulant_eigenvalues(10, 1.0)
+
+    def test_noise_autocovariance(self):
+        """
+        Davies-Harte is exact: sample autocovariances match gamma(k).
+        """
+        rng = np.random.default_rng(0)
+        for H in (0.25, 0.75):
+            X = fractional_gaussian_noise(rng, 40000, 32, H)
+            sample = [np.mean(X[:, 5] * X[:, 5 + k]) for k in range(4)]
+            np.testing.assert_allclose(sample, fgn_autocovariance(np.arange(4), H), atol=0.03)
+
+    def test_variance_scales_as_t_to_2H(self):
+        t, S = simulate_fractal_paths(100, 5, 20, 1.0, 0.01, 20000, 'fgn', seed=1, H=0.8)
+        var = S.var(axis=0)
+        for k in (10, 50, 100):
+            self.assertAlmostEqual(var[k] / (400 * t[k] ** 1.6), 1.0, delta=0.05)
+        self.assertAlmostEqual(S[:, -1].mean(), 105, delta=0.5)
+
+class TestFatTails(unittest.TestCase):
+
+    def test_student_t_is_unit_variance(self):
+        X = student_t_shocks(np.random.default_rng(0), 1, 1000000, nu=5)
+        self.assertAlmostEqual(X.var(), 1.0, delta=0.03)
+        with self.assertRaises(ValueError):
+            student_t_shocks(np.random.default_rng(0), 1, 10, nu=2)
+
+    def test_stable_special_cases_and_tails(self):
+        rng = np.random.default_rng(0)
+        self.assertAlmostEqual(stable_shocks(rng, 1, 1000000, 2.0).var(), 1.0, delta=0.01)
+        # alpha=1 is a Cauchy law of scale 1/2
+        self.assertAlmostEqual(np.median(np.abs(stable_shocks(rng, 1, 1000000, 1.0))), 0.5, delta=0.005)
+        # P(|X| > x) ~ x^-alpha
+        X = np.abs(stable_shocks(rng, 1, 2000000, 1.5))
+        ratio = np.mean(X > 10) / np.mean(X > 20)
+        self.assertAlmostEqual(np.log2(ratio), 1.5, delta=0.15)
+        skewed = stable_shocks(rng, 1, 1000000, 1.5, beta=0.8)
+        self.assertGreater(np.mean(skewed > 5), 3 * np.mean(skewed < -5))
+
+class TestSeeding(unittest.TestCase):
+
+    def test_batches_are_prefix_stable(self):
+        """
+        The first n paths do not depend on N, across chunk boundaries too.
+        """
+        for kind, params in [('fgn', {'H': 0.3}), ('student_t', {'nu': 3}), ('stable', {'alpha': 1.5}), ('gaussian', {})]:
+            _, small = simulate_fractal_paths(100, 0, 20, 1.0, 0.01, 21, kind, seed=3, chunk_size=8, **params)
+            _, large = simulate_fractal_paths(100, 0, 20, 1.0, 0.01, 40, kind, seed=3, chunk_size=8, **params)
+            np.testing.assert_array_equal(small, large[:21], err_msg=kind)
+            _, other = simulate_fractal_paths(100, 0, 20, 1.0, 0.01, 21, kind, seed=4, chunk_size=8, **params)
+            self.assertFalse(np.array_equal(other, small))
+
+    def test_unknown_increments(self):
+        with self.assertRaises(ValueError):
+            simulate_fractal_paths(100, 0, 20, 1.0, 0.1, 5, 'levy')
+
+class TestRegimeSwitching(unittest.TestCase):
+
+    def test_occupancy_and_regime_volatility(self):
+        P = [[0.99, 0.01], [0.04, 0.96]]
+        np.testing.assert_allclose(stationary_distribution(P), [0.8, 0.2])
+
+        dt = 0.001
+        t, S, regimes = simulate_regime_switching(100, 0, [10, 40], 1.0, dt, 2000, P, seed=2)
+        self.assertEqual(regimes.shape, (2000, len(t) - 1))
+        np.testing.assert_allclose(np.bincount(regimes.ravel()) / regimes.size, [0.8, 0.2], atol=0.02)
+
+        dS = np.diff(S, axis=1)
+        for k, sigma in enumerate((10, 40)):
+            self.assertAlmostEqual(dS[regimes == k].std() / np.sqrt(dt), sigma, delta=0.02 * sigma)
+
+    def test_shocks_match_the_plain_generator(self):
+        _, S, regimes = simulate_regime_switching(0, 0, [1, 3], 1.0, 0.01, 50, [[0.9, 0.1], [0.1, 0.9]], seed=7)
+        _, W = simulate_fractal_paths(0, 0, 1, 1.0, 0.01, 50, 'gaussian', seed=7)
+        np.testing.assert_allclose(np.diff(S, axis=1), np.diff(W, axis=1) * np.array([1, 3])[regimes])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+
+import glob
+import os
+import subprocess
+import sys
+import unittest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('scipy', 'streamlit', 'plotly', 'pandas', 'pyarrow')
+
+def imported_heavy_modules(statement):
+    """
+    Runs `statement` in a fresh interpreter and returns which of HEAVY it imported.
+    """
+    code = f"import sys; {statement}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR, capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(',') if m]
+
+class TestLightweightImports(unittest.TestCase):
+
+    def test_models_do_not_import_ui_or_scipy(self):
+        modules = sorted(os.path.basename(p)[:-3] for p in glob.glob(os.path.join(APP_DIR, 'models', '*.py')))
+        statement = '; '.join(f"import models.{m}" for m in modules if m != '__init__')
+        self.assertEqual(imported_heavy_modules(statement), [])
+
+    def test_cli_and_services_stay_light(self):
+        self.assertEqual(imported_heavy_modules("import cli, services.export, services.cache, services.profiling"), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+
+import unittest
+import numpy as np
+from models.bachelier import simulate_paths, theoretical_stats
+from models.parallel import simulate_paths_parallel, path_chunks
+
+class TestParallelSimulation(unittest.TestCase):
+
+    def test_bit_identical_across_worker_counts(self):
+        """
+        The same seed gives the same ensemble for any pool size or executor.
+        """
+        args = (100, 5, 20, 1.0, 0.01, 2500)
+        t, reference = simulate_paths_parallel(*args, seed=42, workers=1, chunk_size=512)
+
+        for workers, executor in [(2, 'thread'), (4, 'thread'), (3, 'process')]:
+            _, S = simulate_paths_parallel(*args, seed=42, workers=workers,
+                                           executor=executor, chunk_size=512)
+            np.testing.assert_array_equal(S, reference)
+
+        self.assertEqual(reference.shape, (2500, len(t)))
+        _, other = simulate_paths_parallel(*args, seed=43, workers=1, chunk_size=512)
+        self.assertFalse(np.array_equal(other, reference))
+
+    def test_statistics(self):
+        """
+        Independent chunk streams still produce the theoretical terminal moments.
+        """
+        S0, mu, sigma, T = 100, 10, 20, 1.0
+        _, S = simulate_paths_parallel(S0, mu, sigma, T, 0.01, 20000, seed=1, chunk_size=1000)
+        theo_mean, theo_var = theoretical_stats(T, S0, mu, sigma)
+        self.assertAlmostEqual(np.mean(S[:, -1]), theo_mean, delta=1.0)
+        self.assertAlmostEqual(np.var(S[:, -1]), theo_var, delta=20.0)
+
+    def test_chunking(self):
+        self.assertEqual(path_chunks(10, 4), [(0, 4), (4, 8), (8, 10)])
+        self.assertEqual(path_chunks(0, 4), [])
+
+    def test_simulate_paths_leaves_global_rng_alone(self):
+        np.random.seed(0)
+        expected = np.random.normal(size=3)
+        np.random.seed(0)
+        simulate_paths(100, 0, 20, 1.0, 0.01, 10, seed=5)
+        np.testing.assert_array_equal(np.random.normal(size=3), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+
+import unittest
+import numpy as np
+from models.bachelier import theoretical_stats
+from models.path_store import PathStore
+
+class TestPathStore(unittest.TestCase):
+
+    def test_refinement_keeps_existing_points(self):
+        """
+        Finer levels pass through every point of the coarser ones.
+        """
+        store = PathStore(100, 5, 20, 1.0, 300, seed=42, base_dt=0.05)
+        t0, S0 = store.view(0.05)
+        t2, S2 = store.view(0.0125)
+
+        self.assertEqual(store.level, 2)
+        self.assertEqual(S2.shape, (300, 81))
+        np.testing.assert_array_equal(S2[:, ::4], S0)
+        np.testing.assert_allclose(t2[::4], t0)
+        self.assertAlmostEqual(t2[-1], 1.0)
+
+    def test_deterministic_regardless_of_request_order(self):
+        direct = PathStore(0, 0, 1, 1.0, 50, seed=7, base_dt=0.1)
+        stepwise = PathStore(0, 0, 1, 1.0, 50, seed=7, base_dt=0.1)
+        for dt in (0.1, 0.05, 0.1, 0.0125):
+            stepwise.view(dt)
+
+        np.testing.assert_array_equal(direct.view(0.0125)[1], stepwise.view(0.0125)[1])
+        np.testing.assert_array_equal(direct.view(0.05)[1], stepwise.view(0.05)[1])
+
+    def test_fine_increments_have_abm_law(self):
+        """
+        After bridge refinement the finest increments are N(mu*h, sigma^2*h).
+        """
+        mu, sigma = 10, 20
+        store = PathStore(100, mu, sigma, 1.0, 4000, seed=1, base_dt=0.1)
+        t, S = store.view(0.025)
+        h = t[1] - t[0]
+        dS = np.diff(S, axis=1)
+
+        self.assertAlmostEqual(np.mean(dS), mu * h, delta=0.05)
+        self.assertAlmostEqual(np.var(dS) / (sigma ** 2 * h), 1.0, delta=0.02)
+        # Increments inside one coarse interval are uncorrelated
+        self.assertLess(abs(np.corrcoef(dS[:, 0], dS[:, 1])[0, 1]), 0.05)
+
+        theo_mean, theo_var = theoretical_stats(1.0, 100, mu, sigma)
+        self.assertAlmostEqual(np.mean(S[:, -1]), theo_mean, delta=1.0)
+        self.assertAlmostEqual(np.var(S[:, -1]), theo_var, delta=25.0)
+
+    def test_coarse_dt_strides_base_grid(self):
+        store = PathStore(100, 0, 20, 1.37, 10, seed=3, base_dt=0.01)
+        t, S = store.view(0.1)
+        self.assertEqual(store.level, 0)
+        self.assertAlmostEqual(t[-1], 1.37)
+        np.testing.assert_allclose(np.diff(t)[:-1], 0.1)
+
+    def test_refine_iter_is_progressive(self):
+        store = PathStore(100, 0, 20, 1.0, 10, seed=3, base_dt=0.1)
+        levels = [level for level, t, S in store.refine_iter(0.02)]
+        self.assertEqual(levels, [0, 1, 2, 3])
+
+    def test_extend_matches_fresh_store(self):
+        """
+        Growing T and N at a refined level gives exactly the ensemble of a
+        store created at the larger size.
+        """
+        fresh = PathStore(100, 5, 20, 2.5, 300, seed=9, base_dt=0.05, block_size=128, tile_steps=16)
+        grown = PathStore(100, 5, 20, 1.0, 100, seed=9, base_dt=0.05, block_size=128, tile_steps=16)
+        grown.view(0.0125)
+        grown.extend(N=300, T=2.5)
+
+        self.assertEqual((grown.N, grown.base_steps, grown.level), (300, 50, 2))
+        np.testing.assert_array_equal(grown.view(0.0125)[1], fresh.view(0.0125)[1])
+
+    def test_truncate_and_view_are_prefixes(self):
+        store = PathStore(0, 0, 1, 2.0, 200, seed=4, base_dt=0.1, block_size=64, tile_steps=8)
+        t, S = store.view(0.05)
+        t_small, S_small = store.view(0.05, N=50, T=1.0)
+
+        self.assertAlmostEqual(t_small[-1], 1.0)
+        np.testing.assert_array_equal(S_small, S[:50, :len(t_small)])
+        self.assertEqual(store.N, 200)
+
+        store.truncate(N=50, T=1.0)
+        self.assertEqual((store.N, store.nbytes), (50, S_small.size * 8))
+        store.extend(N=200, T=2.0)
+        np.testing.assert_array_equal(store.view(0.05)[1], S)
+
+    def test_view_reports_snapped_horizon(self):
+        """
+        A T off the base grid is rounded to whole base steps, and t[-1]
+        and horizon() report what was simulated.
+        """
+        store = PathStore(0, 0, 1, 1.0, 10, seed=2, base_dt=0.1)
+        t, S = store.view(0.05, T=1.23)
+        self.assertAlmostEqual(t[-1], 1.2)
+        self.assertAlmostEqual(store.horizon(1.23), t[-1])
+        self.assertEqual(S.shape[1], len(t))
+        self.assertAlmostEqual(store.view(0.03)[0][1], 0.025)
+
+if __name__ == '__main__':
+    unittest.main()
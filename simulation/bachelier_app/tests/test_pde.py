@@ -0,0 +1,54 @@
+
+import unittest
+import numpy as np
+from models.bachelier import theoretical_pdf
+from models.pde import cell_grid, point_mass, solve_fokker_planck, absorbed_pdf
+
+class TestFokkerPlanck(unittest.TestCase):
+
+    def test_free_space_matches_kernel(self):
+        x, h = cell_grid(0, 200, 800)
+        p = solve_fokker_planck(point_mass(x, 100.0), x, 5.0, 20.0, 1.0, n_steps=200)
+        np.testing.assert_allclose(p, theoretical_pdf(x, 1.0, 100.0, 5.0, 20.0), atol=1e-5)
+        self.assertAlmostEqual(p.sum() * h, 1.0, places=5)
+
+    def test_absorbing_barriers_match_images(self):
+        S0, mu, sigma, T = 100.0, 5.0, 20.0, 1.0
+        x, _ = cell_grid(80, 250, 850)
+        p = solve_fokker_planck(point_mass(x, S0), x, mu, sigma, T, lower='absorbing')
+        np.testing.assert_allclose(p, absorbed_pdf(x, T, S0, mu, sigma, 80.0), atol=1e-5)
+
+        x, _ = cell_grid(-50, 130, 900)
+        p = solve_fokker_planck(point_mass(x, S0), x, mu, sigma, T, upper='absorbing')
+        np.testing.assert_allclose(p, absorbed_pdf(x, T, S0, mu, sigma, 130.0), atol=1e-5)
+
+    def test_reflecting_barrier(self):
+        """
+        Without drift, a reflecting barrier folds the free density back onto
+        itself, and the total mass is conserved to round-off.
+        """
+        S0, sigma, T, L = 100.0, 20.0, 1.0, 80.0
+        x, h = cell_grid(L, 250, 850)
+        p = solve_fokker_planck(point_mass(x, S0), x, 0.0, sigma, T, lower='reflecting', upper='reflecting')
+        folded = theoretical_pdf(x, T, S0, 0.0, sigma) + theoretical_pdf(x, T, 2 * L - S0, 0.0, sigma)
+        np.testing.assert_allclose(p, folded, atol=1e-5)
+
+        p = solve_fokker_planck(point_mass(x, S0), x, 30.0, sigma, 3.0, lower='reflecting', upper='reflecting')
+        self.assertAlmostEqual(p.sum() * h, 1.0, places=10)
+
+    def test_batched_parameter_sets(self):
+        x, _ = cell_grid(0, 200, 400)
+        mus = np.array([-10.0, 0.0, 10.0])[:, None]
+        sigmas = np.array([10.0, 20.0])
+        P = solve_fokker_planck(point_mass(x, 100.0), x, mus, sigmas, 1.0, n_steps=50, lower='reflecting')
+        self.assertEqual(P.shape, (3, 2, 400))
+        single = solve_fokker_planck(point_mass(x, 100.0), x, 10.0, 20.0, 1.0, n_steps=50, lower='reflecting')
+        np.testing.assert_allclose(P[2, 1], single, atol=1e-14)
+
+        t, history = solve_fokker_planck(point_mass(x, 100.0), x, mus, sigmas, 1.0, n_steps=50, save_every=20)
+        np.testing.assert_allclose(t, [0, 0.4, 0.8, 1.0])
+        self.assertEqual(history.shape, (4, 3, 2, 400))
+        np.testing.assert_allclose(history[-1], solve_fokker_planck(point_mass(x, 100.0), x, mus, sigmas, 1.0, n_steps=50))
+
+if __name__ == '__main__':
+    unittest.main()
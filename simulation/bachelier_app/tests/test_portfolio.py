@@ -0,0 +1,104 @@
+
+import unittest
+import numpy as np
+from models.portfolio import (
+    FACTOR_METHODS, covariance_factor, covariance_matrix, efficient_frontier, long_only_frontier,
+    portfolio_stats, project_to_simplex, sample_portfolios, simulate_assets,
+)
+
+def market(d, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((d, d))
+    return rng.uniform(0.02, 0.15, d), A @ A.T / d + 0.1 * np.eye(d)
+
+class TestCorrelatedAssets(unittest.TestCase):
+
+    def test_factors(self):
+        _, cov = market(6)
+        for method in FACTOR_METHODS:
+            L = covariance_factor(cov, method)
+            np.testing.assert_allclose(L @ L.T, cov, atol=1e-12, err_msg=method)
+        # Rank-deficient covariances need the eigen factor
+        X = np.random.default_rng(1).standard_normal((3, 6))
+        singular = X.T @ X
+        L = covariance_factor(singular, 'eigen')
+        np.testing.assert_allclose(L @ L.T, singular, atol=1e-10)
+        with self.assertRaises(np.linalg.LinAlgError):
+            covariance_factor(singular, 'cholesky')
+
+    def test_terminal_moments(self):
+        sigma = np.array([10.0, 20.0, 30.0])
+        corr = np.array([[1.0, 0.5, -0.3], [0.5, 1.0, 0.2], [-0.3, 0.2, 1.0]])
+        cov = covariance_matrix(sigma, corr)
+        t, S = simulate_assets([100, 50, 80], [1, 2, 3], cov, 2.0, 0.05, 20000, seed=1)
+        self.assertEqual(S.shape, (20000, len(t), 3))
+        np.testing.assert_array_equal(S[0, 0], [100, 50, 80])
+        dS = S[:, -1] - S[:, 0]
+        np.testing.assert_allclose(dS.mean(axis=0), [2, 4, 6], atol=0.6)
+        np.testing.assert_allclose(np.corrcoef(dS.T), corr, atol=0.02)
+        np.testing.assert_allclose(dS.std(axis=0), sigma * np.sqrt(2.0), rtol=0.02)
+
+    def test_seeding_is_prefix_stable(self):
+        mean, cov = market(4)
+        _, small = simulate_assets(100, mean, cov, 1.0, 0.1, 20, seed=3, chunk_size=8)
+        _, large = simulate_assets(100, mean, cov, 1.0, 0.1, 50, seed=3, chunk_size=8)
+        np.testing.assert_array_equal(small, large[:20])
+
+class TestPortfolios(unittest.TestCase):
+
+    def test_vectorized_stats_match_a_loop(self):
+        mean, cov = market(5)
+        W = np.random.default_rng(2).dirichlet(np.ones(5), 10)
+        expected, variance = portfolio_stats(W, mean, cov)
+        for w, e, v in zip(W, expected, variance):
+            self.assertAlmostEqual(e, w @ mean)
+            self.assertAlmostEqual(v, w @ cov @ w)
+
+    def test_sampling_does_not_depend_on_the_memory_budget(self):
+        mean, cov = market(10)
+        whole = sample_portfolios(50000, mean, cov, seed=4, keep_weights=True)
+        again = sample_portfolios(50000, mean, cov, seed=4, max_bytes=1024 ** 2)
+        np.testing.assert_array_equal(again['std'], whole['std'])
+        np.testing.assert_allclose(whole['weights'].sum(axis=1), 1.0)
+        self.assertTrue((whole['weights'] >= 0).all())
+
+    def test_frontiers_dominate_random_portfolios(self):
+        mean, cov = market(8)
+        portfolios = sample_portfolios(200000, mean, cov, seed=5)
+        free = efficient_frontier(mean, cov, n_points=200)
+        np.testing.assert_allclose(free.weights.sum(axis=1), 1.0)
+        np.testing.assert_allclose(free.weights @ mean, free.mean)
+        np.testing.assert_allclose(np.sqrt(portfolio_stats(free.weights, mean, cov)[1]), free.std)
+
+        long_only = long_only_frontier(mean, cov, n_points=100)
+        self.assertTrue((long_only.weights >= 0).all())
+        np.testing.assert_allclose(long_only.weights.sum(axis=1), 1.0)
+        order = np.argsort(long_only.mean)
+        for frontier, (means, stds) in [('free', (free.mean, free.std)),
+                                        ('long-only', (long_only.mean[order], long_only.std[order]))]:
+            inside = (portfolios['mean'] >= means[0]) & (portfolios['mean'] <= means[-1])
+            bound = np.interp(portfolios['mean'][inside], means, stds)
+            self.assertTrue(np.all(portfolios['std'][inside] >= bound - 1e-6), frontier)
+        # Without short sales the frontier can only be worse
+        self.assertGreaterEqual(long_only.std[0], free.std[0] - 1e-9)
+
+    def test_long_only_solution_satisfies_kkt(self):
+        """
+        Where weights are positive the gradient of w'cov w - lam mu'w is
+        equal; elsewhere it is no smaller.
+        """
+        mean, cov = market(12, seed=3)
+        frontier = long_only_frontier(mean, cov, n_points=10, tol=1e-13, max_iter=20000)
+        w = frontier.weights[0]  # minimum variance, lam = 0
+        grad = 2 * cov @ w
+        active = w > 1e-8
+        self.assertLess(np.ptp(grad[active]), 1e-6)
+        self.assertTrue(np.all(grad[~active] >= grad[active].max() - 1e-6))
+
+    def test_simplex_projection(self):
+        V = np.array([[0.2, 0.3, 0.5], [2.0, 0.0, 0.0], [0.5, 0.5, -3.0], [-1.0, -1.0, -1.0]])
+        P = project_to_simplex(V)
+        np.testing.assert_allclose(P, [[0.2, 0.3, 0.5], [1, 0, 0], [0.5, 0.5, 0], [1 / 3, 1 / 3, 1 / 3]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+
+import unittest
+import warnings
+import numpy as np
+from models.pricing import bachelier_price, bachelier_greeks, implied_normal_vol, mc_check
+
+class TestClosedForm(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.F = 100 + rng.normal(0, 10, 500)
+        self.K = self.F + rng.normal(0, 20, 500)
+        self.T = rng.uniform(0.1, 2, 500)
+        self.sigma = rng.uniform(5, 40, 500)
+
+    def test_put_call_parity(self):
+        call = bachelier_price(self.F, self.K, self.T, self.sigma, 'call', r=0.03)
+        put = bachelier_price(self.F, self.K, self.T, self.sigma, 'put', r=0.03)
+        np.testing.assert_allclose(call - put, np.exp(-0.03 * self.T) * (self.F - self.K), atol=1e-10)
+
+        dcall = bachelier_price(self.F, self.K, self.T, self.sigma, 'digital_call')
+        dput = bachelier_price(self.F, self.K, self.T, self.sigma, 'digital_put')
+        np.testing.assert_allclose(dcall + dput, 1.0)
+
+    def test_mixed_kinds_in_one_call(self):
+        kinds = np.array(['call', 'put', 'digital_call', 'digital_put'])
+        mixed = bachelier_price(100.0, 105.0, 1.0, 20.0, kinds)
+        single = [bachelier_price(100.0, 105.0, 1.0, 20.0, k) for k in kinds]
+        np.testing.assert_allclose(mixed, single)
+        with self.assertRaises(ValueError):
+            bachelier_price(100.0, 105.0, 1.0, 20.0, 'straddle')
+
+    def test_greeks_match_finite_differences(self):
+        F, K, T, sigma, r = 100.0, 104.0, 0.75, 18.0, 0.02
+        h = 1e-4
+        for kind in ('call', 'put', 'digital_call', 'digital_put'):
+            g = bachelier_greeks(F, K, T, sigma, kind, r)
+            price = lambda **kw: bachelier_price(kw.get('F', F), K, kw.get('T', T), kw.get('sigma', sigma), kind, kw.get('r', r))
+            fd = {
+                'delta': (price(F=F + h) - price(F=F - h)) / (2 * h),
+                'gamma': (price(F=F + h) - 2 * price() + price(F=F - h)) / h ** 2,
+                'vega': (price(sigma=sigma + h) - price(sigma=sigma - h)) / (2 * h),
+                'theta': -(price(T=T + h) - price(T=T - h)) / (2 * h),
+                'rho': (price(r=r + h) - price(r=r - h)) / (2 * h),
+            }
+            for name, value in fd.items():
+                self.assertAlmostEqual(g[name], value, delta=1e-5 + 1e-4 * abs(value), msg=f"{kind} {name}")
+
+    def test_far_otm_prices_keep_precision(self):
+        """
+        Deep out-of-the-money prices stay positive and decreasing instead
+        of cancelling to zero or going negative.
+        """
+        prices = bachelier_price(100.0, np.array([150.0, 200.0, 250.0, 300.0]), 1.0, 10.0, 'call')
+        self.assertTrue((prices > 0).all())
+        self.assertTrue((np.diff(prices) < 0).all())
+
+class TestImpliedVol(unittest.TestCase):
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(1)
+        n = 20000
+        F = 100 + rng.normal(0, 10, n)
+        K = F + rng.normal(0, 30, n)
+        T = rng.uniform(0.05, 3, n)
+        sigma = rng.uniform(1, 60, n)
+        kind = np.where(rng.random(n) < 0.5, 'call', 'put')
+
+        price = bachelier_price(F, K, T, sigma, kind, r=0.01)
+        iv = implied_normal_vol(price, F, K, T, kind, r=0.01)
+
+        intrinsic = np.where(kind == 'call', np.maximum(F - K, 0), np.maximum(K - F, 0))
+        time_value = price * np.exp(0.01 * T) - intrinsic
+        # Out of the money the full price is time value, however small
+        otm = (intrinsic == 0) & (price > 1e-300)
+        np.testing.assert_allclose(iv[otm], sigma[otm], rtol=1e-10)
+        # In the money, only quotes whose time value is resolvable in the price
+        itm = (intrinsic > 0) & (time_value > 1e-6 * price)
+        np.testing.assert_allclose(iv[itm], sigma[itm], rtol=1e-8)
+
+    def test_edge_quotes(self):
+        self.assertEqual(implied_normal_vol(10.0, 100.0, 90.0, 1.0, 'call'), 0.0)
+        self.assertTrue(np.isnan(implied_normal_vol(5.0, 100.0, 90.0, 1.0, 'call')))
+        atm = bachelier_price(100.0, 100.0, 1.0, 20.0)
+        self.assertAlmostEqual(float(implied_normal_vol(atm, 100.0, 100.0, 1.0)), 20.0, places=10)
+        with self.assertRaises(ValueError):
+            implied_normal_vol(0.5, 100.0, 100.0, 1.0, 'digital_call')
+
+    def test_expired_quotes_are_nan_without_warnings(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            iv = implied_normal_vol([10.0, 10.0, 12.0], 100.0, 90.0, [1.0, 0.0, 0.0], 'call')
+        self.assertEqual(iv[0], 0.0)
+        self.assertTrue(np.isnan(iv[1:]).all())
+
+class TestMonteCarloCheck(unittest.TestCase):
+
+    def test_closed_form_agrees_with_simulation(self):
+        K = np.linspace(70, 130, 13)
+        for kind in ('call', 'put', 'digital_call', 'digital_put'):
+            z = mc_check(100.0, 5.0, 20.0, 1.0, K, kind, r=0.02, N=50000, seed=7)
+            self.assertLess(np.abs(z).max(), 4.5, msg=kind)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+
+import gc
+import json
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from services.profiling import Profiler
+
+class TestProfiler(unittest.TestCase):
+
+    def test_disabled_profiler_is_a_no_op(self):
+        profiler = Profiler(enabled=False, trace_memory=True)
+        with profiler.stage('a'):
+            pass
+        self.assertIs(profiler.stage('a'), profiler.stage('b'))
+        self.assertEqual(profiler.records, [])
+        self.assertFalse(profiler.trace_memory)
+
+    def test_nested_stages(self):
+        profiler = Profiler()
+        with profiler.stage('outer'):
+            time.sleep(0.01)
+            with profiler.stage('inner'):
+                time.sleep(0.01)
+        outer, inner = profiler.summary()
+        self.assertEqual((outer['name'], outer['depth']), ('outer', 0))
+        self.assertEqual((inner['name'], inner['depth']), ('inner', 1))
+        self.assertGreater(outer['seconds'], inner['seconds'])
+        self.assertGreaterEqual(inner['start'], outer['start'])
+        self.assertAlmostEqual(profiler.total_seconds, outer['seconds'])
+
+    def test_memory_peaks_fold_into_parents(self):
+        profiler = Profiler(trace_memory=True)
+        try:
+            with profiler.stage('outer'):
+                kept = np.ones(1_000_000)
+                with profiler.stage('inner'):
+                    np.ones(4_000_000).sum()
+        finally:
+            profiler.stop()
+        outer, inner = profiler.summary()
+        self.assertGreater(inner['memory_peak_bytes'], 30e6)
+        self.assertLess(abs(inner['memory_delta_bytes']), 1e6)
+        self.assertGreaterEqual(outer['memory_peak_bytes'], inner['memory_peak_bytes'])
+        self.assertGreater(outer['memory_delta_bytes'], 7e6)
+        del kept
+
+    def test_tracing_is_shared_and_released(self):
+        """
+        Overlapping profilers keep tracemalloc on until the last one stops,
+        and a profiler that is dropped without stop() still releases it.
+        """
+        if tracemalloc.is_tracing():
+            self.skipTest("tracemalloc already started outside the profiler")
+        with Profiler(trace_memory=True):
+            second = Profiler(trace_memory=True)
+            self.assertTrue(tracemalloc.is_tracing())
+        self.assertTrue(tracemalloc.is_tracing())
+        second.stop()
+        second.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+
+        Profiler(trace_memory=True)
+        gc.collect()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_exports(self):
+        profiler = Profiler()
+        with profiler.stage('simulate'):
+            pass
+        self.assertEqual(json.loads(profiler.to_json())['stages'][0]['name'], 'simulate')
+        event = json.loads(profiler.to_chrome_trace())['traceEvents'][0]
+        self.assertEqual((event['name'], event['ph']), ('simulate', 'X'))
+        self.assertGreaterEqual(event['dur'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
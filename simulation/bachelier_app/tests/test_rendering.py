@@ -0,0 +1,137 @@
+
+import unittest
+import numpy as np
+from models.bachelier import simulate_paths
+from ui.rendering import minmax_decimate, lttb_decimate, nan_separated, density_grid, quantile_fan
+from models.density import density_surface
+from ui.components import plot_paths, plot_distribution, plot_density_surface, animate_particle, animate_ensemble
+
+class TestDecimation(unittest.TestCase):
+
+    def setUp(self):
+        self.t, self.S = simulate_paths(100, 0, 20, 1.0, 0.001, 5, seed=42)
+
+    def test_minmax_keeps_envelope(self):
+        """
+        Min/max decimation keeps every path's extremes and endpoints.
+        """
+        x, y = minmax_decimate(self.t, self.S, 200)
+        self.assertLessEqual(y.shape[1], 200)
+        np.testing.assert_array_equal(y.max(axis=1), self.S.max(axis=1))
+        np.testing.assert_array_equal(y.min(axis=1), self.S.min(axis=1))
+        np.testing.assert_array_equal(y[:, 0], self.S[:, 0])
+        np.testing.assert_array_equal(y[:, -1], self.S[:, -1])
+        self.assertTrue(np.all(np.diff(x, axis=1) >= 0))
+
+    def test_lttb_selects_original_points(self):
+        x, y = lttb_decimate(self.t, self.S, 100)
+        self.assertEqual(y.shape, (5, 100))
+        self.assertTrue(np.all(np.diff(x, axis=1) > 0))
+        idx = np.searchsorted(self.t, x[2])
+        np.testing.assert_array_equal(self.S[2, idx], y[2])
+
+    def test_short_paths_are_untouched(self):
+        x, y = minmax_decimate(self.t[:50], self.S[:, :50], 200)
+        np.testing.assert_array_equal(y, self.S[:, :50])
+
+    def test_nan_separated(self):
+        x, y = nan_separated(np.ones((3, 4)), np.zeros((3, 4)))
+        self.assertEqual(len(x), 15)
+        self.assertEqual(int(np.isnan(y).sum()), 3)
+
+class TestEnsembleAggregates(unittest.TestCase):
+
+    def test_density_columns_integrate_to_one(self):
+        t, S = simulate_paths(100, 0, 20, 1.0, 0.01, 2000, seed=1)
+        t_cols, prices, density = density_grid(t, S, n_time=50, n_price=80)
+        self.assertEqual(density.shape, (80, len(t_cols)))
+        np.testing.assert_allclose(density.sum(axis=0) * (prices[1] - prices[0]), 1.0)
+
+    def test_fan_uses_all_paths(self):
+        t, S = simulate_paths(100, 0, 20, 1.0, 0.01, 4000, seed=1)
+        t_cols, q = quantile_fan(t, S, levels=(0.1587, 0.5, 0.8413))
+        self.assertAlmostEqual(q[2, -1] - q[0, -1], 2 * 20, delta=2.0)
+
+class TestPlotPaths(unittest.TestCase):
+
+    def test_batched_mode_uses_one_ensemble_trace(self):
+        t, S = simulate_paths(100, 0, 20, 1.0, 0.001, 200, seed=1)
+        legacy = plot_paths(t, S, 200, 0, 20, 100, render_mode='traces')
+        batched = plot_paths(t, S, 200, 0, 20, 100, render_mode='batched', max_points=500)
+
+        self.assertEqual(len(legacy.data), 100 + 4)
+        self.assertEqual(len(batched.data), 1 + 4)
+        self.assertEqual(batched.data[0].type, 'scattergl')
+        self.assertLess(len(batched.to_json()), len(legacy.to_json()) / 2)
+
+    def test_bands_come_from_the_surface(self):
+        t, S = simulate_paths(100, 5, 20, 1.0, 0.01, 50, seed=1)
+        surface = density_surface(t[::10], 100, 5, 20)
+        fig = plot_paths(t, S, 50, 5, 20, 100, surface=surface)
+        band = next(trace for trace in fig.data if trace.name == '±1σ Range')
+        upper = np.asarray(band.y[:len(t)])
+        np.testing.assert_allclose(upper[::10], 100 + 5 * t[::10] + 20 * np.sqrt(t[::10]), rtol=1e-9)
+
+class TestPlotDistribution(unittest.TestCase):
+
+    def test_payload_is_independent_of_N(self):
+        """
+        Only bin centers and densities reach the figure, not the raw samples.
+        """
+        rng = np.random.default_rng(0)
+        small = plot_distribution(rng.normal(100, 20, 1000), 1.0, 100, 0, 20, bins=50)
+        large = plot_distribution(rng.normal(100, 20, 1000000), 1.0, 100, 0, 20, bins=50)
+
+        self.assertEqual(len(large.data[0].x), 50)
+        self.assertLess(abs(len(large.to_json()) - len(small.to_json())), 2000)
+        area = np.sum(np.asarray(large.data[0].y) * np.asarray(large.data[0].width))
+        self.assertAlmostEqual(area, 1.0)
+
+    def test_overlay_and_heatmap_share_a_surface(self):
+        surface = density_surface(np.linspace(0, 1.0, 21), 100, 0, 20, x=np.linspace(20, 180, 200))
+        fig = plot_distribution(np.random.default_rng(0).normal(100, 20, 5000), 1.0, 100, 0, 20, surface=surface)
+        np.testing.assert_allclose(fig.data[1].y, surface.pdf[-1])
+
+        heatmap = plot_density_surface(surface)
+        self.assertEqual(heatmap.data[0].type, 'heatmap')
+        self.assertEqual(np.asarray(heatmap.data[0].z).shape, (200, 21))
+        self.assertEqual(len(heatmap.data), 1 + len(surface.levels))
+
+class TestAnimation(unittest.TestCase):
+
+    def test_particle_frames_follow_one_walk(self):
+        fig = animate_particle(n_steps=30, seed=3)
+        self.assertEqual(len(fig.frames), 31)
+        walk = np.asarray(fig.frames[-1].data[0].x)
+        self.assertEqual(len(walk), 31)
+        self.assertEqual(walk[0], 0.0)
+        self.assertEqual(fig.frames[-1].data[1].x[0], walk[-1])
+        np.testing.assert_array_equal(np.asarray(animate_particle(n_steps=30, seed=3).frames[-1].data[0].x), walk)
+
+    def test_ensemble_frames(self):
+        """
+        One frame per time column; each histogram is a density of all N
+        values at that time and the paths grow to the current time.
+        """
+        t, S = simulate_paths(100, 5, 20, 1.0, 0.01, 2000, seed=1)
+        fig = animate_ensemble(t, S, 100, 5, 20, n_frames=21, n_paths=10, n_bins=40)
+        self.assertEqual(len(fig.frames), 21)
+
+        last = fig.frames[-1]
+        self.assertEqual(list(last.traces), [0, 1, 2, 3])
+        np.testing.assert_allclose(last.data[1].y, S[:10, -1], rtol=1e-6)
+        self.assertEqual(np.count_nonzero(np.isnan(np.asarray(last.data[0].y, dtype=float))), 10)
+
+        widths = fig.data[2].width
+        for frame in fig.frames:
+            self.assertAlmostEqual(float(np.sum(frame.data[2].x) * widths), 1.0, places=4)
+
+    def test_ensemble_payload_is_independent_of_N(self):
+        t, small = simulate_paths(100, 0, 20, 1.0, 0.01, 100, seed=1)
+        _, large = simulate_paths(100, 0, 20, 1.0, 0.01, 20000, seed=1)
+        surface = density_surface(t, 100, 0, 20, x=np.linspace(0, 200, 200))
+        sizes = [len(animate_ensemble(t, S, 100, 0, 20, surface=surface).to_json()) for S in (small, large)]
+        self.assertLess(abs(sizes[1] - sizes[0]), 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+
+import unittest
+import numpy as np
+from models.bachelier import simulate_paths, theoretical_stats
+from models.sampling import (antithetic_normals, moment_matched_normals, sobol_bridge_normals,
+                             bridge_schedule, control_variate_mean)
+
+class TestSamplers(unittest.TestCase):
+
+    def test_antithetic_pairs(self):
+        Z = antithetic_normals(np.random.RandomState(0), 7, 5)
+        np.testing.assert_array_equal(Z[3:6], -Z[:3])
+        self.assertEqual(Z.shape, (7, 5))
+
+    def test_moment_matching_is_exact(self):
+        Z = moment_matched_normals(np.random.RandomState(0), 100, 20)
+        np.testing.assert_allclose(Z.mean(axis=0), 0, atol=1e-12)
+        np.testing.assert_allclose(Z.std(axis=0), 1, atol=1e-12)
+
+    def test_moment_matching_degenerate_samples(self):
+        """
+        A single path or a step without spread gives finite shocks, not NaN.
+        """
+        Z = moment_matched_normals(np.random.RandomState(0), 1, 5)
+        np.testing.assert_array_equal(Z, np.random.RandomState(0).normal(0, 1, size=(1, 5)))
+        _, S = simulate_paths(100, 5, 20, 1.0, 0.1, 1, seed=0, sampler='moment_matching')
+        self.assertTrue(np.isfinite(S).all())
+
+        class Constant:
+            def normal(self, loc, scale, size):
+                return np.full(size, 0.5)
+        np.testing.assert_array_equal(moment_matched_normals(Constant(), 4, 3), 0)
+
+    def test_bridge_schedule_visits_every_point_once(self):
+        for steps in (1, 7, 64, 100):
+            indices = [index for index, _, _ in bridge_schedule(steps)]
+            self.assertEqual(sorted(indices), list(range(1, steps + 1)))
+            self.assertEqual(indices[0], steps)
+
+    def test_sobol_bridge_increments_are_standard_normal(self):
+        """
+        Bridge-ordered Sobol shocks have unit variance and no serial correlation.
+        """
+        Z = sobol_bridge_normals(4096, 16, seed=1)
+        np.testing.assert_allclose(Z.mean(axis=0), 0, atol=0.02)
+        np.testing.assert_allclose(Z.var(axis=0), 1, atol=0.03)
+        self.assertLess(abs(np.corrcoef(Z[:, 3], Z[:, 4])[0, 1]), 0.05)
+
+    def test_samplers_reproduce_theory(self):
+        S0, mu, sigma, T = 100, 10, 20, 1.0
+        theo_mean, theo_var = theoretical_stats(T, S0, mu, sigma)
+        for sampler in ('antithetic', 'moment_matching', 'sobol'):
+            _, S = simulate_paths(S0, mu, sigma, T, 0.05, 4096, seed=42, sampler=sampler)
+            self.assertAlmostEqual(np.mean(S[:, -1]), theo_mean, delta=0.05, msg=sampler)
+            self.assertAlmostEqual(np.var(S[:, -1]), theo_var, delta=30.0, msg=sampler)
+
+    def test_unknown_sampler(self):
+        with self.assertRaises(ValueError):
+            simulate_paths(100, 0, 20, 1.0, 0.1, 10, seed=1, sampler='halton')
+
+class TestControlVariate(unittest.TestCase):
+
+    def test_reduces_standard_error(self):
+        """
+        Using S_T (known mean) as control shrinks the error of a call payoff estimate.
+        """
+        S0, mu, sigma, T, K = 100, 0, 20, 1.0, 90
+        _, S = simulate_paths(S0, mu, sigma, T, 0.1, 20000, seed=3)
+        S_T = S[:, -1]
+        payoff = np.maximum(S_T - K, 0)
+
+        plain_stderr = payoff.std(ddof=1) / np.sqrt(len(payoff))
+        estimate, stderr, beta = control_variate_mean(payoff, S_T, theoretical_stats(T, S0, mu, sigma)[0])
+
+        self.assertLess(stderr, 0.6 * plain_stderr)
+        self.assertGreater(beta, 0.5)
+        self.assertAlmostEqual(estimate, payoff.mean(), delta=4 * plain_stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+
+import unittest
+import numpy as np
+from models.bachelier import iter_paths, simulate_paths
+from models.fractal import simulate_fractal_paths
+from models.scaling import (
+    HURST_METHODS, dfa_fluctuation, estimate_hurst, expected_rescaled_range, hill_estimator,
+    hurst_lags, rescaled_range, tail_exponent,
+)
+
+class TestHurstEstimation(unittest.TestCase):
+
+    def test_recovers_H_of_fractional_paths(self):
+        tolerance = {'variance': 0.03, 'rs': 0.1, 'dfa': 0.04}
+        for H in (0.3, 0.5, 0.8):
+            _, S = simulate_fractal_paths(100, 5, 20, 1.0, 1e-4, 100, 'fgn', seed=1, H=H)
+            for method in HURST_METHODS:
+                estimate = estimate_hurst(S, method)
+                self.assertAlmostEqual(estimate.H, H, delta=tolerance[method], msg=f"{method} H={H}")
+                self.assertEqual(estimate.path_H.shape, (100,))
+
+    def test_blocking_does_not_change_the_estimate(self):
+        _, S = simulate_fractal_paths(100, 5, 20, 1.0, 1e-3, 64, 'fgn', seed=2, H=0.7)
+        for method in HURST_METHODS:
+            whole = estimate_hurst(S, method, workers=1)
+            blocked = estimate_hurst(S, method, max_bytes=64 * 1024, workers=3)
+            np.testing.assert_allclose(blocked.path_H, whole.path_H, err_msg=method)
+            self.assertAlmostEqual(blocked.H, whole.H)
+
+    def test_streamed_blocks(self):
+        """
+        Path blocks from iter_paths give the same answer as the full array.
+        """
+        _, S = simulate_paths(100, 0, 20, 1.0, 0.001, 300, seed=5)
+        streamed = estimate_hurst(iter_paths(100, 0, 20, 1.0, 0.001, 300, seed=5, block_size=64), 'dfa')
+        np.testing.assert_allclose(streamed.statistic, estimate_hurst(S, 'dfa').statistic)
+        self.assertAlmostEqual(streamed.H, 0.5, delta=0.03)
+
+    def test_prefix_sums_match_direct_fits(self):
+        """
+        DFA fluctuations and R/S from prefix sums agree with fitting every
+        window explicitly.
+        """
+        X = np.cumsum(np.random.default_rng(0).standard_normal((3, 101)), axis=1) + 100
+        s = 10
+        k = np.arange(s)
+        direct = []
+        for row in X:
+            windows = (row - row[0])[:100].reshape(10, s)
+            residual = [w - np.polyval(np.polyfit(k, w, 1), k) for w in windows]
+            direct.append(np.mean(np.square(residual)))
+        np.testing.assert_allclose(dfa_fluctuation(X, [s])[:, 0], direct)
+
+        rs = []
+        for row in X:
+            ratios = []
+            for w in np.diff(row)[:100].reshape(10, s):
+                Y = np.cumsum(w - w.mean())
+                ratios.append((Y.max() - min(Y.min(), 0)) / w.std())
+            rs.append(np.mean(ratios))
+        np.testing.assert_allclose(rescaled_range(X, [s], max_windows=None)[:, 0], rs)
+
+    def test_helpers(self):
+        lags = hurst_lags(10000)
+        self.assertEqual(lags[0], 4)
+        self.assertEqual(lags[-1], 2500)
+        self.assertTrue(np.all(np.diff(lags) > 0))
+        # Expected R/S grows like sqrt(pi n / 2) for long windows
+        self.assertAlmostEqual(expected_rescaled_range([10000])[0] / np.sqrt(np.pi * 10000 / 2), 1.0, delta=0.01)
+        with self.assertRaises(ValueError):
+            estimate_hurst(np.zeros((2, 100)), 'wavelet')
+
+class TestTailExponent(unittest.TestCase):
+
+    def test_hill_on_pareto_samples(self):
+        samples = np.random.default_rng(0).pareto(2.5, size=1000000) + 1
+        estimate = hill_estimator(np.array_split(samples, 7), k_max=5000)
+        self.assertEqual(len(estimate.alpha), 5000)
+        self.assertAlmostEqual(estimate.alpha[-1], 2.5, delta=0.1)
+        np.testing.assert_array_equal(hill_estimator(samples, k_max=5000).alpha, estimate.alpha)
+
+    def test_tail_exponent_of_paths(self):
+        _, stable = simulate_fractal_paths(0, 0, 1, 1.0, 1e-3, 1000, 'stable', seed=1, alpha=1.5)
+        self.assertAlmostEqual(tail_exponent(stable, k_max=1000).alpha[-1], 1.5, delta=0.15)
+        _, student = simulate_fractal_paths(0, 0, 1, 1.0, 1e-3, 1000, 'student_t', seed=1, nu=3)
+        self.assertAlmostEqual(tail_exponent(student, k_max=1000).alpha[-1], 3.0, delta=0.4)
+
+if __name__ == '__main__':
+    unittest.main()
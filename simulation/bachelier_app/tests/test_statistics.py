@@ -0,0 +1,105 @@
+
+import unittest
+import numpy as np
+from models.bachelier import simulate_paths, iter_paths, theoretical_stats
+from models.statistics import StreamingHistogram, MomentAccumulator, QuantileSketch, theoretical_bin_edges
+
+class TestStreamingHistogram(unittest.TestCase):
+
+    def test_chunked_merge_equals_single_pass(self):
+        """
+        Histograms of chunks on shared edges merge into the full-sample histogram.
+        """
+        edges = theoretical_bin_edges(1.0, 100, 0, 20, bins=60)
+        blocks = list(iter_paths(100, 0, 20, 1.0, 0.01, 5000, seed=42, block_size=700))
+        S_T = np.concatenate([b.S[:, -1] for b in blocks])
+
+        merged = StreamingHistogram(edges)
+        for block in blocks:
+            merged.merge(StreamingHistogram(edges).update(block.S[:, -1]))
+
+        full = StreamingHistogram(edges).update(S_T)
+        np.testing.assert_array_equal(merged.counts, full.counts)
+        self.assertEqual(merged.n, 5000)
+
+    def test_density_and_out_of_range(self):
+        hist = StreamingHistogram([0.0, 1.0, 2.0]).update([-1.0, 0.5, 1.5, 1.5, 3.0])
+        self.assertEqual((hist.underflow, hist.overflow, hist.n), (1, 1, 5))
+        np.testing.assert_allclose(hist.density(), [0.2, 0.4])
+
+    def test_binning_rule(self):
+        values = np.random.default_rng(0).normal(size=1000)
+        self.assertEqual(len(StreamingHistogram.from_values(values, bins=25).counts), 25)
+        hist = StreamingHistogram.from_values(values, bins='fd')
+        self.assertEqual(hist.n, 1000)
+        self.assertEqual((hist.underflow, hist.overflow), (0, 0))
+
+    def test_merge_requires_same_edges(self):
+        with self.assertRaises(ValueError):
+            StreamingHistogram([0, 1, 2]).merge(StreamingHistogram([0, 1, 3]))
+
+class TestMomentAccumulator(unittest.TestCase):
+
+    def setUp(self):
+        self.t, self.S = simulate_paths(100, 5, 20, 1.0, 0.01, 6000, seed=42)
+
+    def test_matches_batch_moments(self):
+        """
+        Streaming path blocks reproduce the moments of the materialized ensemble.
+        """
+        acc = MomentAccumulator(len(self.t))
+        for block in iter_paths(100, 5, 20, 1.0, 0.01, 6000, seed=42, block_size=1000):
+            acc.update(block)
+
+        d = self.S - self.S.mean(axis=0)
+        var = (d ** 2).mean(axis=0)
+        np.testing.assert_allclose(acc.mean, self.S.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(acc.variance, var, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(acc.skewness[1:], (d[:, 1:] ** 3).mean(axis=0) / var[1:] ** 1.5, atol=1e-9)
+        np.testing.assert_allclose(acc.kurtosis[1:], (d[:, 1:] ** 4).mean(axis=0) / var[1:] ** 2 - 3, atol=1e-9)
+        self.assertEqual(acc.skewness[0], 0.0)
+
+    def test_merge_of_uneven_chunks(self):
+        """
+        Accumulators from unequal chunks merge to the same result as one pass.
+        """
+        parts = [MomentAccumulator(len(self.t)).update(self.S[a:b]) for a, b in [(0, 10), (10, 4000), (4000, 6000)]]
+        merged = parts[0].merge(parts[1]).merge(parts[2])
+        whole = MomentAccumulator(len(self.t)).update(self.S)
+
+        self.assertTrue(np.all(merged.count == 6000))
+        for name in ('mean', 'variance', 'skewness', 'kurtosis'):
+            np.testing.assert_allclose(getattr(merged, name), getattr(whole, name), rtol=1e-8, atol=1e-10)
+
+    def test_time_slices(self):
+        acc = MomentAccumulator(len(self.t))
+        for block in iter_paths(100, 5, 20, 1.0, 0.01, 6000, seed=1, by='time', block_size=13):
+            acc.update(block)
+        theo_mean, theo_var = theoretical_stats(1.0, 100, 5, 20)
+        self.assertAlmostEqual(acc.mean[-1], theo_mean, delta=1.0)
+        self.assertAlmostEqual(acc.variance[-1], theo_var, delta=25.0)
+        self.assertLess(abs(acc.kurtosis[-1]), 0.2)
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_quantiles_within_a_bin(self):
+        t, S = simulate_paths(100, 5, 20, 1.0, 0.01, 10000, seed=3)
+        sketch = QuantileSketch.for_bachelier(t, 100, 5, 20, bins=256)
+        for start in range(0, 10000, 2500):
+            sketch.update(S[start:start + 2500])
+
+        levels = [0.05, 0.5, 0.95]
+        bin_width = (sketch.hi - sketch.lo) / sketch.bins
+        error = np.abs(sketch.quantile(levels) - np.quantile(S, levels, axis=0))
+        self.assertTrue(np.all(error <= bin_width + 1e-12))
+        np.testing.assert_array_equal(sketch.quantile(0.5)[0], 100.0)
+
+    def test_merge_is_exact(self):
+        t, S = simulate_paths(0, 0, 1, 1.0, 0.1, 1000, seed=3)
+        a = QuantileSketch.for_bachelier(t, 0, 0, 1).update(S[:300])
+        b = QuantileSketch.for_bachelier(t, 0, 0, 1).update(S[300:])
+        whole = QuantileSketch.for_bachelier(t, 0, 0, 1).update(S)
+        np.testing.assert_array_equal(a.merge(b).counts, whole.counts)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+
+import unittest
+import numpy as np
+from models.parallel import simulate_paths_parallel
+from models.sweep import run_sweep, SWEEP_FIELDS
+
+class TestSweep(unittest.TestCase):
+
+    def test_grid_statistics(self):
+        sigmas = np.linspace(5, 50, 6)
+        mus = np.linspace(-20, 20, 5)
+        result = run_sweep(100.0, mus[None, :], sigmas[:, None], 1.0, 0.05, 4000, seed=11, workers=1)
+        self.assertEqual(set(result), set(SWEEP_FIELDS))
+        for name in SWEEP_FIELDS:
+            self.assertEqual(result[name].shape, (6, 5), msg=name)
+        np.testing.assert_allclose(result['theo_mean'], 100.0 + mus[None, :] * np.ones((6, 1)))
+        self.assertLess(np.abs(result['mean_z']).max(), 4)
+        np.testing.assert_allclose(result['variance_ratio'], 1, atol=0.1)
+
+    def test_independent_of_pool_layout(self):
+        args = (100.0, np.array([0.0, 3.0]), np.arange(1.0, 10.0)[:, None], 1.0, 0.1, 500)
+        reference = run_sweep(*args, seed=5, workers=1, chunk_size=64)
+        for workers, executor in [(2, 'thread'), (3, 'process')]:
+            result = run_sweep(*args, seed=5, workers=workers, executor=executor, chunk_size=64)
+            for name in SWEEP_FIELDS:
+                np.testing.assert_allclose(result[name], reference[name], rtol=1e-12, err_msg=name)
+
+    def test_matches_simulated_terminal_values(self):
+        """
+        Broadcasting W_T reproduces the terminal column of
+        simulate_paths_parallel for every scenario with the same seed.
+        """
+        mus, sigmas = np.array([-5.0, 0.0, 12.0]), np.array([[3.0], [20.0]])
+        result = run_sweep(100.0, mus, sigmas, 1.0, 0.02, 300, seed=9, workers=2, chunk_size=128, max_bytes=4096)
+        for i, sigma in enumerate(sigmas.ravel()):
+            for j, mu in enumerate(mus):
+                S_T = simulate_paths_parallel(100.0, mu, sigma, 1.0, 0.02, 300, seed=9, chunk_size=128)[1][:, -1]
+                self.assertAlmostEqual(result['mean'][i, j], S_T.mean(), places=9)
+                self.assertAlmostEqual(result['variance'][i, j] / S_T.var(ddof=1), 1.0, places=9)
+
+if __name__ == '__main__':
+    unittest.main()
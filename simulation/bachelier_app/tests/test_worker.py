@@ -0,0 +1,150 @@
+
+import threading
+import unittest
+import numpy as np
+from services.worker import BackgroundRunner
+
+def staged(job, release, stages=5, value=None):
+    # Waits on release before each stage, so tests control when a job runs
+    for i in range(stages):
+        release.wait(5)
+        job.report((i + 1) / stages, f"stage {i + 1}", preview=i)
+    return value
+
+class TestBackgroundRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = BackgroundRunner(max_workers=2)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_result_and_progress(self):
+        release = threading.Event()
+        job = self.runner.submit('s', 1, staged, release, value='paths')
+        self.assertFalse(job.wait(0.05))
+        self.assertEqual(job.status, 'running')
+
+        release.set()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.result, 'paths')
+        self.assertEqual((job.progress, job.preview), (1.0, 4))
+        self.assertIs(self.runner.latest('s'), job)
+
+    def test_same_key_returns_running_job(self):
+        release = threading.Event()
+        first = self.runner.submit('s', 1, staged, release)
+        self.assertIs(self.runner.submit('s', 1, staged, release), first)
+        release.set()
+        first.wait(5)
+        self.assertIs(self.runner.submit('s', 1, staged, release), first)
+
+    def test_new_key_cancels_superseded_job(self):
+        """
+        A superseded job stops at its next check and never becomes the latest result.
+        """
+        done = threading.Event()
+        self.runner.submit('s', 1, staged, done, value='a')
+        done.set()
+        self.runner.current('s').wait(5)
+
+        release = threading.Event()
+        old = self.runner.submit('s', 2, staged, release, value='b')
+        new = self.runner.submit('s', 3, staged, done, value='c')
+        release.set()
+        self.assertTrue(old.wait(5) and new.wait(5))
+
+        self.assertEqual(old.status, 'cancelled')
+        self.assertIsNone(old.result)
+        self.assertEqual(new.result, 'c')
+        self.assertIs(self.runner.latest('s'), new)
+
+    def test_late_superseded_job_does_not_replace_newer_result(self):
+        """
+        A job that ignores cancellation and finishes after its successor
+        is discarded instead of becoming the latest result.
+        """
+        release, done = threading.Event(), threading.Event()
+        done.set()
+
+        def stubborn(job):
+            release.wait(5)
+            return 'stale'
+
+        old = self.runner.submit('s', 1, stubborn)
+        new = self.runner.submit('s', 2, staged, done, value='fresh')
+        new.wait(5)
+        release.set()
+        old.wait(5)
+
+        self.assertIs(self.runner.latest('s'), new)
+        self.assertEqual((old.status, old.result), ('cancelled', None))
+
+    def test_results_are_bounded_by_bytes(self):
+        runner = BackgroundRunner(max_workers=1, max_bytes=2500)
+        try:
+            done = threading.Event()
+            done.set()
+            for slot in 'abc':
+                runner.submit(slot, 1, staged, done, value=np.zeros(100)).wait(5)
+            # Three 800-byte results fit; a fourth evicts the oldest slot
+            self.assertIsNotNone(runner.latest('a'))
+            runner.submit('d', 1, staged, done, value=np.zeros(100)).wait(5)
+            self.assertIsNone(runner.latest('a'))
+            self.assertIsNone(runner.current('a'))
+            self.assertLessEqual(runner.nbytes, 2500)
+        finally:
+            runner.shutdown()
+
+    def test_publishing_never_evicts_its_own_slot(self):
+        """
+        A result that finishes in the least recently submitted slot and
+        overflows the bound pushes out other slots, not itself.
+        """
+        runner = BackgroundRunner(max_workers=2, max_bytes=1500)
+        try:
+            done, release = threading.Event(), threading.Event()
+            done.set()
+            slow = runner.submit('a', 1, staged, release, value=np.zeros(100))
+            runner.submit('b', 1, staged, done, value=np.zeros(100)).wait(5)
+            release.set()
+            slow.wait(5)
+            self.assertIs(runner.latest('a'), slow)
+            self.assertIsNone(runner.latest('b'))
+            self.assertLessEqual(runner.nbytes, 1500)
+        finally:
+            runner.shutdown()
+
+    def test_latest_survives_pending_job(self):
+        done, release = threading.Event(), threading.Event()
+        done.set()
+        first = self.runner.submit('s', 1, staged, done, value='a')
+        first.wait(5)
+        pending = self.runner.submit('s', 2, staged, release, value='b')
+        self.assertIs(self.runner.latest('s'), first)
+        release.set()
+        pending.wait(5)
+        self.assertIs(self.runner.latest('s'), pending)
+
+    def test_slots_are_independent(self):
+        release = threading.Event()
+        a = self.runner.submit('a', 1, staged, release)
+        b = self.runner.submit('b', 2, staged, release)
+        release.set()
+        self.assertTrue(a.wait(5) and b.wait(5))
+        self.assertEqual((a.status, b.status), ('done', 'done'))
+
+    def test_errors_are_captured(self):
+        def fail(job):
+            raise ValueError("bad parameters")
+        job = self.runner.submit('s', 1, fail)
+        job.wait(5)
+        self.assertEqual(job.status, 'failed')
+        self.assertIsInstance(job.error, ValueError)
+        self.assertIsNone(self.runner.latest('s'))
+        # A failed job is retried rather than returned again
+        self.assertIsNot(self.runner.submit('s', 1, fail), job)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,19 +2,58 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-import scipy.stats as stats
+from plotly.subplots import make_subplots
+from models.bachelier import theoretical_pdf
+from models.density import SIGMA_LEVELS, density_surface
+from models.statistics import StreamingHistogram
+from ui.rendering import decimate, nan_separated, density_grid, quantile_fan, time_columns
 
-def plot_paths(t, S, N, mu, sigma, S0, show_ensemble=True, primary_idx=0):
+RENDER_MODES = {
+    'traces': "Individual traces",
+    'batched': "Batched (WebGL)",
+    'density': "Density heatmap",
+    'fan': "Quantile fan",
+}
+
+def _quantile_band(surface, level, t):
+    """
+    The surface's quantile curve for `level`, interpolated onto t.
+    """
+    match = np.flatnonzero(np.isclose(surface.levels, level))
+    if not len(match):
+        raise ValueError(f"surface has no {level:.4f} quantile; build it with levels=SIGMA_LEVELS")
+    return np.interp(t, surface.t, surface.quantiles[match[0]])
+
+def plot_paths(t, S, N, mu, sigma, S0, show_ensemble=True, primary_idx=0,
+               render_mode='batched', max_points=1000, ensemble_limit=100, decimation='minmax',
+               empirical=None, surface=None):
     """
     Plots simulated paths using Plotly.
     Highlight primary_idx path.
     Overlay mean and sigma bands.
+
+    render_mode controls how the ensemble is drawn:
+    - 'traces': one go.Scatter per path at full resolution (first ensemble_limit paths)
+    - 'batched': the first ensemble_limit paths in a single NaN-separated
+      Scattergl trace, each decimated to max_points ('minmax' or 'lttb')
+    - 'density': heatmap of all N paths binned over time and price
+    - 'fan': empirical 5/25/50/75/95% quantile bands of all N paths
+
+    empirical, if given, is a MomentAccumulator over the same time grid;
+    its ±1σ band is drawn next to the theoretical one.
+
+    The theoretical mean and ±1σ/±2σ bands are read from `surface`, a
+    DensitySurface with SIGMA_LEVELS quantiles (built here if not given),
+    so a caller can share one precomputed surface across charts.
     """
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render_mode {render_mode!r}")
+
     fig = go.Figure()
     
-    # Plot ensemble (limit to manageable number if N is large for performance)
-    ensemble_limit = min(N, 100) # Only plot 100 max for clarity unless user wants more
-    if show_ensemble:
+    if show_ensemble and render_mode == 'traces':
+        # Plot ensemble (limit to manageable number if N is large for performance)
+        ensemble_limit = min(N, ensemble_limit) # Only plot 100 max for clarity unless user wants more
         for i in range(ensemble_limit):
             opacity = 0.1 if i != primary_idx else 1.0
             width = 1 if i != primary_idx else 3
@@ -31,21 +70,72 @@ def plot_paths(t, S, N, mu, sigma, S0, show_ensemble=True, primary_idx=0):
                 hoverinfo='skip' if i != primary_idx else 'all'
             )
             fig.add_trace(trace)
+    elif show_ensemble and render_mode == 'batched':
+        x, y = decimate(t, S[:min(N, ensemble_limit)], max_points, decimation)
+        x, y = nan_separated(x, y)
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            mode='lines',
+            line=dict(width=1, color='rgba(255, 255, 255, 0.1)'),
+            showlegend=False,
+            hoverinfo='skip',
+            connectgaps=False
+        ))
+    elif show_ensemble and render_mode == 'density':
+        t_cols, prices, density = density_grid(t, S, n_time=min(max_points, 300))
+        fig.add_trace(go.Heatmap(
+            x=t_cols,
+            y=prices,
+            z=density,
+            colorscale='Blues',
+            showscale=False,
+            hoverinfo='skip',
+            name='Path Density'
+        ))
+    elif show_ensemble and render_mode == 'fan':
+        t_cols, q = quantile_fan(t, S, n_time=min(max_points, 300))
+        for lo, hi, alpha, label in [(0, 4, 0.15, '5–95% of paths'), (1, 3, 0.3, '25–75% of paths')]:
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([t_cols, t_cols[::-1]]),
+                y=np.concatenate([q[hi], q[lo][::-1]]),
+                fill='toself',
+                fillcolor=f'rgba(30, 167, 255, {alpha})',
+                line=dict(color='rgba(30,167,255,0)'),
+                name=label
+            ))
+        fig.add_trace(go.Scatter(
+            x=t_cols,
+            y=q[2],
+            mode='lines',
+            name='Empirical Median',
+            line=dict(color='rgba(255, 255, 255, 0.6)', width=1)
+        ))
     
     # Primary Path Highlight
-    primary_S = S[primary_idx, :]
+    primary_t, primary_S = t, S[primary_idx, :]
+    if render_mode != 'traces':
+        primary_t, primary_S = decimate(t, primary_S, max_points, decimation)
+        primary_t, primary_S = primary_t[0], primary_S[0]
     fig.add_trace(go.Scatter(
-        x=t, 
+        x=primary_t, 
         y=primary_S, 
         mode='lines',
         name='Primary Path',
         line=dict(color='#1EA7FF', width=3)
     ))
 
-    # Theoretical Mean Line E[S_t] = S0 + mu*t
-    # Only if sigma > 0 to show bands clearly
-    mean_S = S0 + mu * t
-    std_t = sigma * np.sqrt(t)
+    # The bands are smooth, so a pixel-width time grid is enough for them
+    band_cols = time_columns(len(t), max_points) if render_mode != 'traces' else slice(None)
+    t = t[band_cols]
+
+    # Theoretical Mean Line E[S_t] = S0 + mu*t and quantile bands
+    if surface is None:
+        surface = density_surface(t, S0, mu, sigma)
+    mean_S = np.interp(t, surface.t, surface.mean)
+    band = {level: _quantile_band(surface, level, t) for level in SIGMA_LEVELS}
+    lo1, hi1 = band[SIGMA_LEVELS[1]], band[SIGMA_LEVELS[3]]
+    lo2, hi2 = band[SIGMA_LEVELS[0]], band[SIGMA_LEVELS[4]]
     
     fig.add_trace(go.Scatter(
         x=t, 
@@ -59,7 +149,7 @@ def plot_paths(t, S, N, mu, sigma, S0, show_ensemble=True, primary_idx=0):
     # 1 Sigma
     fig.add_trace(go.Scatter(
         x=np.concatenate([t, t[::-1]]),
-        y=np.concatenate([mean_S + std_t, (mean_S - std_t)[::-1]]),
+        y=np.concatenate([hi1, lo1[::-1]]),
         fill='toself',
         fillcolor='rgba(255, 165, 0, 0.1)',
         line=dict(color='rgba(255,165,0,0)'),
@@ -70,7 +160,7 @@ def plot_paths(t, S, N, mu, sigma, S0, show_ensemble=True, primary_idx=0):
     # 2 Sigma
     fig.add_trace(go.Scatter(
          x=np.concatenate([t, t[::-1]]),
-         y=np.concatenate([mean_S + 2*std_t, (mean_S - 2*std_t)[::-1]]),
+         y=np.concatenate([hi2, lo2[::-1]]),
          fill='toself',
          fillcolor='rgba(255, 165, 0, 0.05)',
          line=dict(color='rgba(255,165,0,0)'),
@@ -78,6 +168,18 @@ def plot_paths(t, S, N, mu, sigma, S0, show_ensemble=True, primary_idx=0):
          name='±2σ Range'
     ))
 
+    # Empirical ±1σ from accumulated ensemble moments
+    if empirical is not None:
+        emp_mean = empirical.mean[band_cols]
+        emp_std = empirical.std[band_cols]
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([t, [None], t]),
+            y=np.concatenate([emp_mean + emp_std, [None], emp_mean - emp_std]),
+            mode='lines',
+            name='Empirical ±1σ',
+            line=dict(color='rgba(255, 255, 255, 0.7)', width=1, dash='dot')
+        ))
+
     fig.update_layout(
         title="Path View: Arithmetic Brownian Motion",
         xaxis_title="Time (t)",
@@ -91,16 +193,40 @@ def plot_paths(t, S, N, mu, sigma, S0, show_ensemble=True, primary_idx=0):
     
     return fig
 
-def plot_distribution(S_T, T, S0, mu, sigma):
+BIN_RULES = ['auto', 'fd', 'scott', 'sturges', 'sqrt']
+
+# Sources for the terminal distribution: the ensemble's last column (0)
+# or that many exact draws of S_T (models.exact)
+TERMINAL_SAMPLES = {
+    0: "Simulated paths",
+    100000: "Exact, 100k draws",
+    1000000: "Exact, 1M draws",
+    10000000: "Exact, 10M draws",
+}
+
+def plot_distribution(S_T, T, S0, mu, sigma, bins='auto', histogram=None, surface=None):
     """
     Plots histogram of S_T simulation results vs theoretical PDF.
+
+    Binning happens here rather than in the browser: the figure only
+    carries bin centers and densities, so its size does not grow with N.
+    bins is a NumPy binning rule (see BIN_RULES) or a bin count. A
+    prebuilt StreamingHistogram (e.g. merged from chunked runs) can be
+    passed as `histogram`, in which case S_T is not needed.
+
+    If a DensitySurface with a price grid is given, its row at T is used
+    as the theoretical overlay instead of evaluating the PDF again.
     """
+    if histogram is None:
+        histogram = StreamingHistogram.from_values(S_T, bins=bins)
+
     fig = go.Figure()
     
     # Empirical Histogram
-    fig.add_trace(go.Histogram(
-        x=S_T,
-        histnorm='probability density',
+    fig.add_trace(go.Bar(
+        x=histogram.centers,
+        y=histogram.density(),
+        width=histogram.widths,
         name='Empirical Distribution',
         marker_color='rgba(30, 167, 255, 0.6)',
         marker_line_color='#1EA7FF',
@@ -108,14 +234,12 @@ def plot_distribution(S_T, T, S0, mu, sigma):
     ))
     
     # Theoretical PDF
-    x_min, x_max = min(S_T), max(S_T)
-    x_range = np.linspace(x_min, x_max, 500)
-    
-    # Theoretical params
-    theo_mean = S0 + mu * T
-    theo_std = sigma * np.sqrt(T)
-    
-    pdf_values = stats.norm.pdf(x_range, loc=theo_mean, scale=theo_std)
+    if surface is not None and surface.pdf is not None:
+        x_range = surface.x
+        pdf_values = surface.pdf[np.abs(surface.t - T).argmin()]
+    else:
+        x_range = np.linspace(histogram.edges[0], histogram.edges[-1], 500)
+        pdf_values = theoretical_pdf(x_range, T, S0, mu, sigma)
     
     fig.add_trace(go.Scatter(
         x=x_range,
@@ -131,6 +255,7 @@ def plot_distribution(S_T, T, S0, mu, sigma):
          fig.update_layout(title=f"Distribution at T={T} (Drift µ={mu})")
 
     fig.update_layout(
+        bargap=0,
         xaxis_title="Price at Maturity (ST)",
         yaxis_title="Density",
         margin=dict(l=20, r=20, t=40, b=20),
@@ -140,6 +265,188 @@ def plot_distribution(S_T, T, S0, mu, sigma):
     )
     return fig
 
+def plot_density_surface(surface, title="Density View: p(x, t)"):
+    """
+    Heatmap of the analytic density p(x, t) from a DensitySurface with a
+    price grid, with its quantile curves on top. The colour scale ignores
+    the t = 0 delta spike so the spreading Gaussian stays visible.
+    """
+    smooth = surface.std > 0
+    zmax = float(surface.pdf[smooth].max()) if smooth.any() else None
+
+    fig = go.Figure(go.Heatmap(
+        x=surface.t,
+        y=surface.x,
+        z=surface.pdf.T,
+        zmin=0,
+        zmax=zmax,
+        colorscale='Blues',
+        colorbar=dict(title='p(x, t)'),
+        name='Density'
+    ))
+    for level, q in zip(surface.levels, surface.quantiles):
+        fig.add_trace(go.Scatter(
+            x=surface.t,
+            y=q,
+            mode='lines',
+            name=f"{level:.1%} quantile",
+            line=dict(color='orange', width=2 if level == 0.5 else 1, dash='solid' if level == 0.5 else 'dash')
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Time (t)",
+        yaxis_title="Price (St)",
+        margin=dict(l=20, r=20, t=40, b=20),
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+    )
+    return fig
+
+def _animation_controls(names, frame_ms, slider_prefix=None):
+    """
+    Play/pause buttons (and optionally a frame slider) for a figure with
+    frames. Playback runs entirely in the browser.
+    """
+    # Full redraws keep non-scatter traces (the histogram bars) in step
+    still = dict(frame=dict(duration=0, redraw=True), transition=dict(duration=0), mode='immediate')
+    play = dict(frame=dict(duration=frame_ms, redraw=True), transition=dict(duration=0),
+                fromcurrent=True, mode='immediate')
+    layout = dict(updatemenus=[dict(
+        type='buttons',
+        direction='left',
+        showactive=False,
+        x=0, y=1, xanchor='left', yanchor='top',
+        pad=dict(l=5, t=5),
+        buttons=[
+            dict(label='▶ Play', method='animate', args=[None, play]),
+            dict(label='❚❚ Pause', method='animate', args=[[None], still]),
+        ]
+    )])
+    if slider_prefix is not None:
+        layout['sliders'] = [dict(
+            steps=[dict(method='animate', label=name, args=[[name], still]) for name in names],
+            currentvalue=dict(prefix=slider_prefix),
+            pad=dict(t=30),
+            len=1.0
+        )]
+    return layout
+
+def animate_particle(n_steps=30, seed=None, frame_ms=50):
+    """
+    A single particle kicked by n_steps unit-variance collisions, as a
+    Plotly figure with one frame per kick. The whole walk is drawn in one
+    call and the frames play client-side, so showing it costs one
+    round trip instead of one per step.
+    """
+    x = np.concatenate([[0.0], np.random.default_rng(seed).standard_normal(n_steps).cumsum()])
+    reach = max(20.0, np.abs(x).max() + 1)
+    names = [str(k) for k in range(n_steps + 1)]
+
+    fig = go.Figure(data=[
+        go.Scatter(x=x[:1], y=[0], mode='lines', line=dict(color='rgba(30, 167, 255, 0.3)', width=2), hoverinfo='skip'),
+        go.Scatter(x=x[:1], y=[0], mode='markers', marker=dict(size=20, color='#1EA7FF')),
+    ])
+    fig.frames = [
+        go.Frame(name=name, data=[go.Scatter(x=x[:k + 1], y=np.zeros(k + 1)), go.Scatter(x=x[k:k + 1])])
+        for k, name in enumerate(names)
+    ]
+    fig.update_layout(
+        xaxis=dict(range=[-reach, reach], showgrid=False, zeroline=True, showticklabels=False),
+        yaxis=dict(range=[-1, 1], showgrid=False, visible=False),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=150,
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        **_animation_controls(names, frame_ms)
+    )
+    return fig
+
+def animate_ensemble(t, S, S0, mu, sigma, n_frames=60, n_paths=20, n_bins=60, surface=None, frame_ms=80):
+    """
+    Animates the ensemble over time: the first n_paths paths grow on the
+    left while the histogram of all N values of S_t (with the analytic
+    p(x, t) on top) evolves on the right.
+
+    Every frame is precomputed here: the histograms of all frames come
+    from a single bincount over shared price bins (density_grid), and the
+    paths are sampled at the same n_frames time columns. The browser plays
+    the frames, so the server sends one payload whose size depends on
+    n_frames, n_paths and n_bins but not on N.
+
+    If a DensitySurface with a price grid is given, the overlay is read
+    from its nearest time row instead of being evaluated again.
+    """
+    cols = time_columns(S.shape[1], n_frames)
+    t_cols, prices, density = density_grid(t, S, n_time=n_frames, n_price=n_bins)
+    # Single precision is plenty on screen and halves the frame payload
+    paths = S[:n_paths, cols].astype(np.float32)
+    density = density.astype(np.float32)
+    bin_height = prices[1] - prices[0] if len(prices) > 1 else 1.0
+
+    if surface is None or surface.pdf is None:
+        surface = density_surface(t_cols, S0, mu, sigma, x=np.linspace(prices[0], prices[-1], 200))
+    rows = np.abs(surface.t[None, :] - t_cols[:, None]).argmin(axis=1)
+    pdf = surface.pdf[rows].astype(np.float32)
+
+    # Keep the density axis fixed; the t = 0 spike is left to overflow it
+    spread = t_cols > t_cols[0]
+    peak = max(density[:, spread].max(), pdf[spread].max()) if spread.any() else density.max()
+
+    names = [f"{tk:.3g}" for tk in t_cols]
+    t_frames = t_cols.astype(np.float32)
+
+    def grown(k):
+        x, y = nan_separated(np.broadcast_to(t_frames[:k + 1], (len(paths), k + 1)), paths[:, :k + 1])
+        return x.astype(np.float32), y.astype(np.float32)
+
+    fig = make_subplots(rows=1, cols=2, shared_yaxes=True, column_widths=[0.7, 0.3], horizontal_spacing=0.02)
+    x0, y0 = grown(0)
+    fig.add_trace(go.Scatter(x=x0, y=y0, mode='lines', line=dict(width=1, color='rgba(255, 255, 255, 0.35)'),
+                             hoverinfo='skip', name='Paths', showlegend=False), row=1, col=1)
+    fig.add_trace(go.Scatter(x=np.full(len(paths), t_frames[0]), y=paths[:, 0], mode='markers',
+                             marker=dict(size=6, color='#1EA7FF'), hoverinfo='skip', name='Particles',
+                             showlegend=False), row=1, col=1)
+    fig.add_trace(go.Bar(x=density[:, 0], y=prices, width=bin_height, orientation='h',
+                         name='Empirical Distribution', marker_color='rgba(30, 167, 255, 0.6)'), row=1, col=2)
+    fig.add_trace(go.Scatter(x=pdf[0], y=surface.x, mode='lines', name='Theoretical PDF',
+                             line=dict(color='orange', width=2)), row=1, col=2)
+    # Static context: the expected value over the whole horizon
+    fig.add_trace(go.Scatter(x=surface.t, y=surface.mean, mode='lines', name='Expected Value E[St]',
+                             line=dict(color='orange', width=1, dash='dash')), row=1, col=1)
+
+    # Frames are merged into traces 0-3, so they only carry what changes:
+    # the fixed price axes of the histogram and the PDF are sent once
+    frames = []
+    for k, name in enumerate(names):
+        x, y = grown(k)
+        frames.append(go.Frame(name=name, traces=[0, 1, 2, 3], data=[
+            go.Scatter(x=x, y=y),
+            go.Scatter(x=np.full(len(paths), t_frames[k]), y=paths[:, k]),
+            go.Bar(x=density[:, k]),
+            go.Scatter(x=pdf[k]),
+        ]))
+    fig.frames = frames
+
+    lo, hi = min(prices[0], surface.x[0]), max(prices[-1], surface.x[-1])
+    fig.update_xaxes(range=[t_cols[0], t_cols[-1]], title_text="Time (t)", row=1, col=1)
+    fig.update_xaxes(range=[0, 1.1 * peak], title_text="Density", row=1, col=2)
+    fig.update_yaxes(range=[lo, hi], title_text="Price (St)", row=1, col=1)
+    fig.update_layout(
+        title="Ensemble Animation: S_t and its distribution over time",
+        bargap=0,
+        margin=dict(l=20, r=20, t=40, b=20),
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(yanchor="top", y=0.99, xanchor="right", x=0.99),
+        **_animation_controls(names, frame_ms, slider_prefix="t = ")
+    )
+    return fig
+
 def render_physics_finance_mapping():
     st.markdown("""
     ### Physics ↔ Finance Mapping
@@ -0,0 +1,123 @@
+
+import numpy as np
+
+# Helpers that shrink an ensemble to what a chart can actually show.
+# All of them are vectorized over paths and return plain arrays, so
+# they can be used without Plotly.
+
+def minmax_decimate(t, S, n_out):
+    """
+    Keeps the minimum and maximum of each of n_out/2 time buckets per path
+    (plus the first and last point), which preserves the visual envelope
+    of a line at pixel resolution.
+    Returns (x, y) of shape (n_paths, k); x differs per path.
+    """
+    S = np.atleast_2d(S)
+    n, m = S.shape
+    if m <= n_out:
+        return np.broadcast_to(t, S.shape), S
+
+    n_buckets = max(1, (n_out - 2) // 2)
+    size = -(-m // n_buckets)
+    padded = np.pad(S, ((0, 0), (0, n_buckets * size - m)), mode='edge')
+    buckets = padded.reshape(n, n_buckets, size)
+
+    offsets = np.arange(n_buckets) * size
+    lo = np.minimum(offsets + buckets.argmin(axis=2), m - 1)
+    hi = np.minimum(offsets + buckets.argmax(axis=2), m - 1)
+
+    # Emit each bucket's two extremes in time order
+    pairs = np.stack([np.minimum(lo, hi), np.maximum(lo, hi)], axis=2).reshape(n, -1)
+    keep = np.hstack([np.zeros((n, 1), dtype=int), pairs, np.full((n, 1), m - 1)])
+    return t[keep], np.take_along_axis(S, keep, axis=1)
+
+def lttb_decimate(t, S, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling to n_out points per path.
+    The Python loop runs over buckets; each step is vectorized over paths.
+    Returns (x, y) of shape (n_paths, n_out).
+    """
+    S = np.atleast_2d(S)
+    n, m = S.shape
+    if m <= n_out or n_out < 3:
+        return np.broadcast_to(t, S.shape), S
+
+    rows = np.arange(n)
+    edges = np.linspace(1, m - 1, n_out - 1).astype(int)
+    keep = np.empty((n, n_out), dtype=int)
+    keep[:, 0] = 0
+    keep[:, -1] = m - 1
+
+    a = np.zeros(n, dtype=int)
+    for i in range(n_out - 2):
+        start, stop = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt_start, nxt_stop = stop, (edges[i + 2] if i + 2 < len(edges) else m)
+        nxt_stop = max(nxt_stop, nxt_start + 1)
+
+        avg_t = t[nxt_start:nxt_stop].mean()
+        avg_y = S[:, nxt_start:nxt_stop].mean(axis=1)
+        t_a, y_a = t[a], S[rows, a]
+
+        tb = t[start:stop]
+        yb = S[:, start:stop]
+        area = np.abs((t_a - avg_t)[:, None] * (yb - y_a[:, None])
+                      - (t_a[:, None] - tb) * (avg_y - y_a)[:, None])
+        a = start + area.argmax(axis=1)
+        keep[:, i + 1] = a
+
+    return t[keep], np.take_along_axis(S, keep, axis=1)
+
+def decimate(t, S, n_out, method='minmax'):
+    if method == 'minmax':
+        return minmax_decimate(t, S, n_out)
+    if method == 'lttb':
+        return lttb_decimate(t, S, n_out)
+    raise ValueError(f"Unknown decimation method {method!r}")
+
+def nan_separated(x, y):
+    """
+    Flattens (n_paths, k) line data into one trace, with NaN gaps
+    between paths so Plotly does not join them.
+    """
+    n = x.shape[0]
+    gap = np.full((n, 1), np.nan)
+    return np.hstack([x, gap]).ravel(), np.hstack([y, gap]).ravel()
+
+def time_columns(m, n_cols):
+    """
+    Indices of at most n_cols evenly spaced time columns, always
+    including the first and last.
+    """
+    if m <= n_cols:
+        return np.arange(m)
+    return np.unique(np.linspace(0, m - 1, n_cols).round().astype(int))
+
+def density_grid(t, S, n_time=200, n_price=100):
+    """
+    Histograms every path's value at up to n_time time columns into
+    n_price shared price bins with a single bincount.
+    Returns (t_cols, price_centers, density) with density of shape
+    (n_price, n_cols), each column normalized to a probability density.
+    """
+    cols = time_columns(S.shape[1], n_time)
+    values = S[:, cols]
+    lo, hi = values.min(), values.max()
+    if hi <= lo:
+        hi = lo + 1.0
+    edges = np.linspace(lo, hi, n_price + 1)
+
+    bins = np.clip(((values - lo) / (hi - lo) * n_price).astype(int), 0, n_price - 1)
+    flat = bins + n_price * np.arange(len(cols))
+    counts = np.bincount(flat.ravel(), minlength=n_price * len(cols))
+    counts = counts.reshape(len(cols), n_price).T
+
+    density = counts / (S.shape[0] * np.diff(edges)[:, None])
+    return t[cols], 0.5 * (edges[:-1] + edges[1:]), density
+
+def quantile_fan(t, S, levels=(0.05, 0.25, 0.5, 0.75, 0.95), n_time=200):
+    """
+    Empirical quantiles of the full ensemble at up to n_time time columns.
+    Returns (t_cols, q) with q of shape (len(levels), n_cols).
+    """
+    cols = time_columns(S.shape[1], n_time)
+    return t[cols], np.quantile(S[:, cols], levels, axis=0)